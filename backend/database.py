@@ -1,91 +1,430 @@
-from motor.motor_asyncio import AsyncIOMotorClient
+from bson.codec_options import CodecOptions
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection, AsyncIOMotorDatabase
 from pymongo import IndexModel, ASCENDING, DESCENDING
+from pymongo.collation import Collation
+from pymongo.monitoring import ConnectionPoolListener
+from pymongo.read_preferences import Nearest, Primary, PrimaryPreferred, Secondary, SecondaryPreferred
+from pymongo.write_concern import WriteConcern
+import asyncio
 import os
-from typing import Optional
+import threading
+import time
+from typing import Dict, Optional
+
+from services.metrics import metrics
+
+class PoolMetrics(ConnectionPoolListener):
+    """Connection pool listener recording checkout wait times.
+
+    pymongo publishes pool events synchronously on the thread doing the
+    checkout, so the start time is kept in a thread-local and the wait is
+    measured when the matching checked-out (or failed) event arrives.
+    """
+
+    # Upper bounds (seconds) of the checkout wait histogram buckets
+    WAIT_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+    def __init__(self):
+        self._local = threading.local()
+        self.checked_out = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.connections_open = 0
+        self.pool_clears = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.wait_buckets = [0] * (len(self.WAIT_BUCKETS) + 1)
+
+    def _record_wait(self) -> Optional[float]:
+        started = getattr(self._local, "started", None)
+        if started is None:
+            return None
+        self._local.started = None
+        wait = (time.perf_counter_ns() - started) / 1e9
+        self.wait_seconds_total += wait
+        self.wait_seconds_max = max(self.wait_seconds_max, wait)
+        for index, bound in enumerate(self.WAIT_BUCKETS):
+            if wait <= bound:
+                self.wait_buckets[index] += 1
+                break
+        else:
+            self.wait_buckets[-1] += 1
+        return wait
+
+    def connection_check_out_started(self, event):
+        self._local.started = time.perf_counter_ns()
+
+    def connection_checked_out(self, event):
+        self._record_wait()
+        self.checkouts += 1
+        self.checked_out += 1
+
+    def connection_check_out_failed(self, event):
+        self._record_wait()
+        self.checkout_failures += 1
+
+    def connection_checked_in(self, event):
+        self.checked_out -= 1
+
+    def connection_created(self, event):
+        self.connections_open += 1
+
+    def connection_closed(self, event):
+        self.connections_open -= 1
+
+    def pool_cleared(self, event):
+        self.pool_clears += 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def snapshot(self) -> dict:
+        return {
+            "max_pool_size": db.max_pool_size,
+            "checked_out": self.checked_out,
+            "connections_open": self.connections_open,
+            "checkouts": self.checkouts,
+            "checkout_failures": self.checkout_failures,
+            "pool_clears": self.pool_clears,
+            "wait_seconds_total": round(self.wait_seconds_total, 6),
+            "wait_seconds_max": round(self.wait_seconds_max, 6),
+            "wait_seconds_avg": round(self.wait_seconds_total / self.checkouts, 6) if self.checkouts else 0.0,
+            "wait_buckets": {
+                **{str(bound): count for bound, count in zip(self.WAIT_BUCKETS, self.wait_buckets)},
+                "+Inf": self.wait_buckets[-1]
+            }
+        }
+
+pool_metrics = PoolMetrics()
+
+READ_PREFERENCE_MODES = {
+    "primary": Primary,
+    "primaryPreferred": PrimaryPreferred,
+    "secondary": Secondary,
+    "secondaryPreferred": SecondaryPreferred,
+    "nearest": Nearest
+}
+
+def parse_read_preferences(value: str, max_staleness: int) -> dict:
+    """Parse ``collection=mode,...`` into pymongo read preference objects"""
+    preferences = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        collection, mode = (piece.strip() for piece in item.split("=", 1))
+        if mode not in READ_PREFERENCE_MODES:
+            raise ValueError(f"Unknown read preference '{mode}' for {collection}")
+        if mode == "primary":
+            preferences[collection] = Primary()
+        else:
+            preferences[collection] = READ_PREFERENCE_MODES[mode](max_staleness=max_staleness)
+    return preferences
+
+def write_concern_tiers() -> Dict[str, WriteConcern]:
+    """Named write concerns collections are assigned to.
+
+    ``durable`` waits for a majority of replica set members to journal the
+    write; ``telemetry`` trades durability for latency and defaults to
+    ``w=1`` (``MONGO_TELEMETRY_W=0`` makes it unacknowledged, so failed
+    writes go unnoticed).
+    """
+    return {
+        "durable": WriteConcern(
+            w="majority",
+            j=True,
+            wtimeout=int(os.environ.get("MONGO_DURABLE_WTIMEOUT_MS", 5000))
+        ),
+        "telemetry": WriteConcern(w=int(os.environ.get("MONGO_TELEMETRY_W", 1)))
+    }
+
+def parse_write_concerns(value: str, tiers: Dict[str, WriteConcern]) -> dict:
+    """Parse ``collection=tier,...`` into pymongo write concerns"""
+    concerns = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        collection, tier = (piece.strip() for piece in item.split("=", 1))
+        if tier not in tiers:
+            raise ValueError(f"Unknown write concern tier '{tier}' for {collection}")
+        concerns[collection] = tiers[tier]
+    return concerns
+
+# Datetimes are stored and returned as naive UTC, matching datetime.utcnow()
+CODEC_OPTIONS = CodecOptions(tz_aware=False)
+
+class Repository:
+    """Collection handles bound once at startup.
+
+    Each collection carries its read preference, write concern and codec
+    options, so request handlers use a ready handle instead of awaiting a
+    getter and re-deriving options on every call. Routes receive it through
+    the ``get_repository`` dependency; background services read
+    ``db.repository``.
+    """
+
+    contact_messages: AsyncIOMotorCollection
+    newsletter_subscriptions: AsyncIOMotorCollection
+    page_views: AsyncIOMotorCollection
+    page_view_rollups: AsyncIOMotorCollection
+    page_view_sketches: AsyncIOMotorCollection
+    page_view_heavy_hitters: AsyncIOMotorCollection
+    blog_posts: AsyncIOMotorCollection
+    experiences: AsyncIOMotorCollection
+    projects: AsyncIOMotorCollection
+
+    def __init__(
+        self,
+        database: AsyncIOMotorDatabase,
+        read_preferences: Optional[Dict[str, object]] = None,
+        write_concerns: Optional[Dict[str, WriteConcern]] = None
+    ):
+        self.database = database
+        self.read_preferences = read_preferences or {}
+        self.write_concerns = write_concerns or {}
+        for name in self.__annotations__:
+            setattr(self, name, self._bind(name))
+
+    def _bind(self, name: str) -> AsyncIOMotorCollection:
+        return self.database.get_collection(
+            name,
+            codec_options=CODEC_OPTIONS,
+            read_preference=self.read_preferences.get(name),
+            write_concern=self.write_concerns.get(name)
+        )
 
 class Database:
     client: Optional[AsyncIOMotorClient] = None
     database = None
+    repository: Optional[Repository] = None
+    max_pool_size: int = 0
 
 db = Database()
 
 async def get_database():
     return db.database
 
+async def get_repository() -> Repository:
+    """FastAPI dependency returning the startup-bound repository.
+
+    Declared ``async`` so FastAPI calls it inline rather than in its thread pool.
+    """
+    return db.repository
+
+def client_options() -> dict:
+    """Motor client options from the environment"""
+    return {
+        "maxPoolSize": int(os.environ.get("MONGO_MAX_POOL_SIZE", 100)),
+        "minPoolSize": int(os.environ.get("MONGO_MIN_POOL_SIZE", 10)),
+        "maxIdleTimeMS": int(os.environ.get("MONGO_MAX_IDLE_TIME_MS", 300000)),
+        "waitQueueTimeoutMS": int(os.environ.get("MONGO_WAIT_QUEUE_TIMEOUT_MS", 2000)),
+        "connectTimeoutMS": int(os.environ.get("MONGO_CONNECT_TIMEOUT_MS", 5000)),
+        "serverSelectionTimeoutMS": int(os.environ.get("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000)),
+        "socketTimeoutMS": int(os.environ.get("MONGO_SOCKET_TIMEOUT_MS", 30000)),
+        # Unavailable compressors are skipped by the driver with a warning
+        "compressors": os.environ.get("MONGO_COMPRESSORS", "zstd,zlib"),
+        "retryWrites": True,
+        "event_listeners": [pool_metrics, metrics.mongo]
+    }
+
 async def connect_to_mongo():
     """Create database connection"""
     mongo_url = os.environ.get('MONGO_URL')
     if not mongo_url:
         raise ValueError("MONGO_URL environment variable is required")
     
-    db.client = AsyncIOMotorClient(mongo_url)
+    options = client_options()
+    db.max_pool_size = options["maxPoolSize"]
+    
+    db.client = AsyncIOMotorClient(mongo_url, **options)
     db.database = db.client[os.environ.get('DB_NAME', 'portfolio')]
     
+    # Analytics collections read from secondaries by default
+    db.repository = Repository(
+        db.database,
+        read_preferences=parse_read_preferences(
+            os.environ.get(
+                "MONGO_READ_PREFERENCES",
+                "page_views=secondaryPreferred,page_view_rollups=secondaryPreferred,"
+                "page_view_sketches=secondaryPreferred,page_view_heavy_hitters=secondaryPreferred"
+            ),
+            max_staleness=int(os.environ.get("MONGO_MAX_STALENESS_SECONDS", -1))
+        ),
+        # Visitor-submitted data must survive a failover; analytics can be lost
+        write_concerns=parse_write_concerns(
+            os.environ.get(
+                "MONGO_WRITE_CONCERNS",
+                "contact_messages=durable,newsletter_subscriptions=durable,"
+                "page_views=telemetry,page_view_rollups=telemetry,"
+                "page_view_sketches=telemetry,page_view_heavy_hitters=telemetry"
+            ),
+            write_concern_tiers()
+        )
+    )
+    
+    await warm_up_pool(options["minPoolSize"])
+    
+    await ensure_page_views_collection()
+    
     # Create indexes for better performance
     await create_indexes()
     print("Connected to MongoDB")
 
+async def warm_up_pool(connections: int):
+    """Open ``connections`` sockets up front so early requests don't pay for the handshake"""
+    if connections <= 0:
+        return
+    try:
+        await asyncio.gather(*(db.client.admin.command("ping") for _ in range(connections)))
+    except Exception as e:
+        print(f"Error warming up connection pool: {e}")
+
 async def close_mongo_connection():
     """Close database connection"""
     if db.client:
         db.client.close()
         print("Disconnected from MongoDB")
 
+def retention_seconds(variable: str) -> int:
+    """Retention period from a ``*_RETENTION_DAYS`` variable; 0 keeps data forever"""
+    return int(float(os.environ.get(variable, 0)) * 86400)
+
+def page_views_timeseries_options() -> dict:
+    """``create_collection`` options for the time-series page_views layout.
+
+    Only ``page`` is the metaField: Mongo groups measurements into one bucket
+    per meta value, and adding high-cardinality referrers to it would split
+    every page into many small, poorly compressed buckets.
+    """
+    options = {"timeseries": {"timeField": "timestamp", "metaField": "page", "granularity": "minutes"}}
+    retention = retention_seconds("PAGE_VIEW_RETENTION_DAYS")
+    if retention:
+        options["expireAfterSeconds"] = retention
+    return options
+
+async def page_views_layout() -> Optional[str]:
+    """"timeseries", "plain", or None when page_views doesn't exist yet"""
+    cursor = await db.database.list_collections(filter={"name": "page_views"})
+    collections = await cursor.to_list(1)
+    if not collections:
+        return None
+    return "timeseries" if collections[0].get("type") == "timeseries" else "plain"
+
+async def ensure_page_views_collection():
+    """Create page_views as a time-series collection when PAGE_VIEWS_TIMESERIES=true"""
+    if os.environ.get("PAGE_VIEWS_TIMESERIES", "false").lower() != "true":
+        return
+    try:
+        layout = await page_views_layout()
+        if layout is None:
+            await db.database.create_collection("page_views", **page_views_timeseries_options())
+            print("Created time-series page_views collection")
+        elif layout == "plain":
+            print("page_views is a plain collection; run scripts.migrate_page_views to convert it")
+    except Exception as e:
+        print(f"Error creating time-series page_views collection: {e}")
+
+async def ensure_ttl_index(collection, field: str, seconds: int, name: str, partial_filter: Optional[dict] = None):
+    """Create, retune or drop a TTL index so it expires documents after ``seconds`` (0 disables)"""
+    indexes = await collection.index_information()
+    if name in indexes:
+        if not seconds:
+            await collection.drop_index(name)
+        elif indexes[name].get("expireAfterSeconds") != seconds:
+            await db.database.command(
+                "collMod", collection.name,
+                index={"name": name, "expireAfterSeconds": seconds}
+            )
+        return
+    if seconds:
+        options = {"partialFilterExpression": partial_filter} if partial_filter else {}
+        await collection.create_index([(field, ASCENDING)], name=name, expireAfterSeconds=seconds, **options)
+
+async def apply_retention():
+    """Expire raw page views and hourly rollups; daily rollups are kept for good.
+
+    PAGE_VIEW_RETENTION_DAYS bounds raw events: a collection-level expiry for
+    the time-series layout, a TTL index for the plain one.
+    PAGE_VIEW_HOURLY_ROLLUP_RETENTION_DAYS bounds the hourly counters,
+    visitor sketches and top-K summaries, which only hour-level windows read.
+    """
+    raw_retention = retention_seconds("PAGE_VIEW_RETENTION_DAYS")
+    if await page_views_layout() == "timeseries":
+        await db.database.command("collMod", "page_views", expireAfterSeconds=raw_retention or "off")
+    else:
+        await ensure_ttl_index(db.database.page_views, "timestamp", raw_retention, "timestamp_ttl")
+    
+    hourly_retention = retention_seconds("PAGE_VIEW_HOURLY_ROLLUP_RETENTION_DAYS")
+    for collection in (db.database.page_view_rollups, db.database.page_view_sketches, db.database.page_view_heavy_hitters):
+        await ensure_ttl_index(
+            collection, "bucket", hourly_retention, "hourly_bucket_ttl",
+            partial_filter={"granularity": "hour"}
+        )
+
 async def create_indexes():
     """Create database indexes for optimal performance"""
     try:
         # Contact messages indexes
         await db.database.contact_messages.create_indexes([
-            IndexModel([("timestamp", DESCENDING)]),
+            IndexModel([("timestamp", DESCENDING), ("id", DESCENDING)]),
+            IndexModel([("id", ASCENDING)]),
             IndexModel([("email", ASCENDING)]),
-            IndexModel([("is_read", ASCENDING)])
+            IndexModel([("is_read", ASCENDING), ("timestamp", DESCENDING), ("id", DESCENDING)])
         ])
         
         # Newsletter subscriptions indexes
         await db.database.newsletter_subscriptions.create_indexes([
             IndexModel([("email", ASCENDING)], unique=True),
-            IndexModel([("subscribed_at", DESCENDING)])
+            IndexModel([("subscribed_at", DESCENDING), ("id", DESCENDING)]),
+            IndexModel([("is_active", ASCENDING), ("subscribed_at", DESCENDING), ("id", DESCENDING)])
         ])
         
-        # Page views indexes
+        # Page views indexes (same for the plain and time-series layouts)
         await db.database.page_views.create_indexes([
-            IndexModel([("timestamp", DESCENDING)]),
-            IndexModel([("page", ASCENDING)]),
-            IndexModel([("ip_address", ASCENDING)])
+            IndexModel([("timestamp", DESCENDING), ("id", DESCENDING)]),
+            IndexModel([("page", ASCENDING), ("timestamp", DESCENDING)])
+        ])
+        
+        # Page view rollups indexes (one counter document per bucket and page)
+        await db.database.page_view_rollups.create_indexes([
+            IndexModel([("granularity", ASCENDING), ("bucket", ASCENDING), ("page", ASCENDING)], unique=True)
+        ])
+        
+        # Unique-visitor sketches (one document per bucket, page and worker)
+        await db.database.page_view_sketches.create_indexes([
+            IndexModel(
+                [("granularity", ASCENDING), ("bucket", ASCENDING), ("page", ASCENDING), ("worker", ASCENDING)],
+                unique=True
+            )
+        ])
+        
+        # Top-K summaries (one document per bucket, dimension and worker)
+        await db.database.page_view_heavy_hitters.create_indexes([
+            IndexModel(
+                [("granularity", ASCENDING), ("bucket", ASCENDING), ("dimension", ASCENDING), ("worker", ASCENDING)],
+                unique=True
+            )
         ])
         
-        # Blog posts indexes
+        await apply_retention()
+        
+        # Blog posts indexes; (date, id) suffixes serve keyset pagination,
+        # (updated_at, id) the per-worker index refresh
         await db.database.blog_posts.create_indexes([
-            IndexModel([("date", DESCENDING)]),
-            IndexModel([("category", ASCENDING)]),
-            IndexModel([("status", ASCENDING)])
+            IndexModel([("id", ASCENDING)], unique=True),
+            IndexModel([("date", DESCENDING), ("id", DESCENDING)]),
+            IndexModel(
+                [("category", ASCENDING), ("date", DESCENDING), ("id", DESCENDING)],
+                collation=Collation(locale="en", strength=2)
+            ),
+            IndexModel([("status", ASCENDING), ("date", DESCENDING), ("id", DESCENDING)]),
+            IndexModel([("updated_at", ASCENDING), ("id", ASCENDING)])
         ])
         
         print("Database indexes created successfully")
     except Exception as e:
         print(f"Error creating indexes: {e}")
-
-# Collection getters for easier access
-async def get_contact_messages_collection():
-    db_instance = await get_database()
-    return db_instance.contact_messages
-
-async def get_newsletter_collection():
-    db_instance = await get_database()
-    return db_instance.newsletter_subscriptions
-
-async def get_page_views_collection():
-    db_instance = await get_database()
-    return db_instance.page_views
-
-async def get_blog_posts_collection():
-    db_instance = await get_database()
-    return db_instance.blog_posts
-
-async def get_experiences_collection():
-    db_instance = await get_database()
-    return db_instance.experiences
-
-async def get_projects_collection():
-    db_instance = await get_database()
-    return db_instance.projects
\ No newline at end of file
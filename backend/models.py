@@ -28,6 +28,10 @@ class ContactMessageCreate(BaseModel):
     subject: ContactSubject
     message: str = Field(..., min_length=1, max_length=2000)
 
+class ContactMessageBulkUpdate(BaseModel):
+    ids: List[str] = Field(..., min_length=1, max_length=10000)
+    is_read: bool = Field(default=True)
+
 # Newsletter Subscription Models
 class NewsletterSubscription(BaseModel):
     id: str = Field(default_factory=lambda: str(uuid.uuid4()))
@@ -62,11 +66,18 @@ class PageView(BaseModel):
     user_agent: Optional[str] = None
     referrer: Optional[str] = None
 
+class ActivityGranularity(str, Enum):
+    hour = "hour"
+    day = "day"
+    week = "week"
+
 class AnalyticsSummary(BaseModel):
     total_views: int
     total_contacts: int
     total_subscribers: int
+    unique_visitors: int = 0
     popular_pages: List[dict]
+    top_referrers: List[dict] = []
     recent_activity: List[dict]
 
 # Skills and Experience Models (for admin updates)
@@ -118,6 +129,17 @@ class MessageResponse(BaseModel):
     message: str
     success: bool
 
+class BulkItemResult(BaseModel):
+    id: str
+    status: str
+
+class BulkUpdateResponse(BaseModel):
+    updated: int
+    unchanged: int
+    not_found: int
+    results: List[BulkItemResult]
+    success: bool
+
 class ContactResponse(BaseModel):
     id: str
     message: str
@@ -1,19 +1,27 @@
-from fastapi import APIRouter, HTTPException, Request
+from fastapi import APIRouter, Depends, HTTPException, Request
 from typing import List, Optional
 from datetime import datetime, timedelta
+import asyncio
 import logging
+import heapq
 from collections import defaultdict
 
-from models import PageView, AnalyticsSummary
-from database import (
-    get_page_views_collection, 
-    get_contact_messages_collection,
-    get_newsletter_collection
-)
+from models import PageView, AnalyticsSummary, ActivityGranularity
+from database import Repository, get_repository
+from services.export import DEFAULT_BATCH_SIZE, ExportFormat, export_response, with_resume
+from services.heavy_hitters import DIMENSIONS, PAGES, REFERRERS, get_top_items, heavy_hitters
+from services.page_view_buffer import page_view_buffer
+from services.response_cache import cached
+from services.rollups import count_views_by_window, get_views_by_page, get_views_series
+from services.visitor_sketches import count_unique_visitors
+from services.time_buckets import LABEL_FORMATS, bucket_count, bucket_starts, date_trunc_expression, series_start
 
 router = APIRouter(prefix="/analytics", tags=["Analytics"])
 logger = logging.getLogger(__name__)
 
+# Upper bound on points in a recent_activity series (e.g. 83 days hourly)
+MAX_ACTIVITY_BUCKETS = 2000
+
 @router.post("/track")
 async def track_page_view(
     page: str,
@@ -22,8 +30,6 @@ async def track_page_view(
 ):
     """Track a page view"""
     try:
-        collection = await get_page_views_collection()
-        
         # Get client information
         client_ip = request.client.host
         if hasattr(request, 'headers'):
@@ -40,7 +46,10 @@ async def track_page_view(
             referrer=referrer
         )
         
-        await collection.insert_one(page_view.dict())
+        # Hand off to the write-behind buffer; it is flushed in batches
+        if not page_view_buffer.add(page_view.dict()):
+            logger.warning("Page view dropped: ingestion buffer is full")
+            return {"message": "Page view tracking failed", "success": False}
         
         return {"message": "Page view tracked", "success": True}
         
@@ -49,23 +58,58 @@ async def track_page_view(
         # Don't raise exception for analytics failures
         return {"message": "Page view tracking failed", "success": False}
 
+async def _contacts_series(collection, start: datetime, end: datetime, granularity: str) -> dict:
+    """Contact messages per bucket, grouped server-side in one aggregation"""
+    pipeline = [
+        {"$match": {"timestamp": {"$gte": start, "$lte": end}}},
+        {"$group": {"_id": date_trunc_expression("$timestamp", granularity), "count": {"$sum": 1}}}
+    ]
+    results = await collection.aggregate(pipeline).to_list(None)
+    return {result["_id"]: result["count"] for result in results}
+
 @router.get("/summary", response_model=AnalyticsSummary)
-async def get_analytics_summary(days: int = 30):
+@cached(ttl=30, tags=("analytics", "contacts", "newsletter"))
+async def get_analytics_summary(
+    days: int = 30,
+    activity_days: int = 7,
+    granularity: ActivityGranularity = ActivityGranularity.day,
+    repo: Repository = Depends(get_repository)
+):
     """Get analytics summary for the specified number of days"""
+    end_date = datetime.utcnow()
+    activity_start = series_start(end_date, activity_days, granularity.value)
+    if bucket_count(activity_start, end_date, granularity.value) > MAX_ACTIVITY_BUCKETS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Activity window too large for {granularity.value} granularity"
+        )
+    
     try:
         # Calculate date range
-        end_date = datetime.utcnow()
         start_date = end_date - timedelta(days=days)
         
         # Get collections
-        page_views_collection = await get_page_views_collection()
-        contacts_collection = await get_contact_messages_collection()
-        newsletter_collection = await get_newsletter_collection()
+        contacts_collection = repo.contact_messages
+        newsletter_collection = repo.newsletter_subscriptions
         
-        # Total page views
-        total_views = await page_views_collection.count_documents({
-            "timestamp": {"$gte": start_date, "$lte": end_date}
-        })
+        # View total from the rollup counters, popular pages and referrers
+        # from the top-K summaries, distinct visitors from merged sketches
+        view_counts, top_items = await asyncio.gather(
+            count_views_by_window({"window": (start_date, end_date)}),
+            get_top_items(start_date, end_date, limit=10, dimensions=(PAGES, REFERRERS))
+        )
+        total_views = view_counts["window"]
+        
+        popular_pages = [(item["value"], item["count"]) for item in top_items[PAGES]]
+        if total_views and not popular_pages:
+            # Windows recorded before top-K tracking existed
+            views_by_page = await get_views_by_page(start_date, end_date)
+            popular_pages = heapq.nlargest(10, views_by_page.items(), key=lambda item: item[1])
+        
+        # Per-page visitor counts only for the pages shown
+        unique_visitors, visitors_by_page = await count_unique_visitors(
+            start_date, end_date, pages=[page for page, _ in popular_pages]
+        )
         
         # Total contacts
         total_contacts = await contacts_collection.count_documents({
@@ -78,57 +122,77 @@ async def get_analytics_summary(days: int = 30):
             "is_active": True
         })
         
-        # Popular pages
-        popular_pages_pipeline = [
-            {"$match": {"timestamp": {"$gte": start_date, "$lte": end_date}}},
-            {"$group": {"_id": "$page", "views": {"$sum": 1}}},
-            {"$sort": {"views": -1}},
-            {"$limit": 10}
+        # Recent activity, one grouped query per collection, zero-filled
+        views_series, contacts_series = await asyncio.gather(
+            get_views_series(activity_start, end_date, granularity.value),
+            _contacts_series(contacts_collection, activity_start, end_date, granularity.value)
+        )
+        label_format = LABEL_FORMATS[granularity.value]
+        recent_activity = [
+            {
+                "date": bucket.strftime(label_format),
+                "views": views_series.get(bucket, 0),
+                "contacts": contacts_series.get(bucket, 0)
+            }
+            for bucket in bucket_starts(activity_start, end_date, granularity.value)
         ]
-        popular_pages_cursor = page_views_collection.aggregate(popular_pages_pipeline)
-        popular_pages = await popular_pages_cursor.to_list(10)
-        
-        # Recent activity (last 7 days by day)
-        recent_activity = []
-        for i in range(7):
-            day_start = end_date - timedelta(days=i+1)
-            day_end = end_date - timedelta(days=i)
-            
-            day_views = await page_views_collection.count_documents({
-                "timestamp": {"$gte": day_start, "$lt": day_end}
-            })
-            
-            day_contacts = await contacts_collection.count_documents({
-                "timestamp": {"$gte": day_start, "$lt": day_end}
-            })
-            
-            recent_activity.append({
-                "date": day_start.strftime("%Y-%m-%d"),
-                "views": day_views,
-                "contacts": day_contacts
-            })
         
         return AnalyticsSummary(
             total_views=total_views,
             total_contacts=total_contacts,
             total_subscribers=total_subscribers,
-            popular_pages=[{"page": p["_id"], "views": p["views"]} for p in popular_pages],
-            recent_activity=list(reversed(recent_activity))
+            unique_visitors=unique_visitors,
+            popular_pages=[
+                {"page": page, "views": views, "unique_visitors": visitors_by_page.get(page, 0)}
+                for page, views in popular_pages
+            ],
+            top_referrers=[
+                {"referrer": item["value"], "views": item["count"]}
+                for item in top_items[REFERRERS]
+            ],
+            recent_activity=recent_activity
         )
         
     except Exception as e:
         logger.error(f"Error fetching analytics summary: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch analytics")
 
+@router.get("/top")
+@cached(ttl=30, tags=("analytics",))
+async def get_top_items_endpoint(
+    dimension: str = PAGES,
+    days: int = 7,
+    limit: int = 10
+):
+    """Most frequent pages, referrer hosts or user-agent families over the last ``days``"""
+    if dimension not in DIMENSIONS:
+        raise HTTPException(status_code=400, detail=f"dimension must be one of: {', '.join(DIMENSIONS)}")
+    if not 1 <= limit <= heavy_hitters.capacity:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {heavy_hitters.capacity}")
+    
+    try:
+        end_date = datetime.utcnow()
+        top_items = await get_top_items(end_date - timedelta(days=days), end_date, limit, dimensions=(dimension,))
+        return {
+            "dimension": dimension,
+            "period_days": days,
+            "items": top_items[dimension]
+        }
+        
+    except Exception as e:
+        logger.error(f"Error fetching top {dimension}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to fetch top items")
+
 @router.get("/page-views")
 async def get_page_views(
     page: Optional[str] = None,
     days: int = 7,
-    limit: int = 100
+    limit: int = 100,
+    repo: Repository = Depends(get_repository)
 ):
     """Get page views with optional filtering"""
     try:
-        collection = await get_page_views_collection()
+        collection = repo.page_views
         
         # Build query
         query = {}
@@ -153,14 +217,76 @@ async def get_page_views(
         logger.error(f"Error fetching page views: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch page views")
 
+@router.get("/page-views/export")
+async def export_page_views(
+    format: ExportFormat = ExportFormat.ndjson,
+    page: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    after: Optional[datetime] = None,
+    after_id: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    repo: Repository = Depends(get_repository)
+):
+    """Stream page views oldest first as NDJSON or CSV; resume with the last row's timestamp and id"""
+    query = {}
+    if page:
+        query["page"] = page
+    if since or until:
+        query["timestamp"] = {
+            **({"$gte": since} if since else {}),
+            **({"$lt": until} if until else {})
+        }
+    query = with_resume(query, "timestamp", after, after_id)
+    
+    return export_response(
+        repo.page_views, query, "timestamp", list(PageView.model_fields),
+        format, batch_size, "page_views"
+    )
+
+def contacts_dashboard_pipeline(
+    now: datetime,
+    today_start: datetime,
+    week_start: datetime,
+    month_start: datetime
+) -> List[dict]:
+    """Today/week/month/total contact counts as a single $facet aggregation.
+
+    ``$facet`` sub-pipelines cannot use indexes themselves, so the leading
+    range match and timestamp-only projection let the planner feed every
+    facet from one covered scan of the ``timestamp`` index.
+    """
+    def count_since(start: datetime) -> List[dict]:
+        return [{"$match": {"timestamp": {"$gte": start}}}, {"$count": "count"}]
+    
+    return [
+        {"$match": {"timestamp": {"$lte": now}}},
+        {"$project": {"_id": 0, "timestamp": 1}},
+        {"$facet": {
+            "today": count_since(today_start),
+            "week": count_since(week_start),
+            "month": count_since(month_start),
+            "total": [{"$count": "count"}]
+        }}
+    ]
+
+async def _facet_counts(collection, pipeline: List[dict]) -> dict:
+    """Run a $facet pipeline whose facets end in $count and flatten it"""
+    results = await collection.aggregate(pipeline).to_list(1)
+    facets = results[0] if results else {}
+    return {
+        name: counts[0]["count"] if counts else 0
+        for name, counts in facets.items()
+    }
+
 @router.get("/dashboard")
-async def get_dashboard_data():
+@cached(ttl=15, tags=("analytics", "contacts", "newsletter"))
+async def get_dashboard_data(repo: Repository = Depends(get_repository)):
     """Get comprehensive dashboard data"""
     try:
         # Get collections
-        page_views_collection = await get_page_views_collection()
-        contacts_collection = await get_contact_messages_collection()
-        newsletter_collection = await get_newsletter_collection()
+        contacts_collection = repo.contact_messages
+        newsletter_collection = repo.newsletter_subscriptions
         
         # Calculate different time periods
         now = datetime.utcnow()
@@ -168,51 +294,34 @@ async def get_dashboard_data():
         week_start = now - timedelta(days=7)
         month_start = now - timedelta(days=30)
         
-        # Today's stats
-        today_views = await page_views_collection.count_documents({
-            "timestamp": {"$gte": today_start}
-        })
-        today_contacts = await contacts_collection.count_documents({
-            "timestamp": {"$gte": today_start}
-        })
-        
-        # This week's stats
-        week_views = await page_views_collection.count_documents({
-            "timestamp": {"$gte": week_start}
-        })
-        week_contacts = await contacts_collection.count_documents({
-            "timestamp": {"$gte": week_start}
-        })
-        
-        # This month's stats
-        month_views = await page_views_collection.count_documents({
-            "timestamp": {"$gte": month_start}
-        })
-        month_contacts = await contacts_collection.count_documents({
-            "timestamp": {"$gte": month_start}
-        })
-        
-        # Total stats
-        total_views = await page_views_collection.count_documents({})
-        total_contacts = await contacts_collection.count_documents({})
-        total_subscribers = await newsletter_collection.count_documents({"is_active": True})
+        # One aggregation per collection, all three in flight at once
+        view_counts, contact_counts, total_subscribers = await asyncio.gather(
+            count_views_by_window({
+                "today": (today_start, now),
+                "week": (week_start, now),
+                "month": (month_start, now),
+                "total": (None, now)
+            }),
+            _facet_counts(contacts_collection, contacts_dashboard_pipeline(now, today_start, week_start, month_start)),
+            newsletter_collection.count_documents({"is_active": True})
+        )
         
         return {
             "today": {
-                "views": today_views,
-                "contacts": today_contacts
+                "views": view_counts["today"],
+                "contacts": contact_counts["today"]
             },
             "week": {
-                "views": week_views,
-                "contacts": week_contacts
+                "views": view_counts["week"],
+                "contacts": contact_counts["week"]
             },
             "month": {
-                "views": month_views,
-                "contacts": month_contacts
+                "views": view_counts["month"],
+                "contacts": contact_counts["month"]
             },
             "total": {
-                "views": total_views,
-                "contacts": total_contacts,
+                "views": view_counts["total"],
+                "contacts": contact_counts["total"],
                 "subscribers": total_subscribers
             }
         }
@@ -1,119 +1,79 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from typing import List, Optional
-from datetime import datetime
 import logging
 
+from pymongo.collation import Collation
+
 from models import BlogPost
-from database import get_blog_posts_collection
+from database import Repository, get_repository
+from services.blog_store import blog_store
+from services.pagination import fetch_page
+from services.view_counter import view_counter
 
 router = APIRouter(prefix="/blog", tags=["Blog"])
 logger = logging.getLogger(__name__)
 
-# Mock blog data - in production, this would sync with Medium RSS
-MOCK_BLOG_POSTS = [
-    {
-        "id": "1",
-        "title": "Advanced Threat Hunting: Beyond Traditional SIEM",
-        "excerpt": "Exploring next-generation threat hunting techniques using behavioral analytics and machine learning to detect sophisticated adversaries.",
-        "date": datetime(2025, 1, 15),
-        "read_time": "8 min read",
-        "tags": ["Threat Hunting", "SIEM", "Machine Learning", "APT"],
-        "category": "Threat Hunting",
-        "status": "coming-soon",
-        "views": 0
-    },
-    {
-        "id": "2", 
-        "title": "Building TAG: AI Guardian for Cybersecurity",
-        "excerpt": "Journey of creating The Autonomous Guardian (TAG) for cybersecurity operations, lessons learned, and practical implementation strategies.",
-        "date": datetime(2025, 1, 20),
-        "read_time": "12 min read",
-        "tags": ["AI", "Cybersecurity", "Automation", "Python"],
-        "category": "AI & Security",
-        "status": "coming-soon",
-        "views": 0
-    },
-    {
-        "id": "3",
-        "title": "MITRE ATT&CK in Practice: Real-world Threat Modeling",
-        "excerpt": "Practical guide to implementing MITRE ATT&CK framework for threat modeling and detection engineering in enterprise environments.",
-        "date": datetime(2025, 2, 5),
-        "read_time": "10 min read",
-        "tags": ["MITRE ATT&CK", "Threat Modeling", "Detection Engineering"],
-        "category": "Frameworks",
-        "status": "coming-soon",
-        "views": 0
-    },
-    {
-        "id": "4",
-        "title": "Olympics 2024: Securing Global Events",
-        "excerpt": "Behind the scenes of cybersecurity operations for Paris 2024 Olympics - challenges, solutions, and lessons for critical infrastructure protection.",
-        "date": datetime(2025, 2, 15),
-        "read_time": "15 min read",
-        "tags": ["Critical Infrastructure", "Event Security", "Olympics", "SOC"],
-        "category": "Case Studies",
-        "status": "coming-soon",
-        "views": 0
-    },
-    {
-        "id": "5",
-        "title": "Data Integration Meets Cybersecurity",
-        "excerpt": "How middleware technologies and data pipeline integration enhance cybersecurity operations and threat intelligence workflows.",
-        "date": datetime(2025, 1, 25),
-        "read_time": "11 min read",
-        "tags": ["Data Integration", "Middleware", "Threat Intelligence", "Pipelines"],
-        "category": "Data Security",
-        "status": "coming-soon",
-        "views": 0
-    },
-    {
-        "id": "6",
-        "title": "Voice-Controlled Security: Building ITACHI",
-        "excerpt": "Developing ITACHI - an intelligent voice automation system for hands-free computing and advanced task automation.",
-        "date": datetime(2025, 2, 20),
-        "read_time": "9 min read",
-        "tags": ["Voice Control", "Automation", "AI Assistant", "Innovation"],
-        "category": "AI & Automation",
-        "status": "coming-soon",
-        "views": 0
-    }
-]
+# Case-insensitive matching for category filters; the (category, date, id)
+# index is built with the same collation so it can serve these queries
+CATEGORY_COLLATION = Collation(locale="en", strength=2)
+
+POST_SORT = [("date", -1), ("id", -1)]
 
 @router.get("/posts", response_model=List[BlogPost])
 async def get_blog_posts(
+    response: Response,
     category: Optional[str] = None,
+    tag: Optional[str] = None,
+    status: Optional[str] = None,
     limit: int = 10,
-    skip: int = 0
+    cursor: Optional[str] = None,
+    skip: int = Query(0, deprecated=True),
+    repo: Repository = Depends(get_repository)
 ):
-    """Get blog posts with optional category filtering"""
+    """Get blog posts newest first, with optional category/tag/status filtering, paged by ``fetch_page``"""
     try:
-        # Filter by category if provided
-        posts = MOCK_BLOG_POSTS
-        if category:
-            posts = [post for post in posts if post["category"].lower() == category.lower()]
+        collection = repo.blog_posts
+        
+        query = {}
+        if status:
+            query["status"] = status
         
-        # Apply pagination
-        paginated_posts = posts[skip:skip + limit]
+        options = {}
+        if tag:
+            # Resolve category + tag by set intersection on the facet index
+            post_ids = blog_store.facets.filter(category=category, tag=tag)
+            if not post_ids:
+                return []
+            query["id"] = {"$in": list(post_ids)}
+        elif category:
+            query["category"] = category
+            options["collation"] = CATEGORY_COLLATION
         
-        return [BlogPost(**post) for post in paginated_posts]
+        posts = await fetch_page(collection, query, POST_SORT, limit, cursor, skip, response, **options)
         
+        return [BlogPost(**view_counter.with_pending(post)) for post in posts]
+        
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching blog posts: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch blog posts")
 
 @router.get("/posts/{post_id}", response_model=BlogPost)
-async def get_blog_post(post_id: str):
+async def get_blog_post(post_id: str, repo: Repository = Depends(get_repository)):
     """Get a specific blog post by ID"""
     try:
-        post = next((post for post in MOCK_BLOG_POSTS if post["id"] == post_id), None)
+        collection = repo.blog_posts
+        
+        post = await collection.find_one({"id": post_id})
         
         if not post:
             raise HTTPException(status_code=404, detail="Blog post not found")
         
-        # Increment view count (in mock data, this would update database)
-        post["views"] += 1
+        # Count the view in memory; it is persisted with the next batched flush
+        view_counter.increment(post_id)
         
-        return BlogPost(**post)
+        return BlogPost(**view_counter.with_pending(post))
         
     except HTTPException:
         raise
@@ -125,18 +85,7 @@ async def get_blog_post(post_id: str):
 async def get_blog_categories():
     """Get all blog categories"""
     try:
-        categories = list(set(post["category"] for post in MOCK_BLOG_POSTS))
-        category_counts = {}
-        
-        for category in categories:
-            count = len([post for post in MOCK_BLOG_POSTS if post["category"] == category])
-            category_counts[category] = count
-        
-        return {
-            "categories": sorted(categories),
-            "category_counts": category_counts,
-            "total_posts": len(MOCK_BLOG_POSTS)
-        }
+        return blog_store.facets.category_summary()
         
     except Exception as e:
         logger.error(f"Error fetching blog categories: {e}")
@@ -146,37 +95,21 @@ async def get_blog_categories():
 async def get_blog_tags():
     """Get all blog tags"""
     try:
-        all_tags = []
-        for post in MOCK_BLOG_POSTS:
-            all_tags.extend(post["tags"])
-        
-        # Count tag frequency
-        tag_counts = {}
-        for tag in all_tags:
-            tag_counts[tag] = tag_counts.get(tag, 0) + 1
-        
-        # Sort by frequency
-        sorted_tags = sorted(tag_counts.items(), key=lambda x: x[1], reverse=True)
-        
-        return {
-            "tags": [tag for tag, count in sorted_tags],
-            "tag_counts": dict(sorted_tags),
-            "total_tags": len(tag_counts)
-        }
+        return blog_store.facets.tag_summary()
         
     except Exception as e:
         logger.error(f"Error fetching blog tags: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch tags")
 
 @router.get("/recent")
-async def get_recent_posts(limit: int = 5):
+async def get_recent_posts(limit: int = 5, repo: Repository = Depends(get_repository)):
     """Get most recent blog posts"""
     try:
-        # Sort by date descending
-        sorted_posts = sorted(MOCK_BLOG_POSTS, key=lambda x: x["date"], reverse=True)
-        recent_posts = sorted_posts[:limit]
+        collection = repo.blog_posts
+        
+        recent_posts = await collection.find().sort(POST_SORT).limit(limit).to_list(limit)
         
-        return [BlogPost(**post) for post in recent_posts]
+        return [BlogPost(**view_counter.with_pending(post)) for post in recent_posts]
         
     except Exception as e:
         logger.error(f"Error fetching recent posts: {e}")
@@ -185,26 +118,23 @@ async def get_recent_posts(limit: int = 5):
 @router.get("/search")
 async def search_blog_posts(
     query: str,
-    limit: int = 10
+    limit: int = 10,
+    repo: Repository = Depends(get_repository)
 ):
-    """Search blog posts by title, excerpt, or tags"""
+    """Search blog posts by title, excerpt, or tags, ranked by relevance"""
     try:
-        query_lower = query.lower()
-        matching_posts = []
-        
-        for post in MOCK_BLOG_POSTS:
-            # Search in title, excerpt, and tags
-            if (query_lower in post["title"].lower() or 
-                query_lower in post["excerpt"].lower() or
-                any(query_lower in tag.lower() for tag in post["tags"])):
-                matching_posts.append(post)
+        post_ids, total_matches = blog_store.search_index.search(query, limit)
         
-        # Limit results
-        limited_posts = matching_posts[:limit]
+        collection = repo.blog_posts
+        posts = await collection.find({"id": {"$in": post_ids}}).to_list(None)
+        posts_by_id = {post["id"]: post for post in posts}
         
         return {
-            "results": [BlogPost(**post) for post in limited_posts],
-            "total_matches": len(matching_posts),
+            "results": [
+                BlogPost(**view_counter.with_pending(posts_by_id[post_id]))
+                for post_id in post_ids if post_id in posts_by_id
+            ],
+            "total_matches": total_matches,
             "query": query
         }
         
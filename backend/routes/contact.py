@@ -1,22 +1,39 @@
-from fastapi import APIRouter, HTTPException, Request
-from typing import List
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from typing import List, Optional
 from datetime import datetime, timedelta
 import logging
 
-from models import ContactMessage, ContactMessageCreate, ContactResponse, MessageResponse
-from database import get_contact_messages_collection, get_page_views_collection
+from models import BulkItemResult, BulkUpdateResponse, ContactMessage, ContactMessageBulkUpdate, ContactMessageCreate, ContactResponse, MessageResponse, PageView
+from database import Repository, get_repository
+from services.pagination import fetch_page
+from services.export import DEFAULT_BATCH_SIZE, ExportFormat, export_response, with_resume
+from services.page_view_buffer import page_view_buffer
+from services.response_cache import cached, response_cache
+from services.task_queue import task_queue
 
 router = APIRouter(prefix="/contact", tags=["Contact"])
 logger = logging.getLogger(__name__)
 
+# Served by the (timestamp, id) and (is_read, timestamp, id) indexes
+MESSAGE_SORT = [("timestamp", -1), ("id", -1)]
+
+# Message ids looked up and updated per round-trip in bulk updates
+BULK_CHUNK_SIZE = 1000
+
+async def _record_page_view(document: dict):
+    """Background task: buffer the submission's page view, retried while the buffer is full"""
+    if not page_view_buffer.add(document):
+        raise RuntimeError("page view buffer is full")
+
 @router.post("/", response_model=ContactResponse)
 async def create_contact_message(
     contact_data: ContactMessageCreate,
-    request: Request
+    request: Request,
+    repo: Repository = Depends(get_repository)
 ):
     """Create a new contact message"""
     try:
-        collection = await get_contact_messages_collection()
+        collection = repo.contact_messages
         
         # Get client IP address
         client_ip = request.client.host
@@ -32,16 +49,17 @@ async def create_contact_message(
         # Insert into database
         result = await collection.insert_one(contact_message.dict())
         
-        # Log page view for analytics
-        page_views = await get_page_views_collection()
-        await page_views.insert_one({
-            "page": "contact_form_submission",
-            "timestamp": datetime.utcnow(),
-            "ip_address": client_ip,
-            "user_agent": request.headers.get("user-agent"),
-            "referrer": request.headers.get("referer")
-        })
+        # Log page view for analytics off the request path; the message
+        # insert above is the only write the response waits for
+        page_view = PageView(
+            page="contact_form_submission",
+            ip_address=client_ip,
+            user_agent=request.headers.get("user-agent"),
+            referrer=request.headers.get("referer")
+        )
+        task_queue.submit(_record_page_view, page_view.dict())
         
+        response_cache.invalidate("contacts")
         logger.info(f"New contact message from {contact_data.email}")
         
         return ContactResponse(
@@ -56,32 +74,104 @@ async def create_contact_message(
 
 @router.get("/messages", response_model=List[ContactMessage])
 async def get_contact_messages(
+    response: Response,
     limit: int = 50,
-    skip: int = 0,
-    unread_only: bool = False
+    cursor: Optional[str] = None,
+    skip: int = Query(0, deprecated=True),
+    unread_only: bool = False,
+    repo: Repository = Depends(get_repository)
 ):
-    """Get contact messages (admin endpoint)"""
+    """Get contact messages newest first (admin endpoint), paged by ``fetch_page``"""
     try:
-        collection = await get_contact_messages_collection()
+        collection = repo.contact_messages
         
         query = {}
         if unread_only:
             query["is_read"] = False
-        
-        cursor = collection.find(query).sort("timestamp", -1).skip(skip).limit(limit)
-        messages = await cursor.to_list(limit)
+        messages = await fetch_page(collection, query, MESSAGE_SORT, limit, cursor, skip, response)
         
         return [ContactMessage(**msg) for msg in messages]
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching contact messages: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch messages")
 
+@router.get("/messages/export")
+async def export_contact_messages(
+    format: ExportFormat = ExportFormat.ndjson,
+    unread_only: bool = False,
+    since: Optional[datetime] = None,
+    after: Optional[datetime] = None,
+    after_id: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    repo: Repository = Depends(get_repository)
+):
+    """Stream contact messages oldest first as NDJSON or CSV (admin endpoint)"""
+    query = {}
+    if unread_only:
+        query["is_read"] = False
+    if since:
+        query["timestamp"] = {"$gte": since}
+    query = with_resume(query, "timestamp", after, after_id)
+    
+    return export_response(
+        repo.contact_messages, query, "timestamp", list(ContactMessage.model_fields),
+        format, batch_size, "contact_messages"
+    )
+
+@router.patch("/messages/read", response_model=BulkUpdateResponse)
+async def mark_messages_as_read(update: ContactMessageBulkUpdate, repo: Repository = Depends(get_repository)):
+    """Mark many contact messages as read, or unread with ``is_read: false`` (admin endpoint).
+
+    Reports each id as ``updated``, ``unchanged`` (already in that state)
+    or ``not_found``.
+    """
+    try:
+        collection = repo.contact_messages
+        ids = list(dict.fromkeys(update.ids))
+        statuses = {}
+        
+        for start in range(0, len(ids), BULK_CHUNK_SIZE):
+            chunk = ids[start:start + BULK_CHUNK_SIZE]
+            current = {
+                message["id"]: message.get("is_read", False)
+                async for message in collection.find({"id": {"$in": chunk}}, {"_id": 0, "id": 1, "is_read": 1})
+            }
+            changed = [message_id for message_id in chunk if message_id in current and current[message_id] != update.is_read]
+            if changed:
+                await collection.update_many(
+                    {"id": {"$in": changed}},
+                    {"$set": {"is_read": update.is_read}}
+                )
+            for message_id in chunk:
+                if message_id not in current:
+                    statuses[message_id] = "not_found"
+                else:
+                    statuses[message_id] = "updated" if current[message_id] != update.is_read else "unchanged"
+        
+        counts = {status: 0 for status in ("updated", "unchanged", "not_found")}
+        for status in statuses.values():
+            counts[status] += 1
+        if counts["updated"]:
+            response_cache.invalidate("contacts")
+        
+        return BulkUpdateResponse(
+            **counts,
+            results=[BulkItemResult(id=message_id, status=status) for message_id, status in statuses.items()],
+            success=True
+        )
+        
+    except Exception as e:
+        logger.error(f"Error bulk updating messages: {e}")
+        raise HTTPException(status_code=500, detail="Failed to update messages")
+
 @router.patch("/messages/{message_id}/read", response_model=MessageResponse)
-async def mark_message_as_read(message_id: str):
+async def mark_message_as_read(message_id: str, repo: Repository = Depends(get_repository)):
     """Mark a contact message as read (admin endpoint)"""
     try:
-        collection = await get_contact_messages_collection()
+        collection = repo.contact_messages
         
         result = await collection.update_one(
             {"id": message_id},
@@ -91,6 +181,8 @@ async def mark_message_as_read(message_id: str):
         if result.matched_count == 0:
             raise HTTPException(status_code=404, detail="Message not found")
         
+        response_cache.invalidate("contacts")
+        
         return MessageResponse(
             message="Message marked as read",
             success=True
@@ -103,10 +195,11 @@ async def mark_message_as_read(message_id: str):
         raise HTTPException(status_code=500, detail="Failed to update message")
 
 @router.get("/stats")
-async def get_contact_stats():
+@cached(ttl=30, tags=("contacts",))
+async def get_contact_stats(repo: Repository = Depends(get_repository)):
     """Get contact form statistics"""
     try:
-        collection = await get_contact_messages_collection()
+        collection = repo.contact_messages
         
         # Total messages
         total_messages = await collection.count_documents({})
@@ -1,53 +1,93 @@
-from fastapi import APIRouter, HTTPException, Request
-from typing import List
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Request, Response, UploadFile
+from typing import List, Optional
 from datetime import datetime, timedelta
 import logging
 
+from pymongo import ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
 from models import NewsletterSubscription, NewsletterSubscriptionCreate, MessageResponse
-from database import get_newsletter_collection
+from database import Repository, get_repository
+from services.pagination import fetch_page
+from services.bulk_upload import DEFAULT_CHUNK_SIZE, ResultSpool, UploadRow, upload_chunks
+from services.email_validation import validate_emails
+from services.export import DEFAULT_BATCH_SIZE, ExportFormat, export_response, with_resume
+from services.response_cache import cached, response_cache
 
 router = APIRouter(prefix="/newsletter", tags=["Newsletter"])
 logger = logging.getLogger(__name__)
 
+# Served by the (subscribed_at, id) and (is_active, subscribed_at, id) indexes
+SUBSCRIBER_SORT = [("subscribed_at", -1), ("id", -1)]
+
+def _subscribe_update(subscription: NewsletterSubscription) -> list:
+    """Update pipeline creating or reactivating a subscription.
+
+    Fields of an existing document are kept, except that an inactive one is
+    reactivated with a fresh ``subscribed_at``; on insert every field comes
+    from ``subscription``. Caller-supplied strings are wrapped in ``$literal``
+    since pipeline expressions read a leading ``$`` as a field path, and
+    ``EmailStr`` accepts addresses like ``$x@example.com``.
+    """
+    return [{"$set": {
+        "id": {"$ifNull": ["$id", {"$literal": subscription.id}]},
+        "email": {"$literal": subscription.email},
+        "subscribed_at": {"$cond": [
+            {"$eq": ["$is_active", False]},
+            subscription.subscribed_at,
+            {"$ifNull": ["$subscribed_at", subscription.subscribed_at]}
+        ]},
+        "is_active": True,
+        "source": {"$ifNull": ["$source", {"$literal": subscription.source}]}
+    }}]
+
 @router.post("/subscribe", response_model=MessageResponse)
 async def subscribe_to_newsletter(
     subscription_data: NewsletterSubscriptionCreate,
-    request: Request
+    request: Request,
+    repo: Repository = Depends(get_repository)
 ):
     """Subscribe to newsletter"""
     try:
-        collection = await get_newsletter_collection()
-        
-        # Check if email already exists
-        existing_subscription = await collection.find_one({
-            "email": subscription_data.email
-        })
+        collection = repo.newsletter_subscriptions
+        subscription = NewsletterSubscription(**subscription_data.dict())
         
-        if existing_subscription:
-            # Reactivate if previously unsubscribed
-            if not existing_subscription.get("is_active", True):
-                await collection.update_one(
-                    {"email": subscription_data.email},
-                    {"$set": {"is_active": True, "subscribed_at": datetime.utcnow()}}
-                )
-                return MessageResponse(
-                    message="Welcome back! You've been resubscribed to our newsletter.",
-                    success=True
-                )
-            else:
-                return MessageResponse(
-                    message="You're already subscribed to our newsletter!",
-                    success=True
+        # One atomic upsert; the pre-image tells new, returning and current
+        # subscribers apart. Two concurrent upserts of a new email can both
+        # miss and one then hits the unique index, so retry once: the
+        # document exists by then and the retry is a plain update.
+        for attempt in range(2):
+            try:
+                existing_subscription = await collection.find_one_and_update(
+                    {"email": subscription.email},
+                    _subscribe_update(subscription),
+                    projection={"_id": 0, "is_active": 1},
+                    upsert=True,
+                    return_document=ReturnDocument.BEFORE
                 )
+                break
+            except DuplicateKeyError:
+                if attempt:
+                    raise
         
-        # Create new subscription
-        subscription = NewsletterSubscription(**subscription_data.dict())
-        await collection.insert_one(subscription.dict())
+        if existing_subscription is None:
+            response_cache.invalidate("newsletter")
+            logger.info(f"New newsletter subscription: {subscription_data.email}")
+            return MessageResponse(
+                message="Successfully subscribed! You'll receive updates about new cybersecurity articles and insights.",
+                success=True
+            )
         
-        logger.info(f"New newsletter subscription: {subscription_data.email}")
+        # Reactivate if previously unsubscribed
+        if not existing_subscription.get("is_active", True):
+            response_cache.invalidate("newsletter")
+            return MessageResponse(
+                message="Welcome back! You've been resubscribed to our newsletter.",
+                success=True
+            )
         
         return MessageResponse(
-            message="Successfully subscribed! You'll receive updates about new cybersecurity articles and insights.",
+            message="You're already subscribed to our newsletter!",
             success=True
         )
         
@@ -56,20 +96,24 @@ async def subscribe_to_newsletter(
         raise HTTPException(status_code=500, detail="Failed to subscribe. Please try again.")
 
 @router.post("/unsubscribe", response_model=MessageResponse)
-async def unsubscribe_from_newsletter(email: str):
+async def unsubscribe_from_newsletter(email: str, repo: Repository = Depends(get_repository)):
     """Unsubscribe from newsletter"""
     try:
-        collection = await get_newsletter_collection()
+        collection = repo.newsletter_subscriptions
         
-        result = await collection.update_one(
+        existing_subscription = await collection.find_one_and_update(
             {"email": email},
-            {"$set": {"is_active": False}}
+            {"$set": {"is_active": False}},
+            projection={"_id": 0, "is_active": 1},
+            return_document=ReturnDocument.BEFORE
         )
         
-        if result.matched_count == 0:
+        if existing_subscription is None:
             raise HTTPException(status_code=404, detail="Email not found in our subscription list")
         
-        logger.info(f"Newsletter unsubscription: {email}")
+        if existing_subscription.get("is_active", True):
+            response_cache.invalidate("newsletter")
+            logger.info(f"Newsletter unsubscription: {email}")
         
         return MessageResponse(
             message="You've been successfully unsubscribed from our newsletter.",
@@ -84,32 +128,127 @@ async def unsubscribe_from_newsletter(email: str):
 
 @router.get("/subscribers", response_model=List[NewsletterSubscription])
 async def get_newsletter_subscribers(
+    response: Response,
     limit: int = 100,
-    skip: int = 0,
-    active_only: bool = True
+    cursor: Optional[str] = None,
+    skip: int = Query(0, deprecated=True),
+    active_only: bool = True,
+    repo: Repository = Depends(get_repository)
 ):
-    """Get newsletter subscribers (admin endpoint)"""
+    """Get newsletter subscribers newest first (admin endpoint), paged by ``fetch_page``"""
     try:
-        collection = await get_newsletter_collection()
+        collection = repo.newsletter_subscriptions
         
         query = {}
         if active_only:
             query["is_active"] = True
-        
-        cursor = collection.find(query).sort("subscribed_at", -1).skip(skip).limit(limit)
-        subscribers = await cursor.to_list(limit)
+        subscribers = await fetch_page(collection, query, SUBSCRIBER_SORT, limit, cursor, skip, response)
         
         return [NewsletterSubscription(**sub) for sub in subscribers]
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error fetching newsletter subscribers: {e}")
         raise HTTPException(status_code=500, detail="Failed to fetch subscribers")
 
+@router.get("/subscribers/export")
+async def export_newsletter_subscribers(
+    format: ExportFormat = ExportFormat.csv,
+    active_only: bool = True,
+    after: Optional[datetime] = None,
+    after_id: Optional[str] = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    repo: Repository = Depends(get_repository)
+):
+    """Stream newsletter subscribers oldest first as CSV or NDJSON (admin endpoint)"""
+    query = {}
+    if active_only:
+        query["is_active"] = True
+    query = with_resume(query, "subscribed_at", after, after_id)
+    
+    return export_response(
+        repo.newsletter_subscriptions, query, "subscribed_at", list(NewsletterSubscription.model_fields),
+        format, batch_size, "newsletter_subscribers"
+    )
+
+def _validate_subscribers(rows: List[UploadRow], source: str, results: ResultSpool) -> List[tuple]:
+    """``(row, subscription)`` for valid rows; invalid ones are reported.
+
+    Addresses are checked as a batch with the same rules as ``EmailStr``, so
+    subscriptions are built without validating each one again.
+    """
+    parsed = [(row, fields) for row, fields, error in rows if error is None]
+    for row, _, error in rows:
+        if error is not None:
+            results.add(row, "invalid", error=error)
+    
+    valid = []
+    checks = validate_emails(fields.get("email") for _, fields in parsed)
+    for (row, _), (email, error) in zip(parsed, checks):
+        if error is None:
+            valid.append((row, NewsletterSubscription.model_construct(email=email, source=source)))
+        else:
+            results.add(row, "invalid", error=error)
+    return valid
+
+async def _import_subscribers(collection, subscriptions: List[tuple], results: ResultSpool):
+    """Insert new subscribers with one unordered bulk write; existing ones are left untouched"""
+    operations = [
+        UpdateOne({"email": subscription.email}, {"$setOnInsert": subscription.dict()}, upsert=True)
+        for _, subscription in subscriptions
+    ]
+    errors = {}
+    try:
+        upserted = (await collection.bulk_write(operations, ordered=False)).upserted_ids
+    except BulkWriteError as e:
+        upserted = {item["index"]: item["_id"] for item in e.details.get("upserted", [])}
+        errors = {error["index"]: error["errmsg"] for error in e.details.get("writeErrors", [])}
+    except Exception as e:
+        logger.error(f"Error importing newsletter subscribers: {e}")
+        upserted, errors = {}, {index: "Write failed" for index in range(len(operations))}
+    
+    for index, (row, subscription) in enumerate(subscriptions):
+        if index in errors:
+            results.add(row, "error", email=subscription.email, error=errors[index])
+        else:
+            results.add(row, "created" if index in upserted else "exists", email=subscription.email)
+
+@router.post("/subscribers/import")
+async def import_newsletter_subscribers(
+    file: UploadFile = File(...),
+    format: ExportFormat = ExportFormat.csv,
+    source: str = "import",
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    repo: Repository = Depends(get_repository)
+):
+    """Bulk-add subscribers from a CSV or NDJSON upload with an ``email`` field (admin endpoint).
+
+    Rows are validated and written ``chunk_size`` at a time. Existing
+    subscriptions, including unsubscribed ones, are not changed. The
+    response has one NDJSON result per row and a summary line.
+    """
+    results = ResultSpool()
+    collection = repo.newsletter_subscriptions
+    
+    async for rows in upload_chunks(file, format, chunk_size):
+        subscriptions = _validate_subscribers(rows, source, results)
+        if subscriptions:
+            await _import_subscribers(collection, subscriptions, results)
+        await results.write()
+    
+    if results.counts["created"]:
+        response_cache.invalidate("newsletter")
+    logger.info(f"Newsletter import: {dict(results.counts)}")
+    
+    return await results.response("newsletter_import")
+
 @router.get("/stats")
-async def get_newsletter_stats():
+@cached(ttl=30, tags=("newsletter",))
+async def get_newsletter_stats(repo: Repository = Depends(get_repository)):
     """Get newsletter statistics"""
     try:
-        collection = await get_newsletter_collection()
+        collection = repo.newsletter_subscriptions
         
         # Total subscribers
         total_subscribers = await collection.count_documents({})
@@ -0,0 +1 @@
+# Maintenance scripts package initialization
\ No newline at end of file
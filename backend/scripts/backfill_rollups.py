@@ -0,0 +1,33 @@
+"""
+Rebuild page_view_rollups from the raw page_views collection.
+
+With PAGE_VIEW_RETENTION_DAYS set, only buckets that start after the
+retention cutoff are rebuilt; older counters are kept, because their raw
+events are partly or fully expired.
+
+Usage (from the backend directory):
+    MONGO_URL=mongodb://... python -m scripts.backfill_rollups
+"""
+
+import asyncio
+import logging
+
+from database import connect_to_mongo, close_mongo_connection
+from services.rollups import rebuild_rollups
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+async def main():
+    await connect_to_mongo()
+    try:
+        hourly, daily = await rebuild_rollups()
+        logger.info(f"Backfill complete: {hourly} hourly and {daily} daily counters")
+    finally:
+        await close_mongo_connection()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+"""
+Compare deep-page cost of skip/limit and keyset pagination for subscribers.
+
+Seeds a scratch copy of newsletter_subscriptions (same indexes) with
+``--subscribers`` documents, then fetches page 1 and page ``--page`` of the
+active-subscriber listing both ways. For each it reports the wall time and
+the keys/documents Mongo examined according to ``explain``. Keyset pages
+examine ``limit + 1`` keys wherever they are; skip pages examine
+``skip + limit + 1``. The scratch collection is dropped afterwards.
+
+Usage (from the backend directory, against a real server):
+    MONGO_URL=mongodb://... python -m scripts.bench_admin_pagination --page 1000
+"""
+
+import argparse
+import asyncio
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from routes.newsletter import SUBSCRIBER_SORT
+from services.pagination import encode_cursor, keyset_filter
+
+SCRATCH_COLLECTION = "bench_newsletter_subscriptions"
+
+async def seed(collection, count: int):
+    await collection.drop()
+    await collection.create_indexes([
+        IndexModel([("email", ASCENDING)], unique=True),
+        IndexModel([("subscribed_at", DESCENDING), ("id", DESCENDING)]),
+        IndexModel([("is_active", ASCENDING), ("subscribed_at", DESCENDING), ("id", DESCENDING)])
+    ])
+    start = datetime.utcnow() - timedelta(days=365)
+    batch = []
+    for i in range(count):
+        batch.append({
+            "id": str(uuid.uuid4()),
+            "email": f"subscriber{i}@example.com",
+            # Every tenth timestamp is shared with its neighbour to exercise the id tie-break
+            "subscribed_at": start + timedelta(seconds=i - 1 if i % 10 == 1 else i),
+            "is_active": i % 20 != 0,
+            "source": "benchmark"
+        })
+        if len(batch) == 10000:
+            await collection.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await collection.insert_many(batch, ordered=False)
+
+async def examined(collection, query: dict, skip: int, limit: int) -> str:
+    find = collection.find(query).sort(SUBSCRIBER_SORT).skip(skip).limit(limit + 1)
+    plan = await find.explain()
+    stats = plan.get("executionStats", {})
+    return f"keys={stats.get('totalKeysExamined')} docs={stats.get('totalDocsExamined')}"
+
+async def timed(collection, query: dict, skip: int, limit: int, repeat: int):
+    best = float("inf")
+    documents = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        documents = await collection.find(query).sort(SUBSCRIBER_SORT).skip(skip).limit(limit + 1).to_list(limit + 1)
+        best = min(best, time.perf_counter() - started)
+    return best, documents
+
+async def main():
+    parser = argparse.ArgumentParser(description="Skip vs keyset pagination benchmark")
+    parser.add_argument("--subscribers", type=int, default=200000)
+    parser.add_argument("--page", type=int, default=1000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+    collection = client[os.environ.get("DB_NAME", "portfolio")][SCRATCH_COLLECTION]
+    base_query = {"is_active": True}
+    try:
+        print(f"Seeding {args.subscribers} subscribers...")
+        await seed(collection, args.subscribers)
+
+        # Walk to the target page with keyset cursors to obtain its cursor
+        cursor_query = dict(base_query)
+        for page_number in range(1, args.page):
+            page = await collection.find(cursor_query, {"subscribed_at": 1, "id": 1}) \
+                .sort(SUBSCRIBER_SORT).limit(args.limit).to_list(args.limit)
+            if len(page) < args.limit:
+                raise SystemExit(f"Only {page_number} pages available; seed more subscribers")
+            last = page[-1]
+            cursor_query = {**base_query, **keyset_filter("subscribed_at", last["subscribed_at"], last["id"])}
+        print(f"cursor for page {args.page}: {encode_cursor(last['subscribed_at'], last['id'])}")
+
+        skip = (args.page - 1) * args.limit
+        rows = [
+            ("page 1", base_query, 0),
+            (f"page {args.page} skip", base_query, skip),
+            (f"page {args.page} keyset", cursor_query, 0)
+        ]
+        results = {}
+        for label, query, skip_count in rows:
+            seconds, documents = await timed(collection, query, skip_count, args.limit, args.repeat)
+            results[label] = [document["id"] for document in documents]
+            plan = await examined(collection, query, skip_count, args.limit)
+            print(f"{label:<22}{seconds * 1000:>9.2f} ms   {plan}")
+
+        same = results[f"page {args.page} skip"] == results[f"page {args.page} keyset"]
+        print(f"skip and keyset return the same page: {same}")
+    finally:
+        await collection.drop()
+        client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
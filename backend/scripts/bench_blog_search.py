@@ -0,0 +1,84 @@
+"""
+Compare the inverted-index blog search with a linear substring scan.
+
+Builds a synthetic corpus (10,000 posts by default) and times both
+approaches over the same queries. No database is required.
+
+Usage (from the backend directory):
+    python -m scripts.bench_blog_search [post_count]
+"""
+
+import random
+import sys
+import time
+
+from services.search_index import BlogSearchIndex
+
+DOMAIN_WORDS = (
+    "threat hunting siem detection engineering mitre attack malware phishing "
+    "ransomware incident response forensics cloud kubernetes zero trust "
+    "identity automation python pipelines middleware intelligence soc apt "
+    "vulnerability exploit patching olympics infrastructure voice assistant"
+).split()
+
+QUERIES = ["threat", "ransom", "zero trust", "mitre attack", "kubernetes forensics", "xyzzy"]
+
+def make_posts(count: int) -> list:
+    """Posts drawn from a Zipf-distributed vocabulary, like real prose"""
+    rng = random.Random(42)
+    vocabulary = DOMAIN_WORDS + [
+        "".join(rng.choices("abcdefghijklmnopqrstuvwxyz", k=rng.randint(4, 10)))
+        for _ in range(20000)
+    ]
+    rng.shuffle(vocabulary)
+    weights = [1 / rank for rank in range(1, len(vocabulary) + 1)]
+
+    def words(k: int) -> list:
+        return rng.choices(vocabulary, weights=weights, k=k)
+
+    return [
+        {
+            "id": str(i),
+            "title": " ".join(words(6)).title(),
+            "excerpt": " ".join(words(30)),
+            "tags": [word.title() for word in words(4)]
+        }
+        for i in range(count)
+    ]
+
+def linear_scan(posts: list, query: str, limit: int) -> tuple:
+    """The previous /blog/search implementation"""
+    query_lower = query.lower()
+    matching_posts = [
+        post for post in posts
+        if (query_lower in post["title"].lower() or
+            query_lower in post["excerpt"].lower() or
+            any(query_lower in tag.lower() for tag in post["tags"]))
+    ]
+    return matching_posts[:limit], len(matching_posts)
+
+def timed(function, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat * 1000
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    posts = make_posts(count)
+
+    start = time.perf_counter()
+    index = BlogSearchIndex()
+    for post in posts:
+        index.add(post)
+    print(f"Indexed {count} posts in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    print(f"{'query':<24}{'scan ms':>10}{'index ms':>10}{'matches':>10}")
+    for query in QUERIES:
+        scan_ms = timed(lambda: linear_scan(posts, query, 10), 20)
+        index_ms = timed(lambda: index.search(query, 10), 20)
+        _, matches = index.search(query, 10)
+        print(f"{query:<24}{scan_ms:>10.3f}{index_ms:>10.3f}{matches:>10}")
+
+if __name__ == "__main__":
+    main()
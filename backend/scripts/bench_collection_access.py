@@ -0,0 +1,56 @@
+"""
+Measure the per-request cost of obtaining a collection handle.
+
+Compares the previous pattern (awaiting an async getter that awaits
+get_database() and derives the collection with its options) against the
+startup-bound Repository handed out by the get_repository dependency.
+No database server is needed; Motor clients connect lazily.
+
+Usage (from the backend directory):
+    python -m scripts.bench_collection_access [iterations]
+"""
+
+import asyncio
+import sys
+import time
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.read_preferences import SecondaryPreferred
+
+from database import Repository, db, get_repository
+
+READ_PREFERENCE = SecondaryPreferred()
+
+async def legacy_get_database():
+    return db.database
+
+async def legacy_get_page_views_collection():
+    """The getter pattern routes used before the repository"""
+    db_instance = await legacy_get_database()
+    return db_instance.get_collection("page_views", read_preference=READ_PREFERENCE)
+
+async def measure(label: str, access, iterations: int) -> float:
+    start = time.perf_counter_ns()
+    for _ in range(iterations):
+        await access()
+    per_call = (time.perf_counter_ns() - start) / iterations
+    print(f"{label:<36}{per_call:>10.0f} ns/call")
+    return per_call
+
+async def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    db.client = AsyncIOMotorClient("mongodb://localhost:27017", connect=False)
+    db.database = db.client["benchmark"]
+    db.repository = Repository(db.database, read_preferences={"page_views": READ_PREFERENCE})
+
+    async def repository_access():
+        repo = await get_repository()
+        return repo.page_views
+
+    legacy = await measure("await get_page_views_collection()", legacy_get_page_views_collection, iterations)
+    current = await measure("(await get_repository()).page_views", repository_access, iterations)
+    print(f"saved {legacy - current:.0f} ns per collection access")
+    db.client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+"""
+Compare per-object EmailStr validation with the batch email validation service.
+
+Generates ``--count`` synthetic addresses shaped like an imported mailing
+list: a few thousand domains with a skewed distribution, mixed-case
+domains, repeated addresses and a share of invalid rows (missing @-sign,
+bad domains, stray spaces). Then it validates them:
+
+- model:  ``NewsletterSubscriptionCreate(email=...)`` per address, as the
+          subscribe endpoint does
+- batch:  ``services.email_validation.validate_emails`` over the whole list
+
+It prints the time per address and checks that both paths accept the same
+addresses with the same normalized form and reject the rest with the
+same message.
+
+Usage (from the backend directory; no database needed):
+    python -m scripts.bench_email_validation --count 1000000
+"""
+
+import argparse
+import random
+import string
+import time
+
+from pydantic import ValidationError
+
+from models import NewsletterSubscriptionCreate
+from services.email_validation import _validate_domain, domain_cache_stats, validate_emails
+
+TLDS = ["com", "net", "org", "io", "de", "co.uk", "in", "fr", "dev", "security"]
+INVALID = ["not-an-email", "john.doe", "jane@", "@example.com", "a b@example.com", "user@localhost", "user@-bad-.com", "user@exa mple.com", ""]
+
+def synthetic_addresses(count: int, domains: int, invalid_share: float, duplicate_share: float, seed: int = 42):
+    rng = random.Random(seed)
+    names = [
+        "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 10))) + f".{rng.choice(TLDS)}"
+        for _ in range(domains)
+    ]
+    weights = [1 / (rank + 1) for rank in range(domains)]
+    addresses = []
+    for _ in range(count):
+        roll = rng.random()
+        if roll < invalid_share:
+            addresses.append(rng.choice(INVALID))
+        elif addresses and roll < invalid_share + duplicate_share:
+            addresses.append(rng.choice(addresses))
+        else:
+            local = f"{rng.choice(['john', 'jane', 'sec', 'admin', 'ops', 'x'])}.{rng.randrange(10 ** 7)}"
+            domain = rng.choices(names, weights)[0]
+            addresses.append(f"{local}@{domain.upper() if rng.random() < 0.05 else domain}")
+    return addresses
+
+def validate_models(addresses):
+    results = []
+    for address in addresses:
+        try:
+            results.append((NewsletterSubscriptionCreate(email=address).email, None))
+        except ValidationError as e:
+            results.append((None, e.errors()[0]["msg"]))
+    return results
+
+def timed(label: str, func, addresses):
+    started = time.perf_counter()
+    results = func(addresses)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<8} {elapsed:8.2f} s  {elapsed / len(addresses) * 1e6:7.2f} us/address  {len(addresses) / elapsed:10.0f} addresses/s")
+    return results, elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description="Email validation benchmark")
+    parser.add_argument("--count", type=int, default=1000000)
+    parser.add_argument("--domains", type=int, default=5000)
+    parser.add_argument("--invalid-share", type=float, default=0.03)
+    parser.add_argument("--duplicate-share", type=float, default=0.05)
+    args = parser.parse_args()
+
+    addresses = synthetic_addresses(args.count, args.domains, args.invalid_share, args.duplicate_share)
+    print(f"{len(addresses)} addresses, {len(set(addresses))} distinct")
+
+    expected, model_time = timed("model", validate_models, addresses)
+    # Start the batch run with an empty domain cache
+    _validate_domain.cache_clear()
+    actual, batch_time = timed("batch", validate_emails, addresses)
+
+    mismatches = sum(1 for a, b in zip(expected, actual) if a != b)
+    valid = sum(1 for email, _ in actual if email is not None)
+    print(f"speedup  {model_time / batch_time:.1f}x  valid {valid}  mismatches {mismatches}")
+    print(domain_cache_stats())
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""
+Simple closed-loop HTTP load generator for the portfolio API.
+
+Keeps ``--concurrency`` requests in flight for ``--duration`` seconds and
+reports throughput and latency percentiles. Used to compare launcher
+settings (e.g. WEB_CONCURRENCY=1/2/4) against the same endpoint.
+
+Usage (from the backend directory, against a running server):
+    python -m scripts.bench_http --url http://localhost:8001/api/blog/posts
+    python -m scripts.bench_http --method POST \\
+        --url "http://localhost:8001/api/analytics/track?page=home"
+"""
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Tuple
+
+import requests
+
+def worker(url: str, method: str, deadline: float) -> Tuple[List[float], int]:
+    """Issue requests back-to-back until the deadline"""
+    session = requests.Session()
+    latencies = []
+    errors = 0
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        try:
+            response = session.request(method, url, timeout=10)
+            if response.status_code >= 400:
+                errors += 1
+        except requests.RequestException:
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+    return latencies, errors
+
+def percentile(values: List[float], fraction: float) -> float:
+    index = min(int(len(values) * fraction), len(values) - 1)
+    return values[index]
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP load generator")
+    parser.add_argument("--url", required=True)
+    parser.add_argument("--method", default="GET")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=30.0)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    deadline = started + args.duration
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        futures = [pool.submit(worker, args.url, args.method, deadline) for _ in range(args.concurrency)]
+        results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for thread_latencies, _ in results for latency in thread_latencies)
+    errors = sum(thread_errors for _, thread_errors in results)
+    if not latencies:
+        print("No requests completed")
+        return
+
+    print(f"{args.method} {args.url}")
+    print(f"requests:   {len(latencies)} ({errors} errors) in {elapsed:.1f}s")
+    print(f"throughput: {len(latencies) / elapsed:.0f} req/s")
+    for label, fraction in (("p50", 0.50), ("p90", 0.90), ("p99", 0.99)):
+        print(f"{label}:        {percentile(latencies, fraction) * 1000:.2f} ms")
+
+if __name__ == "__main__":
+    main()
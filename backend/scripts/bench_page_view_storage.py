@@ -0,0 +1,116 @@
+"""
+Compare insert throughput and storage size of the page_views layouts.
+
+Writes the same synthetic page views into two scratch collections:
+
+- plain:      a regular collection with the indexes the old layout used
+              (timestamp, page, ip_address)
+- timeseries: a time-series collection with the current indexes
+
+Documents are inserted with ``insert_many(ordered=False)`` in batches of
+``--batch-size``, the way the page view buffer flushes. The script prints
+events/s and the storage and index sizes reported by ``$collStats``. Both
+scratch collections are dropped afterwards.
+
+Usage (from the backend directory, against a real MongoDB 6.0+ server):
+    MONGO_URL=mongodb://... python -m scripts.bench_page_view_storage --events 1000000
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from database import page_views_timeseries_options
+
+PAGES = ["home", "about", "experience", "projects", "blog", "contact", "research", "youtube"]
+REFERRERS = ["", "https://www.google.com/", "https://www.linkedin.com/", "https://github.com/", "https://t.co/"]
+USER_AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36",
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 14_2) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.2 Safari/605.1.15",
+    "Mozilla/5.0 (iPhone; CPU iPhone OS 17_2 like Mac OS X) AppleWebKit/605.1.15 (KHTML, like Gecko) Mobile/15E148"
+]
+
+def synthetic_views(count: int, days: int):
+    """Page views spread evenly over ``days``, in timestamp order"""
+    start = datetime.utcnow() - timedelta(days=days)
+    step = timedelta(days=days) / count
+    rng = random.Random(42)
+    for i in range(count):
+        yield {
+            "id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "page": rng.choice(PAGES),
+            "timestamp": start + step * i,
+            "ip_address": f"10.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(256)}",
+            "user_agent": rng.choice(USER_AGENTS),
+            "referrer": rng.choice(REFERRERS)
+        }
+
+async def load(collection, count: int, days: int, batch_size: int) -> float:
+    started = time.perf_counter()
+    batch = []
+    for document in synthetic_views(count, days):
+        batch.append(document)
+        if len(batch) == batch_size:
+            await collection.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await collection.insert_many(batch, ordered=False)
+    return time.perf_counter() - started
+
+async def storage(collection) -> dict:
+    stats = await collection.aggregate([{"$collStats": {"storageStats": {}}}]).to_list(1)
+    return stats[0]["storageStats"]
+
+async def main():
+    parser = argparse.ArgumentParser(description="page_views layout benchmark")
+    parser.add_argument("--events", type=int, default=1000000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+    database = client[os.environ.get("DB_NAME", "portfolio")]
+    plain = database["bench_page_views_plain"]
+    timeseries = database["bench_page_views_timeseries"]
+    try:
+        await plain.drop()
+        await timeseries.drop()
+        await plain.create_indexes([
+            IndexModel([("timestamp", DESCENDING)]),
+            IndexModel([("page", ASCENDING)]),
+            IndexModel([("ip_address", ASCENDING)])
+        ])
+        options = page_views_timeseries_options()
+        options.pop("expireAfterSeconds", None)
+        await database.create_collection(timeseries.name, **options)
+        await timeseries.create_indexes([
+            IndexModel([("timestamp", DESCENDING), ("id", DESCENDING)]),
+            IndexModel([("page", ASCENDING), ("timestamp", DESCENDING)])
+        ])
+
+        print(f"{args.events} events over {args.days} days, batches of {args.batch_size}")
+        print(f"{'layout':<12}{'events/s':>12}{'storage MB':>14}{'index MB':>12}{'bytes/event':>14}")
+        for label, collection in (("plain", plain), ("timeseries", timeseries)):
+            seconds = await load(collection, args.events, args.days, args.batch_size)
+            stats = await storage(collection)
+            total = stats.get("storageSize", 0) + stats.get("totalIndexSize", 0)
+            print(
+                f"{label:<12}{args.events / seconds:>12.0f}"
+                f"{stats.get('storageSize', 0) / 2**20:>14.1f}"
+                f"{stats.get('totalIndexSize', 0) / 2**20:>12.1f}"
+                f"{total / args.events:>14.1f}"
+            )
+    finally:
+        await plain.drop()
+        await timeseries.drop()
+        client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
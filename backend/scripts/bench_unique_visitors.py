@@ -0,0 +1,78 @@
+"""
+Compare HyperLogLog unique-visitor counts with an exact distinct count.
+
+For each cardinality, feeds the same synthetic visitor IPs (each seen
+several times) into a Python set and into a HyperLogLog sketch. It reports
+the relative error, the time per view and the memory held by each, plus the
+stored (compressed) sketch size. It also times merging a month of daily
+sketches, which is what the analytics summary does per window.
+No database server is needed.
+
+Usage (from the backend directory):
+    python -m scripts.bench_unique_visitors [max_visitors]
+"""
+
+import random
+import sys
+import time
+import tracemalloc
+
+from services.hyperloglog import HyperLogLog
+
+def visitor_stream(visitors: int, views_per_visitor: int = 3):
+    rng = random.Random(visitors)
+    ips = [f"{rng.randrange(1, 224)}.{rng.randrange(256)}.{rng.randrange(256)}.{rng.randrange(256)}" for _ in range(visitors)]
+    # Repeat visits, shuffled like real traffic
+    stream = ips * views_per_visitor
+    rng.shuffle(stream)
+    return stream
+
+def measure(build, stream):
+    """Time one build, then measure peak memory of a second (tracing slows it down)"""
+    started = time.perf_counter()
+    result = build(stream)
+    elapsed = time.perf_counter() - started
+    tracemalloc.start()
+    build(stream)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+def exact(stream):
+    return set(stream)
+
+def sketch(stream):
+    hll = HyperLogLog()
+    hll.update(stream)
+    return hll
+
+def main():
+    max_visitors = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    cardinalities = [n for n in (100, 1000, 10000, 100000, 1000000, 10000000) if n <= max_visitors]
+
+    print(f"{'visitors':>10}{'estimate':>11}{'error':>9}{'set ns/view':>13}{'hll ns/view':>13}"
+          f"{'set KiB':>11}{'hll KiB':>9}{'stored B':>10}")
+    for visitors in cardinalities:
+        stream = visitor_stream(visitors)
+        distinct, set_seconds, set_peak = measure(exact, stream)
+        hll, hll_seconds, hll_peak = measure(sketch, stream)
+        estimate = hll.count()
+        error = (estimate - len(distinct)) / len(distinct)
+        print(
+            f"{len(distinct):>10}{estimate:>11}{error:>+9.2%}"
+            f"{set_seconds / len(stream) * 1e9:>13.0f}{hll_seconds / len(stream) * 1e9:>13.0f}"
+            f"{set_peak / 1024:>11.0f}{hll_peak / 1024:>9.0f}{len(hll.to_bytes()):>10}"
+        )
+
+    # A 30-day window merges 30 daily sketches (per worker)
+    days = [sketch(visitor_stream(2000)) for _ in range(30)]
+    stored = [day.to_bytes() for day in days]
+    started = time.perf_counter()
+    merged = HyperLogLog()
+    for data in stored:
+        merged.merge_registers(HyperLogLog.from_bytes(data).registers)
+    merged.count()
+    print(f"\nmerge + count of 30 stored daily sketches: {(time.perf_counter() - started) * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Compare write latency under the durable and telemetry write concern tiers.
+
+Two workloads run against a scratch collection for each write concern:
+
+- single:  ``--concurrency`` tasks each inserting one document at a time,
+           the way contact messages and subscriptions are written
+- batch:   ``insert_many(ordered=False)`` of ``--batch-size`` documents,
+           the way the page view buffer flushes
+
+The script prints p50/p99/max latency per write and documents/s. With
+``w=0`` the latency only covers handing the write to the socket, so its
+numbers are a lower bound. Differences between ``w=1`` and ``majority``
+only show against a replica set; on a standalone server majority is
+satisfied by the primary alone. The scratch collection is dropped
+afterwards.
+
+Usage (from the backend directory, against a real MongoDB server):
+    MONGO_URL=mongodb://... python -m scripts.bench_write_concern --writes 20000
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.write_concern import WriteConcern
+
+from scripts.bench_page_view_storage import synthetic_views
+
+WRITE_CONCERNS = {
+    "majority,j": WriteConcern(w="majority", j=True),
+    "w=1": WriteConcern(w=1),
+    "w=0": WriteConcern(w=0)
+}
+
+def percentile(samples: list, fraction: float) -> float:
+    return samples[min(int(len(samples) * fraction), len(samples) - 1)]
+
+def report(label: str, latencies: list, documents: int, elapsed: float):
+    latencies.sort()
+    print(
+        f"{label:<24} p50 {percentile(latencies, 0.5) * 1000:8.2f} ms"
+        f"  p99 {percentile(latencies, 0.99) * 1000:8.2f} ms"
+        f"  max {latencies[-1] * 1000:8.2f} ms"
+        f"  {documents / elapsed:10.0f} docs/s"
+    )
+
+async def single_writes(collection, writes: int, concurrency: int) -> tuple:
+    documents = iter(synthetic_views(writes, days=1))
+    latencies = []
+
+    async def worker():
+        for document in documents:
+            started = time.perf_counter()
+            await collection.insert_one(document)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - started
+
+async def batch_writes(collection, writes: int, batch_size: int) -> tuple:
+    documents = list(synthetic_views(writes, days=1))
+    latencies = []
+    started = time.perf_counter()
+    for start in range(0, writes, batch_size):
+        batch_started = time.perf_counter()
+        await collection.insert_many(documents[start:start + batch_size], ordered=False)
+        latencies.append(time.perf_counter() - batch_started)
+    return latencies, time.perf_counter() - started
+
+async def main():
+    parser = argparse.ArgumentParser(description="Write concern tier benchmark")
+    parser.add_argument("--writes", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--batch-size", type=int, default=500)
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(os.environ["MONGO_URL"])
+    database = client[os.environ.get("DB_NAME", "portfolio")]
+    scratch = database["bench_write_concern"]
+
+    try:
+        for name, write_concern in WRITE_CONCERNS.items():
+            collection = scratch.with_options(write_concern=write_concern)
+            await scratch.drop()
+            latencies, elapsed = await single_writes(collection, args.writes, args.concurrency)
+            report(f"single {name}", latencies, args.writes, elapsed)
+
+            await scratch.drop()
+            latencies, elapsed = await batch_writes(collection, args.writes, args.batch_size)
+            report(f"batch {name}", latencies, args.writes, elapsed)
+    finally:
+        await scratch.drop()
+        client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
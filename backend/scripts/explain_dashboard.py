@@ -0,0 +1,88 @@
+"""
+Check that the /analytics/dashboard aggregations are index-backed.
+
+Runs ``explain`` on each dashboard pipeline and exits non-zero if a
+collection scan is planned instead of the expected index. The same check
+runs as tests/test_explain_dashboard.py when MONGO_URL is set.
+
+Usage (from the backend directory):
+    MONGO_URL=mongodb://... python -m scripts.explain_dashboard
+"""
+
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from typing import List, Tuple
+
+from database import connect_to_mongo, close_mongo_connection, get_database
+from routes.analytics import contacts_dashboard_pipeline
+from services.rollups import views_facet_pipeline
+
+def find_index_scans(plan) -> list:
+    """Collect the key patterns of every IXSCAN stage in an explain plan"""
+    found = []
+    if isinstance(plan, dict):
+        if plan.get("stage") == "IXSCAN":
+            found.append(dict(plan.get("keyPattern", {})))
+        for value in plan.values():
+            found.extend(find_index_scans(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            found.extend(find_index_scans(value))
+    return found
+
+async def explain(collection_name: str, pipeline: list) -> dict:
+    database = await get_database()
+    return await database.command({
+        "explain": {"aggregate": collection_name, "pipeline": pipeline, "cursor": {}},
+        "verbosity": "queryPlanner"
+    })
+
+async def check_dashboard_indexes() -> List[Tuple[str, str, list]]:
+    """``(collection, expected field, index scans)`` for each dashboard pipeline"""
+    now = datetime.utcnow()
+    today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    week_start = now - timedelta(days=7)
+    month_start = now - timedelta(days=30)
+
+    checks = [
+        (
+            "contact_messages",
+            contacts_dashboard_pipeline(now, today_start, week_start, month_start),
+            "timestamp"
+        ),
+        (
+            "page_view_rollups",
+            views_facet_pipeline({
+                "today": (today_start, now),
+                "week": (week_start, now),
+                "month": (month_start, now),
+                "total": (None, now)
+            }),
+            "bucket"
+        )
+    ]
+    return [
+        (collection_name, field, find_index_scans(await explain(collection_name, pipeline)))
+        for collection_name, pipeline, field in checks
+    ]
+
+def uses_index(field: str, scans: list) -> bool:
+    return any(field in key_pattern for key_pattern in scans)
+
+async def main() -> int:
+    await connect_to_mongo()
+    try:
+        failures = 0
+        for collection_name, field, scans in await check_dashboard_indexes():
+            if uses_index(field, scans):
+                print(f"OK   {collection_name}: {scans}")
+            else:
+                print(f"FAIL {collection_name}: no index scan on '{field}' (found {scans})")
+                failures += 1
+        return 1 if failures else 0
+    finally:
+        await close_mongo_connection()
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
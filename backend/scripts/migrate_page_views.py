@@ -0,0 +1,123 @@
+"""
+Migrate page_views to the current layout.
+
+Always drops the obsolete single-field indexes (ip_address, page, timestamp)
+that older versions created; the current ones are created on startup.
+
+With --timeseries, converts a plain page_views collection into a
+time-series collection (see database.page_views_timeseries_options):
+
+1. rename page_views to page_views_legacy (atomic),
+2. create the time-series page_views collection,
+3. copy page_views_legacy across in batches, oldest first,
+4. drop page_views_legacy when --drop-legacy is given.
+
+Time-series collections cannot be renamed into place, so views tracked
+between steps 1 and 2 could recreate a plain page_views; the script stops
+if that happens. Run it while the API is stopped or between deploys with
+PAGE_VIEWS_TIMESERIES=true. Copying is resumable: rerunning continues after
+the newest event already present in page_views.
+
+Usage (from the backend directory):
+    MONGO_URL=mongodb://... python -m scripts.migrate_page_views --timeseries [--drop-legacy]
+"""
+
+import argparse
+import asyncio
+import logging
+import time
+
+from database import (
+    close_mongo_connection,
+    connect_to_mongo,
+    db,
+    page_views_layout,
+    page_views_timeseries_options
+)
+from services.export import resume_filter
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+LEGACY_COLLECTION = "page_views_legacy"
+OBSOLETE_INDEXES = ("ip_address_1", "page_1", "timestamp_-1")
+
+async def drop_obsolete_indexes(collection):
+    existing = await collection.index_information()
+    for name in OBSOLETE_INDEXES:
+        if name in existing:
+            await collection.drop_index(name)
+            logger.info(f"Dropped index {collection.name}.{name}")
+
+async def copy_events(source, target, batch_size: int) -> int:
+    """Copy source into target in (timestamp, id) order, continuing after target's newest event.
+
+    Resuming on the pair rather than the timestamp alone keeps events that
+    share the last copied millisecond but fell into the next batch.
+    """
+    newest = await target.find({}, {"timestamp": 1, "id": 1}).sort([("timestamp", -1), ("id", -1)]).limit(1).to_list(1)
+    query = resume_filter("timestamp", newest[0]["timestamp"], newest[0].get("id")) if newest else {}
+
+    copied = 0
+    started = time.perf_counter()
+    batch = []
+    async for document in source.find(query).sort([("timestamp", 1), ("id", 1)]).batch_size(batch_size):
+        document.pop("_id", None)
+        batch.append(document)
+        if len(batch) == batch_size:
+            await target.insert_many(batch, ordered=False)
+            copied += len(batch)
+            batch = []
+            if copied % (batch_size * 100) == 0:
+                logger.info(f"Copied {copied} page views ({copied / (time.perf_counter() - started):.0f}/s)")
+    if batch:
+        await target.insert_many(batch, ordered=False)
+        copied += len(batch)
+    return copied
+
+async def main():
+    parser = argparse.ArgumentParser(description="Migrate page_views to the current layout")
+    parser.add_argument("--timeseries", action="store_true", help="convert page_views to a time-series collection")
+    parser.add_argument("--drop-legacy", action="store_true", help="drop page_views_legacy after copying")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    await connect_to_mongo()
+    try:
+        database = db.database
+        layout = await page_views_layout()
+
+        if layout == "plain":
+            await drop_obsolete_indexes(database.page_views)
+        if not args.timeseries:
+            return
+
+        legacy_exists = LEGACY_COLLECTION in await database.list_collection_names()
+        if layout == "plain":
+            if legacy_exists:
+                raise SystemExit(f"{LEGACY_COLLECTION} already exists; drop or rename it first")
+            await database.page_views.rename(LEGACY_COLLECTION)
+            logger.info(f"Renamed page_views to {LEGACY_COLLECTION}")
+            layout = None
+        if layout is None:
+            await database.create_collection("page_views", **page_views_timeseries_options())
+            logger.info("Created time-series page_views")
+        if await page_views_layout() != "timeseries":
+            raise SystemExit("page_views was recreated as a plain collection during the migration")
+
+        if legacy_exists or layout is None:
+            copied = await copy_events(database[LEGACY_COLLECTION], database.page_views, args.batch_size)
+            logger.info(f"Copied {copied} page views into the time-series collection")
+            if args.drop_legacy:
+                await database[LEGACY_COLLECTION].drop()
+                logger.info(f"Dropped {LEGACY_COLLECTION}")
+        else:
+            logger.info("page_views is already a time-series collection")
+    finally:
+        await close_mongo_connection()
+
+if __name__ == "__main__":
+    asyncio.run(main())
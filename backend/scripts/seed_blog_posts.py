@@ -0,0 +1,38 @@
+"""
+Seed or migrate the blog_posts collection from seed_data.BLOG_POSTS.
+
+Existing posts are left untouched unless --overwrite is given; view
+counts are never reset. Running API workers pick up the changes within
+BLOG_REFRESH_INTERVAL seconds.
+
+Usage (from the backend directory):
+    MONGO_URL=mongodb://... python -m scripts.seed_blog_posts [--overwrite]
+"""
+
+import argparse
+import asyncio
+import logging
+
+from database import connect_to_mongo, close_mongo_connection
+from seed_data import BLOG_POSTS
+from services.blog_store import blog_store
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+async def main(overwrite: bool):
+    await connect_to_mongo()
+    try:
+        changed = await blog_store.seed(BLOG_POSTS, overwrite=overwrite)
+        logger.info(f"Seeded blog_posts: {changed} of {len(BLOG_POSTS)} posts inserted or updated")
+    finally:
+        await close_mongo_connection()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--overwrite", action="store_true", help="replace the content of existing posts")
+    args = parser.parse_args()
+    asyncio.run(main(args.overwrite))
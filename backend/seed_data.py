@@ -0,0 +1,71 @@
+from datetime import datetime
+
+# Seed blog data - in production, this would sync with Medium RSS
+BLOG_POSTS = [
+    {
+        "id": "1",
+        "title": "Advanced Threat Hunting: Beyond Traditional SIEM",
+        "excerpt": "Exploring next-generation threat hunting techniques using behavioral analytics and machine learning to detect sophisticated adversaries.",
+        "date": datetime(2025, 1, 15),
+        "read_time": "8 min read",
+        "tags": ["Threat Hunting", "SIEM", "Machine Learning", "APT"],
+        "category": "Threat Hunting",
+        "status": "coming-soon",
+        "views": 0
+    },
+    {
+        "id": "2", 
+        "title": "Building TAG: AI Guardian for Cybersecurity",
+        "excerpt": "Journey of creating The Autonomous Guardian (TAG) for cybersecurity operations, lessons learned, and practical implementation strategies.",
+        "date": datetime(2025, 1, 20),
+        "read_time": "12 min read",
+        "tags": ["AI", "Cybersecurity", "Automation", "Python"],
+        "category": "AI & Security",
+        "status": "coming-soon",
+        "views": 0
+    },
+    {
+        "id": "3",
+        "title": "MITRE ATT&CK in Practice: Real-world Threat Modeling",
+        "excerpt": "Practical guide to implementing MITRE ATT&CK framework for threat modeling and detection engineering in enterprise environments.",
+        "date": datetime(2025, 2, 5),
+        "read_time": "10 min read",
+        "tags": ["MITRE ATT&CK", "Threat Modeling", "Detection Engineering"],
+        "category": "Frameworks",
+        "status": "coming-soon",
+        "views": 0
+    },
+    {
+        "id": "4",
+        "title": "Olympics 2024: Securing Global Events",
+        "excerpt": "Behind the scenes of cybersecurity operations for Paris 2024 Olympics - challenges, solutions, and lessons for critical infrastructure protection.",
+        "date": datetime(2025, 2, 15),
+        "read_time": "15 min read",
+        "tags": ["Critical Infrastructure", "Event Security", "Olympics", "SOC"],
+        "category": "Case Studies",
+        "status": "coming-soon",
+        "views": 0
+    },
+    {
+        "id": "5",
+        "title": "Data Integration Meets Cybersecurity",
+        "excerpt": "How middleware technologies and data pipeline integration enhance cybersecurity operations and threat intelligence workflows.",
+        "date": datetime(2025, 1, 25),
+        "read_time": "11 min read",
+        "tags": ["Data Integration", "Middleware", "Threat Intelligence", "Pipelines"],
+        "category": "Data Security",
+        "status": "coming-soon",
+        "views": 0
+    },
+    {
+        "id": "6",
+        "title": "Voice-Controlled Security: Building ITACHI",
+        "excerpt": "Developing ITACHI - an intelligent voice automation system for hands-free computing and advanced task automation.",
+        "date": datetime(2025, 2, 20),
+        "read_time": "9 min read",
+        "tags": ["Voice Control", "Automation", "AI Assistant", "Innovation"],
+        "category": "AI & Automation",
+        "status": "coming-soon",
+        "views": 0
+    }
+]
@@ -0,0 +1,85 @@
+"""
+Production launcher for the portfolio API.
+
+Runs gunicorn as a process manager over uvicorn workers. Each worker imports
+the app on its own (no preload), so the lifespan hook gives every worker its
+own AsyncIOMotorClient, buffers and caches. Workers are recycled after
+MAX_REQUESTS (+ jitter) requests and replaced by the arbiter, and SIGTERM
+drains in-flight requests for up to GRACEFUL_TIMEOUT seconds. A replacement
+worker inherits the WORKER_SLOT of the one it replaces, so per-worker state
+stored under the slot (the analytics sketches) is reused, not duplicated.
+
+Environment:
+    HOST / PORT              bind address (0.0.0.0:8001)
+    WEB_CONCURRENCY          worker processes (CPU count)
+    SERVER_LOOP              uvicorn event loop: auto, uvloop or asyncio (auto)
+    SERVER_HTTP              uvicorn HTTP parser: auto, httptools or h11 (auto)
+    MAX_REQUESTS             recycle a worker after this many requests, 0 disables (10000)
+    MAX_REQUESTS_JITTER      random extra requests so workers don't recycle together (1000)
+    GRACEFUL_TIMEOUT         seconds to finish requests on shutdown/recycle (30)
+    KEEPALIVE                keep-alive timeout in seconds (5)
+
+"auto" picks uvloop and httptools when they are installed.
+
+Usage (from the backend directory):
+    python serve.py
+"""
+
+import itertools
+import multiprocessing
+import os
+
+from gunicorn.app.base import BaseApplication
+from uvicorn.workers import UvicornWorker
+
+class PortfolioUvicornWorker(UvicornWorker):
+    CONFIG_KWARGS = {
+        "loop": os.environ.get("SERVER_LOOP", "auto"),
+        "http": os.environ.get("SERVER_HTTP", "auto"),
+        "lifespan": "on",
+        "server_header": False
+    }
+
+def pre_fork(server, worker):
+    """Runs in the arbiter: give the new worker the lowest slot no live worker holds"""
+    taken = {getattr(live, "slot", None) for live in server.WORKERS.values()}
+    worker.slot = next(slot for slot in itertools.count() if slot not in taken)
+
+def post_fork(server, worker):
+    """Runs in the worker before the app is imported"""
+    os.environ["WORKER_SLOT"] = str(worker.slot)
+
+def server_options() -> dict:
+    return {
+        "bind": f"{os.environ.get('HOST', '0.0.0.0')}:{os.environ.get('PORT', '8001')}",
+        "workers": int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count())),
+        "worker_class": "serve.PortfolioUvicornWorker",
+        "max_requests": int(os.environ.get("MAX_REQUESTS", 10000)),
+        "max_requests_jitter": int(os.environ.get("MAX_REQUESTS_JITTER", 1000)),
+        "graceful_timeout": int(os.environ.get("GRACEFUL_TIMEOUT", 30)),
+        "keepalive": int(os.environ.get("KEEPALIVE", 5)),
+        "preload_app": False,
+        "pre_fork": pre_fork,
+        "post_fork": post_fork,
+        "accesslog": None,
+        "loglevel": os.environ.get("LOG_LEVEL", "info")
+    }
+
+class PortfolioServer(BaseApplication):
+    def __init__(self, options: dict):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        from server import app
+        return app
+
+def main():
+    PortfolioServer(server_options()).run()
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,27 @@
 from fastapi import FastAPI, APIRouter, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
 import os
 import logging
 import time
+from datetime import datetime
 from pathlib import Path
 
 # Import database connection functions
-from database import connect_to_mongo, close_mongo_connection
+from database import connect_to_mongo, close_mongo_connection, pool_metrics
+from services.blog_store import blog_store
+from services.email_validation import domain_cache_stats
+from services.health import loop_lag, readiness
+from services.heavy_hitters import heavy_hitters
+from services.metrics import MetricsMiddleware, metrics, pool_collector
+from services.page_view_buffer import page_view_buffer
+from services.profiling import ProfilingMiddleware, profiler
+from services.response_cache import response_cache
+from services.rollups import rollup_counters
+from services.task_queue import task_queue
+from services.view_counter import view_counter
+from services.visitor_sketches import visitor_sketches
 
 # Import route modules
 from routes import contact, newsletter, analytics, blog
@@ -20,6 +33,21 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Component counters exported on /api/metrics
+metrics.register_collector(pool_collector(pool_metrics))
+metrics.register_stats("page_view_buffer", "Page view write-behind buffer", lambda: {**page_view_buffer.stats, "pending": page_view_buffer.pending})
+metrics.register_stats("response_cache", "Response cache", lambda: response_cache.stats)
+metrics.register_stats("blog_store", "Blog index refresh", lambda: blog_store.stats)
+metrics.register_stats("blog_view_counter", "Blog view counter", lambda: view_counter.stats)
+metrics.register_stats("page_view_rollups", "Page view rollup counters", lambda: {**rollup_counters.stats, "pending": rollup_counters.pending})
+metrics.register_stats("visitor_sketches", "Unique visitor sketches", lambda: visitor_sketches.stats)
+metrics.register_stats("heavy_hitters", "Top-K page view summaries", lambda: heavy_hitters.stats)
+metrics.register_stats("event_loop", "Event loop timer lag", loop_lag.snapshot)
+metrics.register_stats("email_validation", "Bulk email validation", domain_cache_stats)
+metrics.register_stats("task_queue", "Background task queue", lambda: {**task_queue.stats, "depth": task_queue.depth, "in_flight": task_queue.in_flight})
+
+STARTED_AT = time.monotonic()
+
 # Lifecycle management
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -32,10 +60,36 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to connect to database: {e}")
         raise
     
+    await blog_store.load()
+    await blog_store.start()
+    page_view_buffer.add_flush_listener(rollup_counters.record_page_views)
+    page_view_buffer.add_flush_listener(visitor_sketches.record_page_views)
+    page_view_buffer.add_flush_listener(heavy_hitters.record_page_views)
+    await page_view_buffer.start()
+    await task_queue.start()
+    await view_counter.start()
+    await visitor_sketches.start()
+    await heavy_hitters.start()
+    await loop_lag.start()
+    if profiler.enabled:
+        await profiler.watchdog.start()
+    
     yield
     
     # Shutdown
     logger.info("Shutting down portfolio backend server...")
+    await loop_lag.stop()
+    await blog_store.stop()
+    if profiler.enabled:
+        await profiler.watchdog.stop()
+    # Drain background tasks first, they may still buffer page views,
+    # then buffered page views before the client goes away
+    await task_queue.stop()
+    await page_view_buffer.stop()
+    await rollup_counters.flush()
+    await view_counter.stop()
+    await visitor_sketches.stop()
+    await heavy_hitters.stop()
     await close_mongo_connection()
 
 # Create FastAPI app with lifespan management
@@ -56,8 +110,17 @@ app.add_middleware(
     allow_origins=["*"],  # In production, specify exact origins
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Opt-in loop watchdog and per-request profiling (PROFILING=true)
+if profiler.enabled:
+    app.add_middleware(ProfilingMiddleware)
+    metrics.register_stats("event_loop_blocked", "Loop watchdog", lambda: {"stalls": profiler.watchdog.stalls})
+
+# Request metrics and access log; outermost so it also times CORS handling
+app.add_middleware(MetricsMiddleware)
+
 # Health check endpoint
 @api_router.get("/")
 async def root():
@@ -69,16 +132,44 @@ async def root():
 
 @api_router.get("/health")
 async def health_check():
-    """Health check endpoint for monitoring"""
-    return {
-        "status": "healthy",
-        "timestamp": "2025-01-13T06:00:00Z",
-        "services": {
-            "database": "connected",
-            "api": "operational"
+    """Health check endpoint for monitoring; 503 while the worker is not ready"""
+    result = await readiness.check()
+    database_status = result["checks"]["database"]["status"]
+    return JSONResponse(
+        status_code=200 if result["ready"] else 503,
+        content={
+            "status": "healthy" if result["ready"] else "unhealthy",
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "services": {
+                "database": "connected" if database_status == "ok" else database_status,
+                "api": "operational"
+            },
+            "checks": result["checks"],
+            "database_pool": pool_metrics.snapshot()
         }
+    )
+
+@api_router.get("/health/live")
+async def liveness_check():
+    """Liveness probe: the worker process is up and serving requests"""
+    return {
+        "status": "alive",
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+        "uptime_seconds": round(time.monotonic() - STARTED_AT, 1),
+        "event_loop": loop_lag.snapshot()
     }
 
+@api_router.get("/health/ready")
+async def readiness_check():
+    """Readiness probe: Mongo reachable, pool not saturated, event loop keeping up"""
+    result = await readiness.check()
+    return JSONResponse(status_code=200 if result["ready"] else 503, content=result)
+
+@api_router.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    """Prometheus metrics for the worker serving this request"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
 # Include route modules
 api_router.include_router(contact.router)
 api_router.include_router(newsletter.router)
@@ -100,30 +191,17 @@ async def global_exception_handler(request: Request, exc: Exception):
         }
     )
 
-# Request logging middleware
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    start_time = time.time()
-    
-    # Process request
-    response = await call_next(request)
-    
-    # Log request details
-    process_time = time.time() - start_time
-    logger.info(
-        f"{request.method} {request.url.path} - "
-        f"Status: {response.status_code} - "
-        f"Time: {process_time:.4f}s"
-    )
-    
-    return response
-
 if __name__ == "__main__":
-    import uvicorn
-    uvicorn.run(
-        "server:app",
-        host="0.0.0.0",
-        port=8001,
-        reload=True,
-        log_level="info"
-    )
\ No newline at end of file
+    # Multi-worker production launcher; RELOAD=true runs the single-process dev server
+    if os.environ.get("RELOAD", "").lower() == "true":
+        import uvicorn
+        uvicorn.run(
+            "server:app",
+            host="0.0.0.0",
+            port=8001,
+            reload=True,
+            log_level="info"
+        )
+    else:
+        from serve import main
+        main()
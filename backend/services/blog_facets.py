@@ -0,0 +1,99 @@
+from typing import Dict, List, Optional, Set, Tuple
+
+class BlogFacetIndex:
+    """Category and tag memberships for blog posts, maintained incrementally.
+
+    Facet values are matched case-insensitively (keyed by their lowercase
+    form) but reported with the spelling they were first indexed under.
+    Count summaries are cached until the next change, so the categories and
+    tags endpoints cost O(facets) at most.
+    """
+
+    def __init__(self):
+        self._posts: Dict[str, Tuple[str, Tuple[str, ...]]] = {}
+        self._categories: Dict[str, Set[str]] = {}
+        self._tags: Dict[str, Set[str]] = {}
+        self._names: Dict[str, str] = {}
+        self._category_summary: Optional[dict] = None
+        self._tag_summary: Optional[dict] = None
+
+    def __len__(self) -> int:
+        return len(self._posts)
+
+    def add(self, post: dict):
+        """Index a post's category and tags, replacing any previous version"""
+        post_id = post["id"]
+        self.remove(post_id)
+
+        category = post.get("category") or ""
+        tags = tuple(dict.fromkeys(post.get("tags") or []))
+        self._posts[post_id] = (category, tags)
+        self._link(self._categories, "category", category, post_id)
+        for tag in tags:
+            self._link(self._tags, "tag", tag, post_id)
+        self._changed()
+
+    def remove(self, post_id: str):
+        facets = self._posts.pop(post_id, None)
+        if facets is None:
+            return
+
+        category, tags = facets
+        self._unlink(self._categories, "category", category, post_id)
+        for tag in tags:
+            self._unlink(self._tags, "tag", tag, post_id)
+        self._changed()
+
+    def filter(self, category: Optional[str] = None, tag: Optional[str] = None) -> Set[str]:
+        """Ids of posts in ``category`` and carrying ``tag`` (either optional)"""
+        candidates = [
+            self._categories.get(category.lower(), set()) if category else None,
+            self._tags.get(tag.lower(), set()) if tag else None
+        ]
+        selected = [ids for ids in candidates if ids is not None]
+        if not selected:
+            return set(self._posts)
+        selected.sort(key=len)
+        return selected[0].intersection(*selected[1:])
+
+    def category_summary(self) -> dict:
+        if self._category_summary is None:
+            counts = {self._names[("category", key)]: len(ids) for key, ids in self._categories.items()}
+            self._category_summary = {
+                "categories": sorted(counts),
+                "category_counts": counts,
+                "total_posts": len(self._posts)
+            }
+        return self._category_summary
+
+    def tag_summary(self) -> dict:
+        if self._tag_summary is None:
+            sorted_tags: List[Tuple[str, int]] = sorted(
+                ((self._names[("tag", key)], len(ids)) for key, ids in self._tags.items()),
+                key=lambda item: (-item[1], item[0])
+            )
+            self._tag_summary = {
+                "tags": [tag for tag, count in sorted_tags],
+                "tag_counts": dict(sorted_tags),
+                "total_tags": len(sorted_tags)
+            }
+        return self._tag_summary
+
+    def _link(self, index: Dict[str, Set[str]], kind: str, value: str, post_id: str):
+        key = value.lower()
+        self._names.setdefault((kind, key), value)
+        index.setdefault(key, set()).add(post_id)
+
+    def _unlink(self, index: Dict[str, Set[str]], kind: str, value: str, post_id: str):
+        key = value.lower()
+        ids = index.get(key)
+        if ids is None:
+            return
+        ids.discard(post_id)
+        if not ids:
+            del index[key]
+            del self._names[(kind, key)]
+
+    def _changed(self):
+        self._category_summary = None
+        self._tag_summary = None
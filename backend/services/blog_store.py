@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from pymongo import UpdateOne
+
+from database import db
+from services.blog_facets import BlogFacetIndex
+from services.search_index import BlogSearchIndex
+
+logger = logging.getLogger(__name__)
+
+# Fields the in-memory indexes need; full documents stay in Mongo
+INDEXED_FIELDS = {"_id": 0, "id": 1, "title": 1, "excerpt": 1, "tags": 1, "category": 1, "date": 1, "status": 1, "updated_at": 1}
+
+class BlogStore:
+    """Keeps per-worker blog indexes in step with the ``blog_posts`` collection.
+
+    Writers stamp posts with ``updated_at``. Every ``refresh_interval``
+    seconds each worker re-reads the posts stamped from ``refresh_overlap``
+    before the newest stamp it has seen, re-indexes those whose stamp
+    changed, and drops posts that are no longer stored, so a re-seed or
+    sync run from any process reaches every worker. The overlap catches
+    posts that become visible after a newer one (one stamp per unordered
+    bulk write, concurrent writers, writer clocks running behind).
+    """
+
+    def __init__(self, refresh_interval: float = 30.0, refresh_overlap: float = 120.0):
+        self.refresh_interval = refresh_interval
+        self.refresh_overlap = timedelta(seconds=refresh_overlap)
+        self.search_index = BlogSearchIndex()
+        self.facets = BlogFacetIndex()
+        # updated_at of the indexed version of each post, and the newest one
+        self._stamps: Dict[str, Optional[datetime]] = {}
+        self._newest: Optional[datetime] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self.stats = {
+            "refreshes": 0,
+            "failed_refreshes": 0,
+            "posts_updated": 0,
+            "posts_removed": 0
+        }
+
+    async def load(self):
+        """Index every stored post, seeding the collection first if it is empty"""
+        collection = db.repository.blog_posts
+        if await collection.estimated_document_count() == 0:
+            from seed_data import BLOG_POSTS
+            await self.seed(BLOG_POSTS)
+
+        self.search_index = BlogSearchIndex()
+        self.facets = BlogFacetIndex()
+        self._stamps = {}
+        self._newest = None
+        async for post in collection.find({}, INDEXED_FIELDS):
+            self._index(post)
+        logger.info(f"Indexed {len(self.search_index)} blog posts")
+
+    async def seed(self, posts: List[dict], overwrite: bool = False) -> int:
+        """Upsert posts by id; existing posts are only changed with ``overwrite``.
+
+        View counts are never reset, so re-seeding a live collection is safe.
+        """
+        collection = db.repository.blog_posts
+        now = datetime.utcnow()
+        operations = []
+        for post in posts:
+            fields = {key: value for key, value in post.items() if key != "views"}
+            fields["updated_at"] = now
+            update = {"$setOnInsert": {"views": post.get("views", 0)}}
+            if overwrite:
+                update["$set"] = fields
+            else:
+                update["$setOnInsert"].update(fields)
+            operations.append(UpdateOne({"id": post["id"]}, update, upsert=True))
+
+        if not operations:
+            return 0
+        result = await collection.bulk_write(operations, ordered=False)
+        return result.upserted_count + result.modified_count
+
+    async def start(self):
+        self._stopping = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._stopping.set()
+            await self._task
+            self._task = None
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.refresh_interval)
+            except asyncio.TimeoutError:
+                pass
+            else:
+                return
+            await self.refresh()
+
+    async def refresh(self):
+        """Apply posts written or deleted since the last load or refresh"""
+        try:
+            collection = db.repository.blog_posts
+            if self._newest is None:
+                query = {"updated_at": {"$exists": True}}
+            else:
+                query = {"updated_at": {"$gte": self._newest - self.refresh_overlap}}
+            async for post in collection.find(query, INDEXED_FIELDS):
+                # Posts re-read inside the overlap are already indexed
+                if self._stamps.get(post["id"], False) != post["updated_at"]:
+                    self._index(post)
+                    self.stats["posts_updated"] += 1
+
+            # Deletes leave nothing to poll for, so compare ids when the index has too many
+            if len(self.search_index) > await collection.count_documents({}):
+                stored = {post["id"] async for post in collection.find({}, {"_id": 0, "id": 1})}
+                for post_id in self.search_index.post_ids() - stored:
+                    self.search_index.remove(post_id)
+                    self.facets.remove(post_id)
+                    del self._stamps[post_id]
+                    self.stats["posts_removed"] += 1
+            self.stats["refreshes"] += 1
+        except Exception as e:
+            self.stats["failed_refreshes"] += 1
+            logger.error(f"Error refreshing blog indexes: {e}")
+
+    def _index(self, post: dict):
+        self.search_index.add(post)
+        self.facets.add(post)
+        updated_at = self._stamps[post["id"]] = post.get("updated_at")
+        if updated_at and (self._newest is None or updated_at > self._newest):
+            self._newest = updated_at
+
+blog_store = BlogStore(
+    refresh_interval=float(os.environ.get("BLOG_REFRESH_INTERVAL", 30.0)),
+    refresh_overlap=float(os.environ.get("BLOG_REFRESH_OVERLAP", 120.0))
+)
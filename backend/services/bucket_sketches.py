@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import os
+import socket
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from pymongo import UpdateOne
+
+from database import db
+from services.time_buckets import DAY, HOUR, truncate_day, truncate_hour
+
+logger = logging.getLogger(__name__)
+
+SketchKey = Tuple[str, datetime, str]
+
+# Identifies this worker's sketch documents; workers never write each other's.
+# Under serve.py a replacement worker inherits the slot of the one it replaces,
+# so recycling reuses documents (the first save merges what is stored) rather
+# than adding a new set per recycle.
+WORKER_ID = f"{socket.gethostname()}:{os.environ.get('WORKER_SLOT') or os.getpid()}"
+
+# Key that values beyond ``max_keys`` in a bucket are folded into
+OVERFLOW_KEY = "(other)"
+
+class WorkerBucketSketches:
+    """Base for mergeable per-worker sketches kept per hour and day bucket.
+
+    Subclasses are page view buffer flush listeners that update in-memory
+    sketches keyed by ``(granularity, bucket, <key_field>)``. Every
+    ``flush_interval`` seconds the sketches that changed are saved with
+    ``$set`` to one document per key and worker. Per-worker documents avoid
+    lost updates between processes, so readers merge all workers' documents
+    for a window. Sketches for past buckets are dropped from memory once
+    saved. At most ``max_keys`` sketches are kept per bucket; later values
+    share an ``(other)`` sketch, so client-supplied keys can't grow memory
+    without bound.
+    """
+
+    collection_name: str
+    key_field: str
+
+    def __init__(self, flush_interval: float = 10.0, max_keys: Optional[int] = None):
+        self.flush_interval = flush_interval
+        self.max_keys = max_keys
+        self._sketches: Dict[SketchKey, Any] = {}
+        self._keys_per_bucket: Counter = Counter()
+        self._dirty: Set[SketchKey] = set()
+        # Sketches created in memory that may already have a stored document
+        self._unloaded: Set[SketchKey] = set()
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self.stats = {
+            "sketches_saved": 0,
+            "flushes": 0,
+            "failed_flushes": 0,
+            "overflowed": 0
+        }
+
+    def new_sketch(self):
+        raise NotImplementedError
+
+    def encode(self, sketch) -> dict:
+        """Fields to ``$set`` on the sketch's document"""
+        raise NotImplementedError
+
+    def merge_stored(self, sketch, document: dict):
+        """Fold a previously saved document for the same key into ``sketch``"""
+        raise NotImplementedError
+
+    async def record_page_views(self, page_views: List[dict]):
+        raise NotImplementedError
+
+    def sketches_for(self, timestamp: datetime, value: str):
+        """The hourly and daily sketches for ``value`` at ``timestamp``, marked changed"""
+        for key in ((HOUR, truncate_hour(timestamp), value), (DAY, truncate_day(timestamp), value)):
+            sketch = self._sketches.get(key)
+            if sketch is None:
+                bucket = key[:2]
+                if self.max_keys is not None and self._keys_per_bucket[bucket] >= self.max_keys:
+                    self.stats["overflowed"] += 1
+                    key = (*bucket, OVERFLOW_KEY)
+                    sketch = self._sketches.get(key)
+                if sketch is None:
+                    sketch = self._sketches[key] = self.new_sketch()
+                    self._keys_per_bucket[bucket] += 1
+                    self._unloaded.add(key)
+            self._dirty.add(key)
+            yield sketch
+
+    @property
+    def collection(self):
+        return getattr(db.repository, self.collection_name)
+
+    async def start(self):
+        self._flush_lock = asyncio.Lock()
+        self._stopping = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush loop and save any remaining changes"""
+        if self._task:
+            self._stopping.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+    async def flush(self):
+        if self._dirty:
+            await self._save()
+        self._evict()
+
+    async def _save(self):
+        async with self._flush_lock:
+            keys, self._dirty = self._dirty, set()
+            collection = self.collection
+            try:
+                # New in-memory sketches may already be stored under this worker
+                # id (a late view for an evicted bucket, or a recycled worker
+                # reusing the slot); merge them so $set doesn't lose data
+                unloaded = keys & self._unloaded
+                if unloaded:
+                    async for stored in collection.find(self._stored_filter(unloaded)):
+                        key = (stored["granularity"], stored["bucket"], stored[self.key_field])
+                        if key in unloaded:
+                            self.merge_stored(self._sketches[key], stored)
+                    self._unloaded -= unloaded
+
+                await collection.bulk_write([
+                    UpdateOne(self._filter(key), {"$set": self.encode(self._sketches[key])}, upsert=True)
+                    for key in keys
+                ], ordered=False)
+                self.stats["sketches_saved"] += len(keys)
+                self.stats["flushes"] += 1
+            except Exception as e:
+                self._dirty |= keys
+                self.stats["failed_flushes"] += 1
+                logger.error(f"Error saving {self.collection_name}: {e}")
+
+    def _evict(self):
+        """Drop saved sketches for buckets that no longer receive live views"""
+        now = datetime.utcnow()
+        horizons = {HOUR: truncate_hour(now) - timedelta(hours=1), DAY: truncate_day(now) - timedelta(days=1)}
+        for key in [key for key in self._sketches if key[1] < horizons[key[0]] and key not in self._dirty]:
+            del self._sketches[key]
+            bucket = key[:2]
+            self._keys_per_bucket[bucket] -= 1
+            if not self._keys_per_bucket[bucket]:
+                del self._keys_per_bucket[bucket]
+
+    def _stored_filter(self, keys: Set[SketchKey]) -> dict:
+        """This worker's documents for ``keys``, one ``$in`` per bucket.
+
+        New sketches mostly appear together at an hour or day rollover, so
+        a flush looks them all up in one round-trip on the unique index.
+        """
+        by_bucket: Dict[Tuple[str, datetime], List[str]] = {}
+        for granularity, bucket, value in keys:
+            by_bucket.setdefault((granularity, bucket), []).append(value)
+        return {"$or": [
+            {"granularity": granularity, "bucket": bucket, self.key_field: {"$in": values}, "worker": WORKER_ID}
+            for (granularity, bucket), values in by_bucket.items()
+        ]}
+
+    def _filter(self, key: SketchKey) -> dict:
+        granularity, bucket, value = key
+        return {"granularity": granularity, "bucket": bucket, self.key_field: value, "worker": WORKER_ID}
@@ -0,0 +1,121 @@
+import csv
+import io
+import json
+from collections import Counter
+from itertools import islice
+from tempfile import SpooledTemporaryFile
+from typing import AsyncIterator, BinaryIO, Iterator, List, Optional, Tuple
+
+from fastapi import UploadFile
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+
+from services.export import ExportFormat
+
+# Rows validated and written per bulk_write
+DEFAULT_CHUNK_SIZE = 1000
+MAX_CHUNK_SIZE = 10000
+
+# Result lines kept in memory before the spool moves to a temporary file
+RESULT_SPOOL_SIZE = 1024 * 1024
+
+# (row number, parsed fields or None, parse error or None)
+UploadRow = Tuple[int, Optional[dict], Optional[str]]
+
+def _parse_rows(source: BinaryIO, upload_format: ExportFormat) -> Iterator[UploadRow]:
+    """Rows of an NDJSON or CSV upload; CSV rows are numbered by line, header included.
+
+    A CSV error ends the upload with one invalid row at the offending line.
+    """
+    text = io.TextIOWrapper(source, encoding="utf-8-sig", newline="")
+    try:
+        if upload_format == ExportFormat.csv:
+            reader = csv.DictReader(text)
+            try:
+                for fields in reader:
+                    yield reader.line_num, fields, None
+            except csv.Error as e:
+                # The reader can't resync after a malformed line (e.g. an
+                # over-long field), so report it and skip the rest
+                yield reader.line_num + 1, None, f"Invalid CSV, rows from here on were not read: {e}"
+            return
+
+        for number, line in enumerate(text, 1):
+            if not line.strip():
+                continue
+            try:
+                fields = json.loads(line)
+            except ValueError as e:
+                yield number, None, f"Invalid JSON: {e}"
+                continue
+            if isinstance(fields, dict):
+                yield number, fields, None
+            else:
+                yield number, None, "Expected a JSON object"
+    except UnicodeDecodeError:
+        yield 0, None, "Upload is not valid UTF-8"
+    finally:
+        # Leave closing the upload to FastAPI
+        text.detach()
+
+async def upload_chunks(
+    upload: UploadFile,
+    upload_format: ExportFormat,
+    chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> AsyncIterator[List[UploadRow]]:
+    """Parse an upload ``chunk_size`` rows at a time.
+
+    Starlette spools uploads larger than 1 MiB to a temporary file, so rows
+    are read in the thread pool and only one chunk is held in memory.
+    """
+    rows = _parse_rows(upload.file, upload_format)
+    chunk_size = max(1, min(chunk_size, MAX_CHUNK_SIZE))
+    while True:
+        chunk = await run_in_threadpool(lambda: list(islice(rows, chunk_size)))
+        if not chunk:
+            return
+        yield chunk
+
+class ResultSpool:
+    """Per-row results of a bulk operation, written as NDJSON.
+
+    Lines stay in memory up to ``RESULT_SPOOL_SIZE`` and then spill to a
+    temporary file, so a large import reports every row without holding
+    all of them. ``response`` appends a summary line with the count of
+    each status and streams the results back.
+    """
+
+    def __init__(self):
+        self.file = SpooledTemporaryFile(max_size=RESULT_SPOOL_SIZE)
+        self.counts = Counter()
+        self._lines: List[Tuple[int, str]] = []
+
+    def add(self, row: int, status: str, **fields):
+        self.counts[status] += 1
+        self._lines.append((row, json.dumps({"row": row, "status": status, **fields}, separators=(",", ":"))))
+
+    async def write(self):
+        """Move the results added since the last call to the spool, in row order"""
+        if self._lines:
+            data = "".join(f"{line}\n" for _, line in sorted(self._lines)).encode()
+            self._lines = []
+            await run_in_threadpool(self.file.write, data)
+
+    async def response(self, filename: str) -> StreamingResponse:
+        await self.write()
+        await run_in_threadpool(self.file.write, (json.dumps({"summary": dict(self.counts)}, separators=(",", ":")) + "\n").encode())
+        await run_in_threadpool(self.file.seek, 0)
+        return StreamingResponse(
+            self._read(),
+            media_type="application/x-ndjson",
+            headers={"Content-Disposition": f'attachment; filename="{filename}.ndjson"'},
+            background=BackgroundTask(self.file.close)
+        )
+
+    async def _read(self) -> AsyncIterator[bytes]:
+        while True:
+            data = await run_in_threadpool(self.file.read, 64 * 1024)
+            if not data:
+                return
+            yield data
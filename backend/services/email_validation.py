@@ -0,0 +1,97 @@
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import email_validator
+from email_validator import EmailSyntaxError
+from email_validator.rfc_constants import CASE_INSENSITIVE_MAILBOX_NAMES, DOT_ATOM_TEXT, EMAIL_MAX_LENGTH
+from email_validator.syntax import validate_email_domain_name
+from pydantic import EmailStr, TypeAdapter, ValidationError
+
+# (normalized address or None, error message or None)
+EmailResult = Tuple[Optional[str], Optional[str]]
+
+# Same limit pydantic applies before calling email-validator
+MAX_INPUT_LENGTH = 2048
+
+_email_str = TypeAdapter(EmailStr)
+
+def _invalid(reason: str) -> EmailResult:
+    return None, f"value is not a valid email address: {reason}"
+
+@lru_cache(maxsize=65536)
+def _validate_domain(domain: str) -> Tuple[Optional[Tuple[str, str]], Optional[str]]:
+    """``((domain, ascii_domain), None)`` or ``(None, reason)``; bulk lists repeat few domains"""
+    try:
+        info = validate_email_domain_name(
+            domain,
+            test_environment=email_validator.TEST_ENVIRONMENT,
+            globally_deliverable=email_validator.GLOBALLY_DELIVERABLE
+        )
+    except EmailSyntaxError as e:
+        return None, str(e.args[0])
+    return (info["domain"], info["ascii_domain"]), None
+
+def _validate_full(value: str) -> EmailResult:
+    try:
+        return _email_str.validate_python(value), None
+    except ValidationError as e:
+        return None, e.errors()[0]["msg"]
+
+def validate_email(value: Any) -> EmailResult:
+    """Validate and normalize one address exactly as ``EmailStr`` does.
+
+    Plain ASCII addresses, nearly all of a subscriber list, take a fast
+    path: the local part is matched against email-validator's own dot-atom
+    pattern and the domain check is cached per domain. Input without an
+    ``@`` is rejected up front. Anything else (display names, quoted or
+    internationalized local parts, domain literals, over-long addresses)
+    goes through full ``EmailStr`` validation.
+    """
+    if not isinstance(value, str):
+        return _validate_full(value)
+    if len(value) > MAX_INPUT_LENGTH or "<" in value or "\r" in value or "\n" in value:
+        return _validate_full(value)
+
+    address = value.strip()
+    local, at, domain = address.rpartition("@")
+    if not at:
+        return _invalid("An email address must have an @-sign.")
+    if not DOT_ATOM_TEXT.match(local) or not domain or domain[0] == "[":
+        return _validate_full(value)
+
+    domains, reason = _validate_domain(domain)
+    if reason is not None:
+        return _invalid(reason)
+    normalized_domain, ascii_domain = domains
+
+    if local.lower() in CASE_INSENSITIVE_MAILBOX_NAMES:
+        local = local.lower()
+    normalized = f"{local}@{normalized_domain}"
+    for form in (address, normalized, f"{local}@{ascii_domain}"):
+        if len(form.encode()) > EMAIL_MAX_LENGTH:
+            # Let email-validator word the length error
+            return _validate_full(value)
+    return normalized, None
+
+def validate_emails(values: Iterable[Any]) -> List[EmailResult]:
+    """Validate a batch, one result per value in order.
+
+    Each distinct value is validated once per batch.
+    """
+    seen: Dict[Any, EmailResult] = {}
+    results = []
+    for value in values:
+        try:
+            result = seen.get(value)
+        except TypeError:
+            # Unhashable input (a list or object from NDJSON) is never valid
+            results.append(_validate_full(value))
+            continue
+        if result is None:
+            result = seen[value] = validate_email(value)
+        results.append(result)
+    return results
+
+def domain_cache_stats() -> dict:
+    info = _validate_domain.cache_info()
+    return {"domain_cache_hits": info.hits, "domain_cache_misses": info.misses, "domain_cache_size": info.currsize}
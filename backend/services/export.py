@@ -0,0 +1,129 @@
+import csv
+import io
+import json
+import logging
+from datetime import datetime
+from enum import Enum
+from typing import AsyncIterator, Optional, Sequence
+
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+# Documents fetched per getMore; also the number of rows encoded per chunk
+DEFAULT_BATCH_SIZE = 1000
+MAX_BATCH_SIZE = 10000
+
+class ExportFormat(str, Enum):
+    ndjson = "ndjson"
+    csv = "csv"
+
+MEDIA_TYPES = {
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.csv: "text/csv; charset=utf-8"
+}
+
+def resume_filter(sort_field: str, after: Optional[datetime], after_id: Optional[str]) -> dict:
+    """Rows strictly after the last one received, in ascending ``(sort_field, id)`` order.
+
+    ``after`` alone resumes after every row with that timestamp; passing the
+    last row's ``id`` as well picks up rows sharing its timestamp.
+    """
+    if after is None:
+        return {}
+    if after_id is None:
+        return {sort_field: {"$gt": after}}
+    return {"$or": [
+        {sort_field: {"$gt": after}},
+        {sort_field: after, "id": {"$gt": after_id}}
+    ]}
+
+def with_resume(query: dict, sort_field: str, after: Optional[datetime], after_id: Optional[str]) -> dict:
+    """``query`` narrowed by ``resume_filter``, keeping its own conditions.
+
+    A query that already filters on ``sort_field`` (a ``since``/``until``
+    window) or has an ``$or`` is combined with ``$and``, so resuming never
+    widens the export.
+    """
+    resume = resume_filter(sort_field, after, after_id)
+    if not resume:
+        return query
+    if any(key in query for key in resume):
+        return {"$and": [query, resume]}
+    return {**query, **resume}
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, (list, dict)):
+        return json.dumps(value, default=_json_default)
+    return value
+
+async def export_rows(
+    collection,
+    query: dict,
+    sort_field: str,
+    fields: Sequence[str],
+    export_format: ExportFormat,
+    batch_size: int = DEFAULT_BATCH_SIZE
+) -> AsyncIterator[str]:
+    """Encode matching documents as NDJSON lines or CSV rows, one chunk per batch.
+
+    The Motor cursor is iterated with ``batch_size``, so at most one batch of
+    documents and one encoded chunk are held in memory whatever the size of
+    the result. A failure after the response has started cannot change the
+    status code, so it is re-raised to abort the connection instead of
+    ending the chunked body cleanly; the client sees an incomplete
+    transfer and resumes from the last complete row.
+    """
+    projection = {"_id": 0, **{field: 1 for field in fields}}
+    cursor = collection.find(query, projection).sort([(sort_field, 1), ("id", 1)]).batch_size(batch_size)
+
+    buffer = io.StringIO()
+    writer = None
+    if export_format == ExportFormat.csv:
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+
+    rows = 0
+    try:
+        async for document in cursor:
+            if writer is None:
+                buffer.write(json.dumps(document, default=_json_default, separators=(",", ":")))
+                buffer.write("\n")
+            else:
+                writer.writerow([_csv_value(document.get(field)) for field in fields])
+            rows += 1
+
+            if rows % batch_size == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    except Exception as e:
+        logger.error(f"Export of {collection.name} aborted after {rows} rows: {e}")
+        raise
+    finally:
+        await cursor.close()
+
+def export_response(
+    collection,
+    query: dict,
+    sort_field: str,
+    fields: Sequence[str],
+    export_format: ExportFormat,
+    batch_size: int,
+    filename: str
+) -> StreamingResponse:
+    batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+    return StreamingResponse(
+        export_rows(collection, query, sort_field, fields, export_format, batch_size),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format.value}"'}
+    )
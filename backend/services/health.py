@@ -0,0 +1,146 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from datetime import datetime
+from typing import Optional
+
+from database import db, pool_metrics
+
+logger = logging.getLogger(__name__)
+
+class LoopLagMonitor:
+    """Background sampler measuring how late the event loop runs timers.
+
+    Every ``interval`` seconds it sleeps and records how much longer than
+    ``interval`` the sleep actually took. A busy or blocked loop shows up as
+    lag well before requests start timing out.
+    """
+
+    def __init__(self, interval: float = 0.5, window: int = 20):
+        self.interval = interval
+        self.lag = 0.0
+        self._samples: deque = deque(maxlen=window)
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def recent_max(self) -> float:
+        """Worst lag over the last ``window`` samples"""
+        return max(self._samples, default=0.0)
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lag = max(time.perf_counter() - started - self.interval, 0.0)
+            self._samples.append(self.lag)
+
+    def snapshot(self) -> dict:
+        return {
+            "lag_seconds": round(self.lag, 6),
+            "lag_max_seconds": round(self.recent_max, 6)
+        }
+
+loop_lag = LoopLagMonitor(interval=float(os.environ.get("LOOP_LAG_INTERVAL", 0.5)))
+
+class ReadinessProbe:
+    """Decides whether this worker should receive traffic.
+
+    A worker is ready when a real ``ping`` reaches MongoDB within
+    ``ping_timeout``, the connection pool is not saturated and the event loop
+    is keeping up. The result is cached for ``cache_ttl`` seconds and
+    concurrent probes share one check, so frequent load balancer probes cost
+    at most one ping per interval per worker.
+    """
+
+    def __init__(
+        self,
+        cache_ttl: float = 2.0,
+        ping_timeout: float = 1.0,
+        pool_saturation: float = 0.9,
+        max_loop_lag: float = 0.5
+    ):
+        self.cache_ttl = cache_ttl
+        self.ping_timeout = ping_timeout
+        self.pool_saturation = pool_saturation
+        self.max_loop_lag = max_loop_lag
+        self._result: Optional[dict] = None
+        self._expires_at = 0.0
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def check(self) -> dict:
+        if self._result is not None and time.monotonic() < self._expires_at:
+            return self._result
+
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            # Another probe may have refreshed the result while we waited
+            if self._result is None or time.monotonic() >= self._expires_at:
+                self._result = await self._run_checks()
+                self._expires_at = time.monotonic() + self.cache_ttl
+        return self._result
+
+    async def _run_checks(self) -> dict:
+        database = await self._ping()
+        pool = self._pool()
+        event_loop = {
+            **loop_lag.snapshot(),
+            "status": "ok" if loop_lag.recent_max < self.max_loop_lag else "lagging"
+        }
+
+        ready = database["status"] == "ok" and pool["status"] == "ok" and event_loop["status"] == "ok"
+        if not ready:
+            logger.warning(f"Readiness check failed: database={database['status']} "
+                           f"pool={pool['status']} event_loop={event_loop['status']}")
+        return {
+            "ready": ready,
+            "checked_at": datetime.utcnow().isoformat() + "Z",
+            "checks": {
+                "database": database,
+                "pool": pool,
+                "event_loop": event_loop
+            }
+        }
+
+    async def _ping(self) -> dict:
+        if db.client is None:
+            return {"status": "disconnected"}
+
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(db.client.admin.command("ping"), timeout=self.ping_timeout)
+        except asyncio.TimeoutError:
+            return {"status": "timeout", "timeout_seconds": self.ping_timeout}
+        except Exception as e:
+            return {"status": "error", "error": str(e)}
+        return {"status": "ok", "ping_seconds": round(time.perf_counter() - started, 6)}
+
+    def _pool(self) -> dict:
+        utilization = pool_metrics.checked_out / db.max_pool_size if db.max_pool_size else 0.0
+        return {
+            "status": "ok" if utilization < self.pool_saturation else "saturated",
+            "checked_out": pool_metrics.checked_out,
+            "max_pool_size": db.max_pool_size,
+            "utilization": round(utilization, 3)
+        }
+
+readiness = ReadinessProbe(
+    cache_ttl=float(os.environ.get("READINESS_CACHE_SECONDS", 2.0)),
+    ping_timeout=float(os.environ.get("READINESS_PING_TIMEOUT", 1.0)),
+    pool_saturation=float(os.environ.get("READINESS_POOL_SATURATION", 0.9)),
+    max_loop_lag=float(os.environ.get("READINESS_MAX_LOOP_LAG", 0.5))
+)
@@ -0,0 +1,118 @@
+import os
+import re
+from collections import Counter
+from datetime import datetime
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence
+from urllib.parse import urlsplit
+
+from database import db
+from services.bucket_sketches import WorkerBucketSketches
+from services.rollups import window_filter
+from services.space_saving import SpaceSaving
+
+PAGES = "pages"
+REFERRERS = "referrers"
+USER_AGENTS = "user_agents"
+DIMENSIONS = (PAGES, REFERRERS, USER_AGENTS)
+
+# Checked in order; the first match names the family
+USER_AGENT_FAMILIES = [
+    ("Bot", re.compile(r"bot|crawl|spider|slurp|facebookexternalhit|preview", re.IGNORECASE)),
+    ("Edge", re.compile(r"Edg(?:e|A|iOS)?/")),
+    ("Opera", re.compile(r"OPR/|Opera")),
+    ("Samsung Internet", re.compile(r"SamsungBrowser/")),
+    ("Firefox", re.compile(r"Firefox/|FxiOS/")),
+    ("Chrome", re.compile(r"Chrome/|CriOS/")),
+    ("Safari", re.compile(r"Safari/")),
+    ("curl", re.compile(r"^curl/")),
+    ("Script", re.compile(r"python|aiohttp|httpx|Go-http-client|okhttp|axios|node-fetch", re.IGNORECASE))
+]
+
+@lru_cache(maxsize=4096)
+def user_agent_family(user_agent: Optional[str]) -> str:
+    if not user_agent:
+        return "(unknown)"
+    for family, pattern in USER_AGENT_FAMILIES:
+        if pattern.search(user_agent):
+            return family
+    return "Other"
+
+@lru_cache(maxsize=4096)
+def referrer_host(referrer: Optional[str]) -> str:
+    """Referring site without scheme, path, port or leading ``www.``"""
+    if not referrer:
+        return "(direct)"
+    host = urlsplit(referrer if "//" in referrer else f"//{referrer}").hostname or ""
+    if host.startswith("www."):
+        host = host[4:]
+    return host or "(other)"
+
+class HeavyHitters(WorkerBucketSketches):
+    """Per-worker Space-Saving summaries of the most frequent pages, referrer
+    hosts and user-agent families, per hour and day bucket.
+
+    Fed from page view buffer flushes. Each summary holds ``capacity``
+    counters, so a window's top items cost O(buckets x capacity) to read
+    however many views it contains.
+    """
+
+    collection_name = "page_view_heavy_hitters"
+    key_field = "dimension"
+
+    def __init__(self, flush_interval: float = 10.0, capacity: int = 64):
+        super().__init__(flush_interval)
+        self.capacity = capacity
+
+    def new_sketch(self) -> SpaceSaving:
+        return SpaceSaving(self.capacity)
+
+    def encode(self, sketch: SpaceSaving) -> dict:
+        return {"counters": [list(counter) for counter in sketch.top(self.capacity)]}
+
+    def merge_stored(self, sketch: SpaceSaving, document: dict):
+        sketch.merge(document["counters"])
+
+    async def record_page_views(self, page_views: List[dict]):
+        for view in page_views:
+            timestamp = view["timestamp"]
+            values = (
+                (PAGES, view["page"]),
+                (REFERRERS, referrer_host(view.get("referrer"))),
+                (USER_AGENTS, user_agent_family(view.get("user_agent")))
+            )
+            for dimension, value in values:
+                for sketch in self.sketches_for(timestamp, dimension):
+                    sketch.add(value)
+
+async def get_top_items(
+    start: Optional[datetime],
+    end: datetime,
+    limit: int = 10,
+    dimensions: Sequence[str] = DIMENSIONS
+) -> Dict[str, List[dict]]:
+    """Top ``limit`` items per dimension for a window, merged across buckets and workers.
+
+    Counts are exact while a dimension has at most ``capacity`` distinct
+    values per bucket; beyond that each count may overestimate by ``error``.
+    """
+    counts = {dimension: Counter() for dimension in dimensions}
+    errors = {dimension: Counter() for dimension in dimensions}
+    query = {**window_filter(start, end), "dimension": {"$in": list(dimensions)}}
+    async for document in db.repository.page_view_heavy_hitters.find(query, {"_id": 0, "dimension": 1, "counters": 1}):
+        for item, count, error in document["counters"]:
+            counts[document["dimension"]][item] += count
+            errors[document["dimension"]][item] += error
+
+    return {
+        dimension: [
+            {"value": item, "count": count, "error": errors[dimension][item]}
+            for item, count in counts[dimension].most_common(limit)
+        ]
+        for dimension in dimensions
+    }
+
+heavy_hitters = HeavyHitters(
+    flush_interval=float(os.environ.get("TOP_K_FLUSH_INTERVAL", 10.0)),
+    capacity=int(os.environ.get("TOP_K_CAPACITY", 64))
+)
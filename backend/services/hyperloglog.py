@@ -0,0 +1,125 @@
+import hashlib
+import math
+import re
+import zlib
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+# Matches every non-zero register, so merges skip empty ones at C speed
+_NONZERO = re.compile(b"[^\x00]")
+
+class HyperLogLog:
+    """Mergeable distinct-count sketch with ``2**precision`` one-byte registers.
+
+    Standard error is about ``1.04 / sqrt(2**precision)``: 0.8% at the
+    default precision of 14, in 16 KiB of registers regardless of how many
+    values are added. Small cardinalities use linear counting, which is
+    more accurate there. Sketches with the same precision merge by
+    register-wise max, so a window's count is the merge of its buckets.
+
+    A new sketch starts sparse, holding only its non-zero registers in a
+    dict, and switches to the dense ``registers`` array once more than
+    ``2**precision / 128`` are set (about when the dict would outgrow half
+    the array). Pages seen by a handful of visitors stay a few hundred
+    bytes. Counts and the serialized form are the same either way.
+    """
+
+    __slots__ = ("precision", "registers", "sparse")
+
+    def __init__(self, precision: int = 14, registers: Optional[bytearray] = None):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18")
+        self.precision = precision
+        self.registers = registers
+        self.sparse: Optional[Dict[int, int]] = {} if registers is None else None
+
+    @property
+    def is_sparse(self) -> bool:
+        return self.registers is None
+
+    def _set(self, index: int, rank: int):
+        sparse = self.sparse
+        if sparse is None:
+            if rank > self.registers[index]:
+                self.registers[index] = rank
+        elif rank > sparse.get(index, 0):
+            sparse[index] = rank
+            if len(sparse) > (1 << self.precision) >> 7:
+                self._densify()
+
+    def _densify(self):
+        registers = bytearray(1 << self.precision)
+        for index, rank in self.sparse.items():
+            registers[index] = rank
+        self.registers, self.sparse = registers, None
+
+    def add(self, value: str):
+        hashed = int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+        index = hashed >> (64 - self.precision)
+        remainder = hashed & ((1 << (64 - self.precision)) - 1)
+        # Position of the leftmost 1-bit in the remaining 64 - precision bits
+        self._set(index, (64 - self.precision) - remainder.bit_length() + 1)
+
+    def update(self, values: Iterable[str]):
+        for value in values:
+            self.add(value)
+
+    def merge(self, other: "HyperLogLog"):
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge sketches of different precision")
+        if other.is_sparse:
+            for index, rank in other.sparse.items():
+                self._set(index, rank)
+        else:
+            self.merge_registers(other.registers)
+
+    def merge_registers(self, registers: bytes):
+        if len(registers) != 1 << self.precision:
+            raise ValueError("Cannot merge sketches of different precision")
+        matches = _NONZERO.finditer(registers)
+        if self.is_sparse:
+            for match in matches:
+                index = match.start()
+                self._set(index, registers[index])
+                if not self.is_sparse:
+                    break
+        own = self.registers
+        if own is None:
+            return
+        for match in matches:
+            index = match.start()
+            rank = registers[index]
+            if rank > own[index]:
+                own[index] = rank
+
+    def count(self) -> int:
+        m = 1 << self.precision
+        if self.is_sparse:
+            histogram = Counter(self.sparse.values())
+            histogram[0] = m - len(self.sparse)
+        else:
+            histogram = Counter(self.registers)
+        zeros = histogram.get(0, 0)
+        harmonic = sum(count * 2.0 ** -rank for rank, count in histogram.items())
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / harmonic
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)
+        return round(estimate)
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def to_bytes(self) -> bytes:
+        """zlib-compressed registers; sparse sketches shrink to a few hundred bytes"""
+        registers = self.registers
+        if registers is None:
+            registers = bytearray(1 << self.precision)
+            for index, rank in self.sparse.items():
+                registers[index] = rank
+        return zlib.compress(bytes(registers), 1)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HyperLogLog":
+        registers = bytearray(zlib.decompress(data))
+        return cls(precision=len(registers).bit_length() - 1, registers=registers)
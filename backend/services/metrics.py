@@ -0,0 +1,241 @@
+import bisect
+import logging
+import os
+import time
+from collections import deque
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from pymongo.monitoring import CommandListener
+
+logger = logging.getLogger("server")
+
+# Latency bucket upper bounds in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+class Histogram:
+    """Cumulative-on-export histogram with fixed bucket bounds"""
+
+    __slots__ = ("bounds", "counts", "total", "count")
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+
+class MongoCommandTimings(CommandListener):
+    """pymongo command listener feeding per-command latency histograms.
+
+    Events arrive on driver threads, so they are only appended to a deque
+    (atomic under the GIL) and folded into histograms on the event loop when
+    metrics are scraped or the backlog grows, keeping both paths lock-free.
+    """
+
+    def __init__(self, max_backlog: int = 100000):
+        self.events: deque = deque(maxlen=max_backlog)
+        self.histograms: Dict[str, Histogram] = {}
+        self.failures: Dict[str, int] = {}
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        self.events.append((event.command_name, event.duration_micros, False))
+
+    def failed(self, event):
+        self.events.append((event.command_name, event.duration_micros, True))
+
+    def drain(self):
+        events = self.events
+        while events:
+            try:
+                command, micros, failed = events.popleft()
+            except IndexError:
+                break
+            histogram = self.histograms.get(command)
+            if histogram is None:
+                histogram = self.histograms[command] = Histogram()
+            histogram.observe(micros / 1e6)
+            if failed:
+                self.failures[command] = self.failures.get(command, 0) + 1
+
+class MetricsRegistry:
+    """Per-worker request metrics, mutated only from the event loop thread"""
+
+    def __init__(self):
+        self.request_latency: Dict[Tuple[str, str], Histogram] = {}
+        self.request_counts: Dict[Tuple[str, str, int], int] = {}
+        self.in_flight = 0
+        self.mongo = MongoCommandTimings()
+        self._collectors: List[Callable[[], List[str]]] = []
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float):
+        key = (method, route)
+        histogram = self.request_latency.get(key)
+        if histogram is None:
+            histogram = self.request_latency[key] = Histogram()
+        histogram.observe(seconds)
+        count_key = (method, route, status)
+        self.request_counts[count_key] = self.request_counts.get(count_key, 0) + 1
+
+    def register_collector(self, collector: Callable[[], List[str]]):
+        """Add a callable returning extra exposition lines at scrape time"""
+        self._collectors.append(collector)
+
+    def register_stats(self, prefix: str, help_text: str, stats: Callable[[], Dict[str, float]]):
+        """Export a component's ``stats`` dict as ``<prefix>_<key>`` samples"""
+        def collect() -> List[str]:
+            lines = []
+            for key, value in stats().items():
+                name = f"{prefix}_{key}"
+                lines += [f"# HELP {name} {help_text}: {key}", f"# TYPE {name} untyped", f"{name} {value}"]
+            return lines
+        self.register_collector(collect)
+
+    def render(self) -> str:
+        """Prometheus text exposition (format 0.0.4) for this worker"""
+        self.mongo.drain()
+        lines = [
+            "# HELP worker_info Worker process these samples were aggregated in",
+            "# TYPE worker_info gauge",
+            f'worker_info{{pid="{os.getpid()}"}} 1',
+            "# HELP http_requests_in_flight Requests currently being served",
+            "# TYPE http_requests_in_flight gauge",
+            f"http_requests_in_flight {self.in_flight}",
+            "# HELP http_requests_total Requests served by method, route template and status",
+            "# TYPE http_requests_total counter"
+        ]
+        for (method, route, status), count in sorted(self.request_counts.items()):
+            lines.append(f'http_requests_total{{method="{method}",route="{_escape(route)}",status="{status}"}} {count}')
+
+        lines += [
+            "# HELP http_request_duration_seconds Request latency by method and route template",
+            "# TYPE http_request_duration_seconds histogram"
+        ]
+        for (method, route), histogram in sorted(self.request_latency.items()):
+            lines += histogram_lines(
+                "http_request_duration_seconds",
+                f'method="{method}",route="{_escape(route)}"',
+                histogram.bounds, histogram.counts, histogram.total, histogram.count
+            )
+
+        lines += [
+            "# HELP mongodb_command_duration_seconds MongoDB command latency by command name",
+            "# TYPE mongodb_command_duration_seconds histogram"
+        ]
+        for command, histogram in sorted(self.mongo.histograms.items()):
+            lines += histogram_lines(
+                "mongodb_command_duration_seconds",
+                f'command="{command}"',
+                histogram.bounds, histogram.counts, histogram.total, histogram.count
+            )
+        lines += [
+            "# HELP mongodb_command_failures_total Failed MongoDB commands by command name",
+            "# TYPE mongodb_command_failures_total counter"
+        ]
+        for command, count in sorted(self.mongo.failures.items()):
+            lines.append(f'mongodb_command_failures_total{{command="{command}"}} {count}')
+
+        for collector in self._collectors:
+            try:
+                lines += collector()
+            except Exception as e:
+                logger.error(f"Metrics collector {collector.__qualname__} failed: {e}")
+
+        return "\n".join(lines) + "\n"
+
+def histogram_lines(
+    name: str,
+    labels: str,
+    bounds: Sequence[float],
+    counts: Sequence[int],
+    total: float,
+    count: int
+) -> List[str]:
+    """Exposition lines for one histogram series from per-bucket counts"""
+    prefix = f"{labels}," if labels else ""
+    lines = []
+    cumulative = 0
+    for bound, bucket_count in zip(bounds, counts):
+        cumulative += bucket_count
+        lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {count}')
+    suffix = f"{{{labels}}}" if labels else ""
+    lines.append(f"{name}_sum{suffix} {total}")
+    lines.append(f"{name}_count{suffix} {count}")
+    return lines
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+metrics = MetricsRegistry()
+
+class MetricsMiddleware:
+    """ASGI middleware timing every HTTP request with ``perf_counter_ns``.
+
+    Requests are labelled with the matched route template (``/api/blog/posts/{post_id}``),
+    not the raw URL, so label cardinality stays bounded. Also writes the
+    access log line, formatted lazily and only when INFO is enabled.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self.access_log = os.environ.get("ACCESS_LOG", "true").lower() == "true"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        start = time.perf_counter_ns()
+        metrics.in_flight += 1
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.in_flight -= 1
+            seconds = (time.perf_counter_ns() - start) / 1e9
+            route = scope.get("route")
+            template = route.path if route is not None else "unmatched"
+            metrics.observe_request(scope["method"], template, status, seconds)
+            if len(metrics.mongo.events) > 4096:
+                metrics.mongo.drain()
+            if self.access_log and logger.isEnabledFor(logging.INFO):
+                logger.info("%s %s - Status: %d - Time: %.4fs", scope["method"], scope["path"], status, seconds)
+
+def pool_collector(pool_metrics) -> Callable[[], List[str]]:
+    """Collector exporting a database.PoolMetrics listener"""
+    def collect() -> List[str]:
+        lines = [
+            "# HELP mongodb_pool_checked_out Connections currently checked out",
+            "# TYPE mongodb_pool_checked_out gauge",
+            f"mongodb_pool_checked_out {pool_metrics.checked_out}",
+            "# HELP mongodb_pool_connections_open Open pool connections",
+            "# TYPE mongodb_pool_connections_open gauge",
+            f"mongodb_pool_connections_open {pool_metrics.connections_open}",
+            "# HELP mongodb_pool_checkout_failures_total Failed connection checkouts",
+            "# TYPE mongodb_pool_checkout_failures_total counter",
+            f"mongodb_pool_checkout_failures_total {pool_metrics.checkout_failures}",
+            "# HELP mongodb_pool_checkout_wait_seconds Time spent waiting for a pooled connection",
+            "# TYPE mongodb_pool_checkout_wait_seconds histogram"
+        ]
+        observed = sum(pool_metrics.wait_buckets)
+        lines += histogram_lines(
+            "mongodb_pool_checkout_wait_seconds", "",
+            pool_metrics.WAIT_BUCKETS, pool_metrics.wait_buckets,
+            pool_metrics.wait_seconds_total, observed
+        )
+        return lines
+    return collect
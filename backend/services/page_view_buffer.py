@@ -0,0 +1,143 @@
+import asyncio
+import logging
+import os
+from typing import Awaitable, Callable, List, Optional
+
+from pymongo.errors import BulkWriteError
+
+from database import db
+
+logger = logging.getLogger(__name__)
+
+class PageViewBuffer:
+    """In-process write-behind buffer for page view documents.
+
+    Page views are accepted immediately and written to Mongo in batches with
+    ``insert_many(ordered=False)``, either when ``batch_size`` documents are
+    pending or every ``flush_interval`` seconds. At most ``max_pending``
+    documents are held in memory; beyond that new views are dropped and
+    counted rather than blocking the request.
+
+    Listeners registered with ``add_flush_listener`` receive every batch that
+    was written, so derived data can be maintained from the same flush
+    instead of a second pass over ``page_views``.
+    """
+
+    def __init__(self, batch_size: int = 500, flush_interval: float = 1.0, max_pending: int = 10000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: List[dict] = []
+        self._flush_listeners: List[Callable[[List[dict]], Awaitable[None]]] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task] = None
+        self._closing = False
+        self.stats = {
+            "accepted": 0,
+            "dropped": 0,
+            "flushed": 0,
+            "failed": 0,
+            "flushes": 0
+        }
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    def add_flush_listener(self, listener: Callable[[List[dict]], Awaitable[None]]):
+        """Register a coroutine called with each successfully written batch"""
+        self._flush_listeners.append(listener)
+
+    def add(self, document: dict) -> bool:
+        """Queue a page view document; returns False if it was dropped"""
+        if self._closing or len(self._pending) >= self.max_pending:
+            self.stats["dropped"] += 1
+            return False
+
+        self._pending.append(document)
+        self.stats["accepted"] += 1
+
+        if len(self._pending) >= self.batch_size and self._wakeup:
+            self._wakeup.set()
+        return True
+
+    async def start(self):
+        """Start the background flush loop"""
+        self._closing = False
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop accepting views and drain everything still pending"""
+        self._closing = True
+        if self._task:
+            self._wakeup.set()
+            await self._task
+            self._task = None
+        await self.flush(requeue=False)
+        logger.info(f"Page view buffer drained: {self.stats}")
+
+    async def _run(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Page view buffer flush failed: {e}")
+
+    async def flush(self, requeue: bool = True):
+        """Write all pending documents in batches of ``batch_size``"""
+        if not self._pending:
+            return
+
+        async with self._flush_lock:
+            documents, self._pending = self._pending, []
+            collection = db.repository.page_views
+
+            for start in range(0, len(documents), self.batch_size):
+                batch = documents[start:start + self.batch_size]
+                try:
+                    result = await collection.insert_many(batch, ordered=False)
+                    self.stats["flushed"] += len(result.inserted_ids)
+                    await self._notify(batch)
+                except BulkWriteError as e:
+                    # Individual documents were rejected; the rest were written
+                    rejected = {error["index"] for error in e.details.get("writeErrors", [])}
+                    written = [doc for i, doc in enumerate(batch) if i not in rejected]
+                    self.stats["flushed"] += len(written)
+                    self.stats["failed"] += len(rejected)
+                    logger.error(f"Page view batch partially failed: {len(rejected)} rejected")
+                    await self._notify(written)
+                except Exception as e:
+                    logger.error(f"Error writing page view batch: {e}")
+                    self._requeue(documents[start:], requeue)
+                    break
+                finally:
+                    self.stats["flushes"] += 1
+
+    async def _notify(self, batch: List[dict]):
+        for listener in self._flush_listeners:
+            try:
+                await listener(batch)
+            except Exception as e:
+                logger.error(f"Page view flush listener {listener.__qualname__} failed: {e}")
+
+    def _requeue(self, documents: List[dict], requeue: bool):
+        """Put unwritten documents back in front of the buffer, within capacity"""
+        room = max(self.max_pending - len(self._pending), 0) if requeue else 0
+        kept = documents[:room]
+        self._pending = kept + self._pending
+        self.stats["failed"] += len(documents) - len(kept)
+
+page_view_buffer = PageViewBuffer(
+    batch_size=int(os.environ.get("PAGE_VIEW_BATCH_SIZE", 500)),
+    flush_interval=float(os.environ.get("PAGE_VIEW_FLUSH_INTERVAL", 1.0)),
+    max_pending=int(os.environ.get("PAGE_VIEW_MAX_PENDING", 10000))
+)
@@ -0,0 +1,62 @@
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from fastapi import HTTPException, Response
+
+def encode_cursor(sort_value: datetime, item_id: str) -> str:
+    """Opaque keyset token for the last item of a page"""
+    payload = json.dumps({"v": sort_value.isoformat(), "i": item_id}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def decode_cursor(token: str) -> Tuple[datetime, str]:
+    """Inverse of ``encode_cursor``; raises ValueError for malformed tokens"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return datetime.fromisoformat(payload["v"]), str(payload["i"])
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {token}") from e
+
+def keyset_filter(sort_field: str, sort_value: datetime, item_id: str) -> dict:
+    """Items strictly after ``(sort_value, item_id)`` in descending order"""
+    return {"$or": [
+        {sort_field: {"$lt": sort_value}},
+        {sort_field: sort_value, "id": {"$lt": item_id}}
+    ]}
+
+async def fetch_page(
+    collection,
+    query: dict,
+    sort: List[Tuple[str, int]],
+    limit: int,
+    cursor: Optional[str],
+    skip: int,
+    response: Response,
+    **find_options
+) -> List[dict]:
+    """One page of ``query`` in descending ``sort``, a ``[(field, -1), ("id", -1)]`` pair.
+
+    When more items follow, the page's ``X-Next-Cursor`` response header is
+    the ``cursor`` for the next one (400 if a client sends a malformed one).
+    ``skip`` is deprecated, kept for older clients and ignored with a cursor.
+    """
+    sort_field = sort[0][0]
+    if cursor:
+        try:
+            sort_value, item_id = decode_cursor(cursor)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+        query = {**query, **keyset_filter(sort_field, sort_value, item_id)}
+
+    # Fetch one extra item to know whether another page exists
+    find = collection.find(query, **find_options).sort(sort)
+    if skip and not cursor:
+        find = find.skip(skip)
+    items = await find.limit(limit + 1).to_list(limit + 1)
+
+    if len(items) > limit:
+        items = items[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(items[-1][sort_field], items[-1]["id"])
+    return items
@@ -0,0 +1,238 @@
+import asyncio
+import cProfile
+import hmac
+import io
+import logging
+import os
+import pstats
+import random
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class LoopWatchdog:
+    """Detects callbacks that hold the event loop longer than ``threshold``.
+
+    A task on the loop refreshes a heartbeat every ``interval`` seconds and a
+    daemon thread checks it. When the heartbeat is overdue the loop thread is
+    stuck in synchronous code, so the watchdog grabs that thread's stack and
+    the route of the task currently running, then logs the full stall
+    duration once the loop recovers. Costs one timer per ``interval`` on the
+    loop and a thread that mostly sleeps.
+    """
+
+    def __init__(self, threshold: float = 0.1, interval: float = 0.02):
+        self.threshold = threshold
+        self.interval = interval
+        self.stalls = 0
+        self._beat = time.perf_counter()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        # ASGI scope of each in-flight request task, filled in by ProfilingMiddleware
+        self.task_scopes: Dict[asyncio.Task, dict] = {}
+
+    async def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._beat = time.perf_counter()
+        self._stopping.clear()
+        self._task = asyncio.create_task(self._heartbeat())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    async def stop(self):
+        self._stopping.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    async def _heartbeat(self):
+        while True:
+            self._beat = time.perf_counter()
+            await asyncio.sleep(self.interval)
+
+    def _watch(self):
+        stalled_since = None
+        report = None
+        while not self._stopping.wait(self.interval):
+            overdue = time.perf_counter() - self._beat - self.interval
+            if overdue > self.threshold and stalled_since is None:
+                stalled_since = self._beat + self.interval
+                report = self._capture()
+            elif overdue <= self.threshold and stalled_since is not None:
+                self.stalls += 1
+                duration = self._beat - stalled_since
+                route, stack = report
+                logger.warning(
+                    "Event loop blocked for %.3fs while serving %s; loop thread stack:\n%s",
+                    duration, route, stack
+                )
+                stalled_since = None
+
+    def _capture(self):
+        """Route and stack of whatever is holding the loop right now"""
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = "".join(traceback.format_stack(frame)) if frame else "<unavailable>"
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            task = None
+        scope = self.task_scopes.get(task) if task else None
+        if scope is None:
+            return ("<no request>" if task else "<loop callback>"), stack
+        route = scope.get("route")
+        return f"{scope['method']} {route.path if route else scope['path']}", stack
+
+class StackSampler:
+    """Samples one thread's stack every ``interval`` seconds into folded stacks.
+
+    Output lines are ``frame;frame;frame count``, the input format of
+    flamegraph.pl and speedscope.
+    """
+
+    def __init__(self, thread_id: int, interval: float = 0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self) -> str:
+        self._stopping.set()
+        self._thread.join()
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common())
+
+    def _run(self):
+        while not self._stopping.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            frames = []
+            while frame is not None:
+                code = frame.f_code
+                frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            self.samples[";".join(reversed(frames))] += 1
+
+class Profiler:
+    """Opt-in profiling configuration, read from the environment.
+
+    PROFILING              enable the watchdog and per-request profiling (false)
+    PROFILING_BLOCK_THRESHOLD  seconds the loop may be held before logging (0.1)
+    PROFILING_SAMPLE_RATE  fraction of requests profiled automatically (0.0)
+    PROFILING_TOKEN        secret required in X-Profile-Token to profile on demand;
+                           header-triggered profiling is disabled when unset
+    PROFILING_DIR          directory for .prof / .folded files (logs only when unset)
+    """
+
+    def __init__(self):
+        self.enabled = os.environ.get("PROFILING", "false").lower() == "true"
+        self.sample_rate = float(os.environ.get("PROFILING_SAMPLE_RATE", 0.0))
+        self.token = os.environ.get("PROFILING_TOKEN")
+        self.output_dir = os.environ.get("PROFILING_DIR")
+        self.watchdog = LoopWatchdog(threshold=float(os.environ.get("PROFILING_BLOCK_THRESHOLD", 0.1)))
+        # cProfile is process-global, so only one request is profiled at a time
+        self.busy = False
+
+    def mode_for(self, headers: Dict[bytes, bytes]) -> Optional[str]:
+        """Profiling mode requested for a request, if any: "cprofile" or "stack" """
+        if self.busy:
+            return None
+        requested = headers.get(b"x-profile")
+        if requested is not None and self.token:
+            if hmac.compare_digest(headers.get(b"x-profile-token", b""), self.token.encode()):
+                mode = requested.decode().lower()
+                return mode if mode in ("cprofile", "stack") else "cprofile"
+        if self.sample_rate and random.random() < self.sample_rate:
+            return "cprofile"
+        return None
+
+    def save(self, label: str, suffix: str, write) -> Optional[str]:
+        if not self.output_dir:
+            return None
+        os.makedirs(self.output_dir, exist_ok=True)
+        name = f"{int(time.time() * 1000)}-{os.getpid()}-{label.strip('/').replace('/', '_') or 'root'}{suffix}"
+        path = os.path.join(self.output_dir, name)
+        write(path)
+        return path
+
+profiler = Profiler()
+
+class ProfilingMiddleware:
+    """ASGI middleware tagging request tasks for the watchdog and running
+    sampled or header-triggered profiles.
+
+    A profile covers the event loop thread for the duration of the request,
+    so work from concurrently running requests shows up in it as well.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        task = asyncio.current_task()
+        profiler.watchdog.task_scopes[task] = scope
+        mode = profiler.mode_for(dict(scope["headers"]))
+        try:
+            if mode is None:
+                await self.app(scope, receive, send)
+            else:
+                await self._profiled(mode, scope, receive, send)
+        finally:
+            profiler.watchdog.task_scopes.pop(task, None)
+
+    async def _profiled(self, mode: str, scope, receive, send):
+        profiler.busy = True
+        label = f"{scope['method']} {scope['path']}"
+        started = time.perf_counter()
+        try:
+            if mode == "stack":
+                sampler = StackSampler(threading.get_ident())
+                sampler.start()
+                try:
+                    await self.app(scope, receive, send)
+                finally:
+                    folded = sampler.stop()
+                    path = profiler.save(scope["path"], ".folded", lambda p: _write_text(p, folded))
+                    logger.info("Stack profile for %s (%.3fs, %d samples) saved to %s",
+                                label, time.perf_counter() - started, sum(sampler.samples.values()), path)
+            else:
+                profile = cProfile.Profile()
+                profile.enable()
+                try:
+                    await self.app(scope, receive, send)
+                finally:
+                    profile.disable()
+                    path = profiler.save(scope["path"], ".prof", profile.dump_stats)
+                    summary = io.StringIO()
+                    pstats.Stats(profile, stream=summary).sort_stats("cumulative").print_stats(25)
+                    logger.info("cProfile for %s (%.3fs) saved to %s\n%s",
+                                label, time.perf_counter() - started, path, summary.getvalue())
+        finally:
+            profiler.busy = False
+
+def _write_text(path: str, text: str):
+    with open(path, "w") as f:
+        f.write(text)
@@ -0,0 +1,159 @@
+import asyncio
+import functools
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Tuple
+
+from fastapi.encoders import jsonable_encoder
+
+class CacheEntry:
+    __slots__ = ("value", "expires_at", "size", "tags")
+
+    def __init__(self, value: Any, expires_at: float, size: int, tags: Tuple[str, ...]):
+        self.value = value
+        self.expires_at = expires_at
+        self.size = size
+        self.tags = tags
+
+class ResponseCache:
+    """Per-worker TTL cache for read-only endpoint results.
+
+    Entries are evicted least-recently-used once either ``max_entries`` or
+    the approximate ``max_bytes`` budget is exceeded. Concurrent misses for
+    the same key share a single computation, and entries carry tags so
+    write paths can drop everything derived from the data they changed.
+    """
+
+    def __init__(self, max_entries: int = 512, max_bytes: int = 8 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._tag_generations: Dict[str, int] = {}
+        self._bytes = 0
+        self.stats = {
+            "hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "invalidations": 0
+        }
+
+    async def get_or_compute(
+        self,
+        key: Hashable,
+        ttl: float,
+        tags: Tuple[str, ...],
+        compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        entry = self._entries.get(key)
+        if entry is not None:
+            if entry.expires_at > time.monotonic():
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return entry.value
+            self._remove(key)
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats["coalesced"] += 1
+            return await asyncio.shield(inflight)
+
+        self.stats["misses"] += 1
+        # The computation belongs to the cache, not the first caller: if that
+        # request is cancelled (client disconnect), coalesced waiters still
+        # get the result and it is still stored
+        task = asyncio.create_task(self._compute(key, ttl, tags, self._generations(tags), compute))
+        task.add_done_callback(_retrieve_exception)
+        self._inflight[key] = task
+        return await asyncio.shield(task)
+
+    async def _compute(
+        self,
+        key: Hashable,
+        ttl: float,
+        tags: Tuple[str, ...],
+        generations: Tuple[int, ...],
+        compute: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        try:
+            value = await compute()
+        finally:
+            del self._inflight[key]
+
+        # Skip storing if a write invalidated one of our tags mid-computation
+        if generations == self._generations(tags):
+            self._store(key, value, ttl, tags)
+        return value
+
+    def invalidate(self, *tags: str):
+        """Drop every entry carrying any of ``tags``"""
+        for tag in tags:
+            self._tag_generations[tag] = self._tag_generations.get(tag, 0) + 1
+        stale = [key for key, entry in self._entries.items() if set(entry.tags) & set(tags)]
+        for key in stale:
+            self._remove(key)
+        self.stats["invalidations"] += len(stale)
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    def _generations(self, tags: Tuple[str, ...]) -> Tuple[int, ...]:
+        return tuple(self._tag_generations.get(tag, 0) for tag in tags)
+
+    def _store(self, key: Hashable, value: Any, ttl: float, tags: Tuple[str, ...]):
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = CacheEntry(value, time.monotonic() + ttl, size, tags)
+        self._bytes += size
+
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            self.stats["evictions"] += 1
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+def _retrieve_exception(task: asyncio.Task):
+    """Mark a failure retrieved; with every caller cancelled nobody else reads it"""
+    if not task.cancelled():
+        task.exception()
+
+def _estimate_size(value: Any) -> int:
+    """Approximate memory cost of a cached response as its JSON length"""
+    try:
+        return len(json.dumps(jsonable_encoder(value), default=str))
+    except Exception:
+        return 0
+
+response_cache = ResponseCache(
+    max_entries=int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", 512)),
+    max_bytes=int(os.environ.get("RESPONSE_CACHE_MAX_BYTES", 8 * 1024 * 1024))
+)
+
+def cached(ttl: float, tags: Iterable[str] = ()):
+    """Cache an endpoint's result keyed on the endpoint and its parameters.
+
+    Apply below the router decorator; FastAPI passes every parameter as a
+    keyword argument, so the sorted keyword items identify the request.
+    """
+    tags = tuple(tags)
+
+    def decorator(func: Callable[..., Awaitable[Any]]):
+        @functools.wraps(func)
+        async def wrapper(**kwargs):
+            key = (func.__module__, func.__qualname__, tuple(sorted(kwargs.items())))
+            return await response_cache.get_or_compute(key, ttl, tags, lambda: func(**kwargs))
+        return wrapper
+
+    return decorator
@@ -0,0 +1,233 @@
+import logging
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from database import db, retention_seconds
+from services.time_buckets import DAY, HOUR, STEPS, WEEK, truncate, truncate_day, truncate_hour, truncate_week
+
+logger = logging.getLogger(__name__)
+
+class RollupCounters:
+    """Hourly and daily page view counters, fed by page view buffer flushes.
+
+    Registered as a page view buffer flush listener, so each flush costs one
+    unordered ``bulk_write`` of ``$inc`` upserts regardless of batch size.
+    Counts a write fails to apply are kept and added to the next flush, as
+    ``ViewCounter`` does, so a failed write delays them instead of losing them.
+    """
+
+    def __init__(self):
+        self._pending: Counter = Counter()
+        self.stats = {
+            "flushes": 0,
+            "failed_flushes": 0
+        }
+
+    @property
+    def pending(self) -> int:
+        """Counters waiting to be retried"""
+        return len(self._pending)
+
+    async def flush(self):
+        """Retry kept counts; the buffer only calls listeners when it has page views"""
+        await self.record_page_views([])
+
+    async def record_page_views(self, page_views: List[dict]):
+        counts, self._pending = self._pending, Counter()
+        for view in page_views:
+            timestamp = view["timestamp"]
+            counts[(HOUR, truncate_hour(timestamp), view["page"])] += 1
+            counts[(DAY, truncate_day(timestamp), view["page"])] += 1
+
+        if not counts:
+            return
+
+        items = list(counts.items())
+        try:
+            collection = db.repository.page_view_rollups
+            await collection.bulk_write([
+                UpdateOne(
+                    {"granularity": granularity, "bucket": bucket, "page": page},
+                    {"$inc": {"views": views}},
+                    upsert=True
+                )
+                for (granularity, bucket, page), views in items
+            ], ordered=False)
+            self.stats["flushes"] += 1
+        except BulkWriteError as e:
+            # Only the rejected upserts (e.g. two workers creating one bucket) are retried
+            for error in e.details.get("writeErrors", []):
+                key, views = items[error["index"]]
+                self._pending[key] += views
+            self.stats["failed_flushes"] += 1
+            logger.error(f"Page view rollup write partially failed: {len(e.details.get('writeErrors', []))} rejected")
+        except Exception as e:
+            # Keep the counts so the next flush retries them
+            self._pending.update(counts)
+            self.stats["failed_flushes"] += 1
+            logger.error(f"Error writing page view rollups: {e}")
+
+def window_filter(start: Optional[datetime], end: datetime) -> dict:
+    """Rollup filter covering ``[start, end]`` at hour resolution.
+
+    Whole days inside the window are read from daily counters and only the
+    ragged edges from hourly ones, so a window costs O(days + 48) buckets
+    per page. ``start=None`` means "since the beginning".
+    """
+    end_hour = truncate_hour(end)
+    if start is None:
+        day_start = None
+        hour_start = None
+    else:
+        hour_start = truncate_hour(start)
+        day_start = truncate_day(hour_start)
+        if day_start < hour_start:
+            day_start += timedelta(days=1)
+    day_end = truncate_day(end_hour + timedelta(hours=1))
+
+    if day_start is not None and day_start >= day_end:
+        # Window fits inside a single day boundary; hourly counters only
+        return {"granularity": HOUR, "bucket": {"$gte": hour_start, "$lte": end_hour}}
+
+    day_range = {"$lt": day_end}
+    if day_start is not None:
+        day_range["$gte"] = day_start
+
+    clauses = [
+        {"granularity": DAY, "bucket": day_range},
+        {"granularity": HOUR, "bucket": {"$gte": day_end, "$lte": end_hour}}
+    ]
+    if day_start is not None:
+        clauses.append({"granularity": HOUR, "bucket": {"$gte": hour_start, "$lt": day_start}})
+    return {"$or": clauses}
+
+async def get_views_by_page(start: Optional[datetime], end: datetime) -> Dict[str, int]:
+    """Total views per page for a window, read from rollups"""
+    collection = db.repository.page_view_rollups
+    pipeline = [
+        {"$match": window_filter(start, end)},
+        {"$group": {"_id": "$page", "views": {"$sum": "$views"}}}
+    ]
+    results = await collection.aggregate(pipeline).to_list(None)
+    return {result["_id"]: result["views"] for result in results}
+
+def views_facet_pipeline(windows: Dict[str, Tuple[Optional[datetime], datetime]]) -> List[dict]:
+    """One ``$facet`` pipeline summing rollup views for several named windows"""
+    filters = {name: window_filter(start, end) for name, (start, end) in windows.items()}
+    return [
+        {"$match": {"$or": list(filters.values())}},
+        {"$facet": {
+            name: [
+                {"$match": window},
+                {"$group": {"_id": None, "views": {"$sum": "$views"}}}
+            ]
+            for name, window in filters.items()
+        }}
+    ]
+
+async def count_views_by_window(windows: Dict[str, Tuple[Optional[datetime], datetime]]) -> Dict[str, int]:
+    """Total views for each named window, read from rollups in one round-trip"""
+    collection = db.repository.page_view_rollups
+    results = await collection.aggregate(views_facet_pipeline(windows)).to_list(1)
+    facets = results[0] if results else {}
+    return {
+        name: facets[name][0]["views"] if facets.get(name) else 0
+        for name in windows
+    }
+
+async def get_views_series(start: datetime, end: datetime, granularity: str) -> Dict[datetime, int]:
+    """Views per bucket for buckets starting in ``[start, end]``.
+
+    Hourly series read hourly counters; daily and weekly series read daily
+    counters, folded into Monday-aligned weeks for the latter.
+    """
+    source = HOUR if granularity == HOUR else DAY
+    collection = db.repository.page_view_rollups
+    pipeline = [
+        {"$match": {"granularity": source, "bucket": {"$gte": start, "$lte": end}}},
+        {"$group": {"_id": "$bucket", "views": {"$sum": "$views"}}}
+    ]
+    results = await collection.aggregate(pipeline).to_list(None)
+
+    if granularity != WEEK:
+        return {result["_id"]: result["views"] for result in results}
+
+    weekly: Counter = Counter()
+    for result in results:
+        weekly[truncate_week(result["_id"])] += result["views"]
+    return dict(weekly)
+
+def _bucket_expression(granularity: str) -> dict:
+    parts = {
+        "year": {"$year": "$timestamp"},
+        "month": {"$month": "$timestamp"},
+        "day": {"$dayOfMonth": "$timestamp"}
+    }
+    if granularity == HOUR:
+        parts["hour"] = {"$hour": "$timestamp"}
+    return {"$dateFromParts": parts}
+
+def raw_retention_cutoff(margin: timedelta = timedelta(hours=1)) -> Optional[datetime]:
+    """Earliest time raw page views are still complete from, or None when they never expire.
+
+    ``margin`` covers events that expire while a rebuild is running.
+    """
+    retention = retention_seconds("PAGE_VIEW_RETENTION_DAYS")
+    if not retention:
+        return None
+    return datetime.utcnow() - timedelta(seconds=retention) + margin
+
+async def rebuild_rollups(batch_size: int = 1000, since: Optional[datetime] = None) -> Tuple[int, int]:
+    """Recompute rollup counters from the raw ``page_views`` collection.
+
+    Counters are overwritten with ``$set`` rather than incremented, so the
+    backfill is idempotent and can be re-run after a partial failure.
+    Only buckets starting at or after ``since`` are rebuilt, and never
+    buckets reaching back past the raw-event retention cutoff: their
+    events are partly expired, and overwriting the counters would lose
+    the views the daily tier keeps for good.
+    Returns the number of hourly and daily counters written.
+    """
+    page_views = db.repository.page_views
+    rollups = db.repository.page_view_rollups
+    written = {}
+    since = max(filter(None, (since, raw_retention_cutoff())), default=None)
+
+    for granularity in (HOUR, DAY):
+        pipeline = [
+            {"$group": {
+                "_id": {"page": "$page", "bucket": _bucket_expression(granularity)},
+                "views": {"$sum": 1}
+            }}
+        ]
+        if since is not None:
+            first_bucket = truncate(since, granularity)
+            if first_bucket < since:
+                first_bucket += STEPS[granularity]
+            pipeline.insert(0, {"$match": {"timestamp": {"$gte": first_bucket}}})
+            logger.info(f"Rebuilding {granularity} rollups from {first_bucket.isoformat()}")
+        operations = []
+        written[granularity] = 0
+        async for result in page_views.aggregate(pipeline, allowDiskUse=True):
+            operations.append(UpdateOne(
+                {"granularity": granularity, "bucket": result["_id"]["bucket"], "page": result["_id"]["page"]},
+                {"$set": {"views": result["views"]}},
+                upsert=True
+            ))
+            if len(operations) >= batch_size:
+                await rollups.bulk_write(operations, ordered=False)
+                written[granularity] += len(operations)
+                operations = []
+        if operations:
+            await rollups.bulk_write(operations, ordered=False)
+            written[granularity] += len(operations)
+
+        logger.info(f"Rebuilt {written[granularity]} {granularity} rollups")
+
+    return written[HOUR], written[DAY]
+
+rollup_counters = RollupCounters()
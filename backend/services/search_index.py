@@ -0,0 +1,117 @@
+import bisect
+import heapq
+import math
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Field weights applied to term frequencies before BM25 scoring
+FIELD_WEIGHTS = {
+    "title": 3.0,
+    "tags": 2.0,
+    "excerpt": 1.0
+}
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_PATTERN.findall(text.lower())
+
+class BlogSearchIndex:
+    """In-memory inverted index over blog post titles, excerpts and tags.
+
+    Postings map each term to the weighted term frequency per post. Query
+    terms are expanded to every indexed term they prefix (via a sorted term
+    list), and candidates are ranked with BM25. Posts can be added, replaced
+    or removed one at a time, so the index never needs a full rebuild.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._terms: List[str] = []
+        self._doc_terms: Dict[str, Counter] = {}
+        self._doc_lengths: Dict[str, float] = {}
+        self._total_length = 0.0
+
+    def __len__(self) -> int:
+        return len(self._doc_terms)
+
+    def post_ids(self) -> Set[str]:
+        return set(self._doc_terms)
+
+    def add(self, post: dict):
+        """Index a post, replacing any previous version with the same id"""
+        post_id = post["id"]
+        if post_id in self._doc_terms:
+            self.remove(post_id)
+
+        terms: Counter = Counter()
+        for field, weight in FIELD_WEIGHTS.items():
+            value = post.get(field) or ""
+            text = " ".join(value) if isinstance(value, list) else value
+            for token in tokenize(text):
+                terms[token] += weight
+
+        self._doc_terms[post_id] = terms
+        length = sum(terms.values())
+        self._doc_lengths[post_id] = length
+        self._total_length += length
+
+        for term, frequency in terms.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                bisect.insort(self._terms, term)
+            postings[post_id] = frequency
+
+    def remove(self, post_id: str):
+        terms = self._doc_terms.pop(post_id, None)
+        if terms is None:
+            return
+
+        self._total_length -= self._doc_lengths.pop(post_id)
+        for term in terms:
+            postings = self._postings[term]
+            del postings[post_id]
+            if not postings:
+                del self._postings[term]
+                del self._terms[bisect.bisect_left(self._terms, term)]
+
+    def _expand(self, token: str) -> Iterable[str]:
+        """Indexed terms starting with ``token``"""
+        position = bisect.bisect_left(self._terms, token)
+        while position < len(self._terms) and self._terms[position].startswith(token):
+            yield self._terms[position]
+            position += 1
+
+    def search(self, query: str, limit: int = 10) -> Tuple[List[str], int]:
+        """Return the ids of the ``limit`` best matches and the total match count.
+
+        Every query token must match (as a prefix) for a post to qualify.
+        """
+        tokens = tokenize(query)
+        if not tokens or not self._doc_terms:
+            return [], 0
+
+        doc_count = len(self._doc_terms)
+        average_length = self._total_length / doc_count
+        scores: Dict[str, float] = {}
+        matched: Optional[Set[str]] = None
+
+        for token in set(tokens):
+            token_matches: Set[str] = set()
+            for term in self._expand(token):
+                postings = self._postings[term]
+                idf = math.log(1 + (doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+                for post_id, frequency in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._doc_lengths[post_id] / average_length)
+                    scores[post_id] = scores.get(post_id, 0.0) + idf * frequency * (self.k1 + 1) / (frequency + norm)
+                    token_matches.add(post_id)
+            matched = token_matches if matched is None else matched & token_matches
+            if not matched:
+                return [], 0
+
+        best = heapq.nlargest(limit, matched, key=lambda post_id: scores[post_id])
+        return best, len(matched)
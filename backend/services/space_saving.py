@@ -0,0 +1,53 @@
+from typing import Dict, Iterable, List, Tuple
+
+class SpaceSaving:
+    """Space-Saving heavy-hitters summary with at most ``capacity`` counters.
+
+    Every item seen more than ``N / capacity`` times out of ``N`` is
+    guaranteed to hold a counter. A counter's count overestimates the true
+    frequency by at most its ``error``. While fewer than ``capacity``
+    distinct items have been seen, counts are exact.
+    Summaries merge by adding counters and keeping the ``capacity`` largest,
+    so a window's top items come from merging its buckets.
+    """
+
+    __slots__ = ("capacity", "counts", "errors")
+
+    def __init__(self, capacity: int = 64):
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+        self.errors: Dict[str, int] = {}
+
+    def add(self, item: str, count: int = 1):
+        counts = self.counts
+        if item in counts:
+            counts[item] += count
+        elif len(counts) < self.capacity:
+            counts[item] = count
+            self.errors[item] = 0
+        else:
+            # Replace the smallest counter; the newcomer inherits its count as error
+            victim = min(counts, key=counts.__getitem__)
+            floor = counts.pop(victim)
+            del self.errors[victim]
+            counts[item] = floor + count
+            self.errors[item] = floor
+
+    def update(self, items: Iterable[str]):
+        for item in items:
+            self.add(item)
+
+    def merge(self, counters: Iterable[Tuple[str, int, int]]):
+        """Add ``(item, count, error)`` counters from another summary"""
+        for item, count, error in counters:
+            self.counts[item] = self.counts.get(item, 0) + count
+            self.errors[item] = self.errors.get(item, 0) + error
+        if len(self.counts) > self.capacity:
+            for item, _, _ in self.top(len(self.counts))[self.capacity:]:
+                del self.counts[item]
+                del self.errors[item]
+
+    def top(self, k: int) -> List[Tuple[str, int, int]]:
+        """The ``k`` largest counters as ``(item, count, error)``, largest first"""
+        ranked = sorted(self.counts.items(), key=lambda entry: (-entry[1], entry[0]))[:k]
+        return [(item, count, self.errors[item]) for item, count in ranked]
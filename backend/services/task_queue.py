@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import os
+from typing import Any, Awaitable, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class TaskQueue:
+    """In-process queue for side effects that shouldn't delay the response.
+
+    Routes ``submit`` a coroutine function and its arguments and return
+    immediately. ``concurrency`` worker tasks run jobs in order. A job that
+    raises is retried up to ``max_retries`` times with exponential backoff
+    starting at ``retry_delay`` seconds, and then logged and dropped; the
+    backoff occupies its worker, so a failing dependency slows the queue
+    down rather than multiplying concurrent attempts. At most
+    ``max_pending`` jobs wait in memory; beyond that ``submit`` refuses new
+    ones instead of blocking. ``stop`` drains whatever is queued.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 4,
+        max_pending: int = 10000,
+        max_retries: int = 3,
+        retry_delay: float = 0.5
+    ):
+        self.concurrency = concurrency
+        self.max_pending = max_pending
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self.in_flight = 0
+        self.stats = {
+            "submitted": 0,
+            "completed": 0,
+            "retried": 0,
+            "failed": 0,
+            "rejected": 0
+        }
+
+    @property
+    def depth(self) -> int:
+        """Jobs waiting for a worker"""
+        return self._queue.qsize() if self._queue else 0
+
+    def submit(self, func: Callable[..., Awaitable[Any]], *args, name: Optional[str] = None) -> bool:
+        """Queue ``func(*args)``; returns False if the queue is full or stopped"""
+        if self._queue is None:
+            self.stats["rejected"] += 1
+            return False
+        try:
+            self._queue.put_nowait((name or func.__qualname__, func, args))
+        except asyncio.QueueFull:
+            self.stats["rejected"] += 1
+            logger.warning(f"Task queue full, dropped {name or func.__qualname__}")
+            return False
+        self.stats["submitted"] += 1
+        return True
+
+    async def start(self):
+        self._queue = asyncio.Queue(maxsize=self.max_pending)
+        self._workers = [asyncio.create_task(self._work(self._queue)) for _ in range(self.concurrency)]
+
+    async def stop(self, timeout: float = 10.0):
+        """Stop accepting jobs and wait up to ``timeout`` seconds for queued ones"""
+        queue, self._queue = self._queue, None
+        if queue is None:
+            return
+        try:
+            await asyncio.wait_for(queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Task queue stopped with {queue.qsize() + self.in_flight} jobs unfinished")
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        logger.info(f"Task queue drained: {self.stats}")
+
+    async def _work(self, queue: asyncio.Queue):
+        while True:
+            name, func, args = await queue.get()
+            self.in_flight += 1
+            try:
+                await self._run(name, func, args)
+            finally:
+                self.in_flight -= 1
+                queue.task_done()
+
+    async def _run(self, name: str, func: Callable[..., Awaitable[Any]], args: tuple):
+        for attempt in range(self.max_retries + 1):
+            try:
+                await func(*args)
+                self.stats["completed"] += 1
+                return
+            except Exception as e:
+                if attempt == self.max_retries:
+                    self.stats["failed"] += 1
+                    logger.error(f"Task {name} failed after {attempt + 1} attempts: {e}")
+                    return
+                self.stats["retried"] += 1
+                await asyncio.sleep(self.retry_delay * 2 ** attempt)
+
+task_queue = TaskQueue(
+    concurrency=int(os.environ.get("TASK_QUEUE_CONCURRENCY", 4)),
+    max_pending=int(os.environ.get("TASK_QUEUE_MAX_PENDING", 10000)),
+    max_retries=int(os.environ.get("TASK_QUEUE_MAX_RETRIES", 3))
+)
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+from typing import Iterator
+
+HOUR = "hour"
+DAY = "day"
+WEEK = "week"
+
+STEPS = {
+    HOUR: timedelta(hours=1),
+    DAY: timedelta(days=1),
+    WEEK: timedelta(weeks=1)
+}
+
+LABEL_FORMATS = {
+    HOUR: "%Y-%m-%dT%H:00",
+    DAY: "%Y-%m-%d",
+    WEEK: "%Y-%m-%d"
+}
+
+def truncate_hour(value: datetime) -> datetime:
+    return value.replace(minute=0, second=0, microsecond=0)
+
+def truncate_day(value: datetime) -> datetime:
+    return value.replace(hour=0, minute=0, second=0, microsecond=0)
+
+def truncate_week(value: datetime) -> datetime:
+    """Start of the ISO week (Monday 00:00) containing ``value``"""
+    day = truncate_day(value)
+    return day - timedelta(days=day.weekday())
+
+def truncate(value: datetime, granularity: str) -> datetime:
+    if granularity == HOUR:
+        return truncate_hour(value)
+    if granularity == DAY:
+        return truncate_day(value)
+    return truncate_week(value)
+
+def series_start(end: datetime, days: int, granularity: str) -> datetime:
+    """First bucket of a series covering the last ``days`` days up to ``end``"""
+    return truncate(end - timedelta(days=days), granularity) + STEPS[granularity]
+
+def bucket_starts(start: datetime, end: datetime, granularity: str) -> Iterator[datetime]:
+    """Every bucket start from ``start`` up to and including the one holding ``end``"""
+    step = STEPS[granularity]
+    bucket = truncate(start, granularity)
+    while bucket <= end:
+        yield bucket
+        bucket += step
+
+def bucket_count(start: datetime, end: datetime, granularity: str) -> int:
+    first = truncate(start, granularity)
+    if first > end:
+        return 0
+    return (truncate(end, granularity) - first) // STEPS[granularity] + 1
+
+def date_trunc_expression(field: str, granularity: str) -> dict:
+    """Aggregation expression truncating ``field`` to a bucket start"""
+    expression = {"date": field, "unit": granularity}
+    if granularity == WEEK:
+        expression["startOfWeek"] = "monday"
+    return {"$dateTrunc": expression}
@@ -0,0 +1,92 @@
+import asyncio
+import logging
+import os
+from collections import Counter
+from typing import Optional
+
+from pymongo import UpdateOne
+
+from database import db
+
+logger = logging.getLogger(__name__)
+
+class ViewCounter:
+    """Per-worker accumulator for blog post view counts.
+
+    Views are counted in memory and flushed every ``flush_interval`` seconds
+    as one unordered ``bulk_write`` of ``$inc`` operations, so a hot post
+    costs one write per interval instead of one per view. Readers add the
+    pending count to the persisted value via ``with_pending``.
+    """
+
+    def __init__(self, flush_interval: float = 5.0):
+        self.flush_interval = flush_interval
+        self._pending: Counter = Counter()
+        self._flushing: Counter = Counter()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self.stats = {
+            "views": 0,
+            "flushes": 0,
+            "failed_flushes": 0
+        }
+
+    def increment(self, post_id: str, count: int = 1):
+        self._pending[post_id] += count
+        self.stats["views"] += count
+
+    def pending(self, post_id: str) -> int:
+        """Views not yet persisted, including those in a flush still in flight"""
+        return self._pending.get(post_id, 0) + self._flushing.get(post_id, 0)
+
+    def with_pending(self, post: dict) -> dict:
+        """Return the post with unflushed views added to its stored count"""
+        pending = self.pending(post["id"])
+        if pending:
+            post = {**post, "views": post.get("views", 0) + pending}
+        return post
+
+    async def start(self):
+        self._stopping = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flush loop and write any remaining counts"""
+        if self._task:
+            self._stopping.set()
+            await self._task
+            self._task = None
+        await self.flush()
+
+    async def _run(self):
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+    async def flush(self):
+        if not self._pending:
+            return
+
+        counts, self._pending = self._pending, Counter()
+        self._flushing = counts
+        try:
+            collection = db.repository.blog_posts
+            await collection.bulk_write([
+                UpdateOne({"id": post_id}, {"$inc": {"views": count}})
+                for post_id, count in counts.items()
+            ], ordered=False)
+            self.stats["flushes"] += 1
+        except Exception as e:
+            # Keep the counts so the next flush retries them
+            self._pending.update(counts)
+            self.stats["failed_flushes"] += 1
+            logger.error(f"Error flushing blog view counts: {e}")
+        finally:
+            self._flushing = Counter()
+
+view_counter = ViewCounter(
+    flush_interval=float(os.environ.get("BLOG_VIEW_FLUSH_INTERVAL", 5.0))
+)
@@ -0,0 +1,72 @@
+import os
+from datetime import datetime
+from typing import Collection, Dict, List, Optional, Tuple
+
+from bson.binary import Binary
+
+from database import db
+from services.bucket_sketches import WorkerBucketSketches
+from services.hyperloglog import HyperLogLog
+from services.rollups import window_filter
+
+class VisitorSketches(WorkerBucketSketches):
+    """Per-worker HyperLogLog sketches of visitor IPs per page per hour and day.
+
+    Registered as a page view buffer flush listener, so sketches are updated
+    from the same batches that feed the rollup counters. A visitor counted
+    by several workers is still counted once when their sketches merge.
+    """
+
+    collection_name = "page_view_sketches"
+    key_field = "page"
+
+    def __init__(self, flush_interval: float = 10.0, precision: int = 14, max_pages: int = 1000):
+        super().__init__(flush_interval, max_keys=max_pages)
+        self.precision = precision
+        self.stats["visitors_added"] = 0
+
+    def new_sketch(self) -> HyperLogLog:
+        return HyperLogLog(self.precision)
+
+    def encode(self, sketch: HyperLogLog) -> dict:
+        return {"registers": Binary(sketch.to_bytes())}
+
+    def merge_stored(self, sketch: HyperLogLog, document: dict):
+        sketch.merge(HyperLogLog.from_bytes(document["registers"]))
+
+    async def record_page_views(self, page_views: List[dict]):
+        """Add each view's IP to its page's hourly and daily sketches"""
+        for view in page_views:
+            visitor = view.get("ip_address")
+            if not visitor:
+                continue
+            for sketch in self.sketches_for(view["timestamp"], view["page"]):
+                sketch.add(visitor)
+            self.stats["visitors_added"] += 1
+
+async def count_unique_visitors(
+    start: Optional[datetime],
+    end: datetime,
+    pages: Collection[str] = ()
+) -> Tuple[int, Dict[str, int]]:
+    """Approximate distinct visitors in ``[start, end]``, overall and for ``pages``.
+
+    Merges every worker's sketches for the whole days and ragged hours of
+    the window (see ``rollups.window_filter``). Only the requested pages
+    are counted individually; every page contributes to the total.
+    """
+    collection = db.repository.page_view_sketches
+    total = HyperLogLog(visitor_sketches.precision)
+    by_page: Dict[str, HyperLogLog] = {page: HyperLogLog(visitor_sketches.precision) for page in pages}
+    async for document in collection.find(window_filter(start, end), {"_id": 0, "page": 1, "registers": 1}):
+        registers = HyperLogLog.from_bytes(document["registers"]).registers
+        page_sketch = by_page.get(document["page"])
+        if page_sketch is not None:
+            page_sketch.merge_registers(registers)
+        total.merge_registers(registers)
+    return total.count(), {page: sketch.count() for page, sketch in by_page.items()}
+
+visitor_sketches = VisitorSketches(
+    flush_interval=float(os.environ.get("VISITOR_SKETCH_FLUSH_INTERVAL", 10.0)),
+    max_pages=int(os.environ.get("VISITOR_SKETCH_MAX_PAGES", 1000))
+)
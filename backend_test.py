@@ -8,6 +8,7 @@ import requests
 import json
 import time
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Dict, Any
 
@@ -21,6 +22,7 @@ class PortfolioAPITester:
             "health_check": {"passed": False, "details": ""},
             "contact_form": {"passed": False, "details": ""},
             "newsletter": {"passed": False, "details": ""},
+            "newsletter_concurrency": {"passed": False, "details": ""},
             "analytics": {"passed": False, "details": ""},
             "blog": {"passed": False, "details": ""},
             "error_handling": {"passed": False, "details": ""},
@@ -55,13 +57,21 @@ class PortfolioAPITester:
             response = self.session.get(f"{self.base_url}/health")
             if response.status_code == 200:
                 data = response.json()
-                if data.get("status") == "healthy":
-                    self.log_test("health_check", True, "Health endpoints working correctly")
-                else:
+                if data.get("status") != "healthy":
                     self.log_test("health_check", False, f"Health check failed: {data}")
+                    return
             else:
                 self.log_test("health_check", False, f"Health endpoint failed: {response.status_code}")
-                
+                return
+
+            # Test liveness and readiness probes
+            live = self.session.get(f"{self.base_url}/health/live")
+            ready = self.session.get(f"{self.base_url}/health/ready")
+            if live.status_code == 200 and ready.status_code == 200 and ready.json().get("ready"):
+                self.log_test("health_check", True, "Health endpoints working correctly")
+            else:
+                self.log_test("health_check", False, f"Probes failed: live={live.status_code} ready={ready.status_code}")
+
         except Exception as e:
             self.log_test("health_check", False, f"Exception: {str(e)}")
             
@@ -162,6 +172,36 @@ class PortfolioAPITester:
         except Exception as e:
             self.log_test("newsletter", False, f"Exception: {str(e)}")
             
+    def test_newsletter_concurrency(self, requests_total: int = 2000, threads: int = 64):
+        """Fire parallel duplicate subscribes for one new email; expect no errors and one new subscriber"""
+        print("\n🔁 Testing Newsletter Concurrency...")
+        
+        try:
+            email = f"race.{int(time.time() * 1000)}@cybersec.com"
+            
+            def subscribe(_):
+                session = requests.Session()
+                try:
+                    response = session.post(f"{self.base_url}/newsletter/subscribe", json={"email": email})
+                    return response.status_code, response.json().get("message", "")
+                finally:
+                    session.close()
+            
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                results = list(executor.map(subscribe, range(requests_total)))
+            
+            errors = [status for status, _ in results if status != 200]
+            created = [message for _, message in results if message.startswith("Successfully subscribed")]
+            if errors:
+                self.log_test("newsletter_concurrency", False, f"{len(errors)}/{requests_total} duplicate subscribes failed, statuses {sorted(set(errors))}")
+            elif len(created) != 1:
+                self.log_test("newsletter_concurrency", False, f"Expected one new subscription, got {len(created)}")
+            else:
+                self.log_test("newsletter_concurrency", True, f"{requests_total} parallel duplicate subscribes, 0 errors, 1 new subscription")
+                
+        except Exception as e:
+            self.log_test("newsletter_concurrency", False, f"Exception: {str(e)}")
+            
     def test_analytics(self):
         """Test analytics tracking functionality"""
         print("\n📊 Testing Analytics...")
@@ -332,6 +372,7 @@ class PortfolioAPITester:
         self.test_health_endpoints()
         self.test_contact_form()
         self.test_newsletter()
+        self.test_newsletter_concurrency()
         self.test_analytics()
         self.test_blog_endpoints()
         self.test_error_handling()
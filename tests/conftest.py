@@ -0,0 +1,6 @@
+import sys
+from pathlib import Path
+
+# The backend runs from its own directory (``python server.py``), so its
+# modules import each other as top-level packages
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "backend"))
@@ -0,0 +1,97 @@
+import asyncio
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from database import db
+from services.blog_store import BlogStore
+
+NOW = datetime(2025, 3, 10, 12, 0)
+
+def post(post_id: str, title: str, updated_at: datetime) -> dict:
+    return {"id": post_id, "title": title, "excerpt": "", "tags": [], "category": "General", "updated_at": updated_at}
+
+class Cursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self.documents:
+            yield document
+
+class BlogPosts:
+    """``blog_posts`` stand-in for the queries BlogStore.refresh makes"""
+
+    def __init__(self):
+        self.posts = {}
+        self.finds = 0
+
+    def find(self, query, projection):
+        self.finds += 1
+        condition = query.get("updated_at", {})
+        documents = [
+            dict(document) for document in self.posts.values()
+            if ("$exists" not in condition or "updated_at" in document)
+            and ("$gte" not in condition or document["updated_at"] >= condition["$gte"])
+        ]
+        return Cursor(documents)
+
+    async def count_documents(self, query):
+        return len(self.posts)
+
+def refreshed(monkeypatch, steps):
+    """Run ``steps`` (collection -> None) each followed by a refresh"""
+    posts = BlogPosts()
+    monkeypatch.setattr(db, "repository", SimpleNamespace(blog_posts=posts), raising=False)
+    store = BlogStore(refresh_overlap=120)
+
+    async def main():
+        for step in steps:
+            step(posts)
+            await store.refresh()
+
+    asyncio.run(main())
+    return store
+
+def titles(store: BlogStore, query: str):
+    return sorted(store.search_index.search(query)[0])
+
+def test_post_visible_after_a_newer_one_with_the_same_stamp_is_indexed(monkeypatch):
+    # One unordered seed batch, one stamp: post 5 is applied before post 3
+    store = refreshed(monkeypatch, [
+        lambda posts: posts.posts.update({"5": post("5", "Quokka", NOW)}),
+        lambda posts: posts.posts.update({"3": post("3", "Quokka", NOW)})
+    ])
+    assert titles(store, "quokka") == ["3", "5"]
+
+def test_writer_with_a_lagging_clock_is_indexed_within_the_overlap(monkeypatch):
+    store = refreshed(monkeypatch, [
+        lambda posts: posts.posts.update({"1": post("1", "Wombat", NOW)}),
+        lambda posts: posts.posts.update({"2": post("2", "Wombat", NOW - timedelta(seconds=90))})
+    ])
+    assert titles(store, "wombat") == ["1", "2"]
+
+def test_unchanged_posts_in_the_overlap_are_not_reindexed(monkeypatch):
+    def rewrite(posts):
+        posts.posts["1"] = post("1", "Numbat", NOW + timedelta(seconds=1))
+
+    store = refreshed(monkeypatch, [
+        lambda posts: posts.posts.update({str(n): post(str(n), "Bilby", NOW) for n in range(5)}),
+        lambda posts: None,
+        rewrite,
+        lambda posts: None
+    ])
+    assert store.stats["posts_updated"] == 6
+    assert titles(store, "numbat") == ["1"]
+    assert titles(store, "bilby") == ["0", "2", "3", "4"]
+
+def test_deleted_posts_are_dropped(monkeypatch):
+    store = refreshed(monkeypatch, [
+        lambda posts: posts.posts.update({"1": post("1", "Dingo", NOW), "2": post("2", "Dingo", NOW)}),
+        lambda posts: posts.posts.pop("1")
+    ])
+    assert titles(store, "dingo") == ["2"]
+    assert store.stats["posts_removed"] == 1
+    assert store.facets.category_summary()["total_posts"] == 1
@@ -0,0 +1,88 @@
+import asyncio
+from datetime import datetime
+from types import SimpleNamespace
+
+from database import db
+from services.bucket_sketches import WORKER_ID
+from services.hyperloglog import HyperLogLog
+from services.time_buckets import DAY, HOUR
+from services.visitor_sketches import VisitorSketches
+
+class Cursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self.documents:
+            yield document
+
+def matches(clause: dict, document: dict) -> bool:
+    return all(
+        document.get(field) in condition["$in"] if isinstance(condition, dict) else document.get(field) == condition
+        for field, condition in clause.items()
+    )
+
+class Sketches:
+    """``page_view_sketches`` stand-in counting round-trips"""
+
+    def __init__(self, documents=()):
+        self.documents = {self.key(document): document for document in documents}
+        self.finds = 0
+
+    @staticmethod
+    def key(document):
+        return document["granularity"], document["bucket"], document["page"], document["worker"]
+
+    def find(self, query):
+        self.finds += 1
+        return Cursor([
+            document for document in self.documents.values()
+            if any(matches(clause, document) for clause in query["$or"])
+        ])
+
+    async def find_one(self, query):
+        raise AssertionError("sketches are looked up in one find per flush")
+
+    async def bulk_write(self, operations, ordered=True):
+        for operation in operations:
+            document = {**operation._filter, **operation._doc["$set"]}
+            self.documents[self.key(document)] = document
+
+def stored_sketch(page: str, bucket: datetime, granularity: str, visitors):
+    sketch = HyperLogLog()
+    sketch.update(visitors)
+    return {"granularity": granularity, "bucket": bucket, "page": page, "worker": WORKER_ID, "registers": sketch.to_bytes()}
+
+def test_new_sketches_are_loaded_in_one_round_trip(monkeypatch):
+    now = datetime.utcnow()
+    hour, day = now.replace(minute=0, second=0, microsecond=0), now.replace(hour=0, minute=0, second=0, microsecond=0)
+    # A recycled worker with the same slot saved these before
+    collection = Sketches([
+        stored_sketch("home", hour, HOUR, ["10.0.0.1", "10.0.0.2"]),
+        stored_sketch("blog", day, DAY, ["10.0.0.3"])
+    ])
+    monkeypatch.setattr(db, "repository", SimpleNamespace(page_view_sketches=collection), raising=False)
+
+    sketches = VisitorSketches()
+    views = [{"timestamp": now, "page": f"page{n}", "ip_address": f"10.1.0.{n}"} for n in range(200)]
+    views += [{"timestamp": now, "page": "home", "ip_address": "10.0.0.9"}, {"timestamp": now, "page": "blog", "ip_address": "10.0.0.9"}]
+
+    async def main():
+        await sketches.start()
+        await sketches.record_page_views(views)
+        await sketches.flush()
+        # Sketches already loaded are not looked up again
+        await sketches.record_page_views(views)
+        await sketches.flush()
+        await sketches.stop()
+
+    asyncio.run(main())
+    assert collection.finds == 1
+    home = collection.documents[(HOUR, hour, "home", WORKER_ID)]
+    blog = collection.documents[(DAY, day, "blog", WORKER_ID)]
+    assert HyperLogLog.from_bytes(home["registers"]).count() == 3
+    assert HyperLogLog.from_bytes(blog["registers"]).count() == 2
+    assert len(collection.documents) == 2 * 202
@@ -0,0 +1,94 @@
+"""
+The batch email validator must accept, normalize and reject exactly as
+``EmailStr`` does. Its fast path reuses email-validator internals
+(``rfc_constants``, ``syntax.validate_email_domain_name``), so this is the
+check to run when requirements.txt moves the email-validator pin.
+"""
+
+import random
+import string
+
+import pytest
+
+from services.email_validation import _validate_domain, _validate_full, validate_email, validate_emails
+
+EDGE_CASES = [
+    "john.doe@example.com",
+    "  padded@example.com  ",
+    "John.Doe@EXAMPLE.COM",
+    "Postmaster@Example.com",
+    "ABUSE@example.org",
+    "a+tag@sub.example.co.uk",
+    "o'hara@example.ie",
+    "x@example",
+    "user@localhost",
+    "user@-bad-.com",
+    "user@exa mple.com",
+    "user@example..com",
+    "user@.example.com",
+    "user@123.com",
+    "user@example.c0m",
+    "user@[192.168.0.1]",
+    "user.@example.com",
+    ".user@example.com",
+    "us..er@example.com",
+    "\"quoted local\"@example.com",
+    "a b@example.com",
+    "John Doe <john@example.com>",
+    "<john@example.com>",
+    "jöhn@example.com",
+    "john@exämple.com",
+    "john@xn--exmple-cua.com",
+    "user@@example.com",
+    "user@example.com@other.com",
+    "not-an-email",
+    "jane@",
+    "@example.com",
+    "",
+    " ",
+    "user@example.com\n",
+    "user\r@example.com",
+    "a" * 64 + "@example.com",
+    "a" * 65 + "@example.com",
+    "a@" + ".".join(["b" * 63] * 4) + ".com",
+    "x" * 3000 + "@example.com",
+    None,
+    42,
+    ["user@example.com"],
+    {"email": "user@example.com"}
+]
+
+def random_addresses(count: int, seed: int = 7):
+    """Mostly plausible addresses built from characters both paths treat specially"""
+    rng = random.Random(seed)
+    local_chars = string.ascii_letters + string.digits + ".+-_'!#$%&*=?^`{|}~\" ()<>,;:\\@[]é"
+    domain_chars = string.ascii_letters + string.digits + ".-_ ü"
+    addresses = []
+    for _ in range(count):
+        local = "".join(rng.choice(local_chars) for _ in range(rng.randint(0, 12)))
+        domain = "".join(rng.choice(domain_chars) for _ in range(rng.randint(0, 10)))
+        tld = rng.choice(["com", "io", "co.uk", "x", "123", ""])
+        addresses.append(f"{local}@{domain}.{tld}" if rng.random() < 0.9 else local + domain)
+    return addresses
+
+@pytest.mark.parametrize("value", EDGE_CASES, ids=repr)
+def test_matches_email_str(value):
+    assert validate_email(value) == _validate_full(value)
+
+def test_random_addresses_match_email_str():
+    addresses = random_addresses(5000)
+    expected = [_validate_full(address) for address in addresses]
+    assert validate_emails(addresses) == expected
+    # Again with every domain check served from the cache
+    assert validate_emails(addresses) == expected
+
+def test_batch_keeps_order_and_duplicates():
+    values = ["b@example.com", "bad", "b@example.com", ["unhashable"], "A@Example.com"]
+    assert validate_emails(values) == [_validate_full(value) for value in values]
+
+def test_domain_checks_are_cached():
+    _validate_domain.cache_clear()
+    validate_emails([f"user{i}@cached-domain.com" for i in range(100)])
+    info = _validate_domain.cache_info()
+    assert info.misses == 1
+    assert info.hits == 99
@@ -0,0 +1,20 @@
+import asyncio
+import os
+
+import pytest
+
+pytestmark = pytest.mark.skipif(not os.environ.get("MONGO_URL"), reason="needs MONGO_URL pointing at a MongoDB server")
+
+def test_dashboard_aggregations_use_indexes():
+    from database import close_mongo_connection, connect_to_mongo
+    from scripts.explain_dashboard import check_dashboard_indexes, uses_index
+
+    async def explain():
+        await connect_to_mongo()
+        try:
+            return await check_dashboard_indexes()
+        finally:
+            await close_mongo_connection()
+
+    for collection_name, field, scans in asyncio.run(explain()):
+        assert uses_index(field, scans), f"{collection_name}: no index scan on '{field}' (found {scans})"
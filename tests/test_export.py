@@ -0,0 +1,97 @@
+import asyncio
+import json
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+from routes.analytics import export_page_views
+from services.export import ExportFormat, with_resume
+
+def matches(query: dict, document: dict) -> bool:
+    """Evaluate the subset of query syntax the export routes produce"""
+    for key, condition in query.items():
+        if key == "$and":
+            if not all(matches(clause, document) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(clause, document) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = document.get(key)
+            for operator, bound in condition.items():
+                if not {"$gt": value > bound, "$gte": value >= bound, "$lt": value < bound}[operator]:
+                    return False
+        elif document.get(key) != condition:
+            return False
+    return True
+
+class Cursor:
+    def __init__(self, documents):
+        self.documents = documents
+
+    def sort(self, keys):
+        for field, _ in reversed(keys):
+            self.documents.sort(key=lambda document: document[field])
+        return self
+
+    def batch_size(self, size):
+        return self
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for document in self.documents:
+            yield document
+
+    async def close(self):
+        pass
+
+class Collection:
+    name = "page_views"
+
+    def __init__(self, documents):
+        self.documents = documents
+
+    def find(self, query, projection):
+        return Cursor([
+            {key: value for key, value in document.items() if key in projection}
+            for document in self.documents if matches(query, document)
+        ])
+
+START = datetime(2025, 3, 1)
+VIEWS = [
+    {"id": f"v{n:02d}", "page": "home", "timestamp": START + timedelta(hours=n // 2)}
+    for n in range(20)
+]
+
+def export(**params) -> list:
+    async def collect():
+        response = await export_page_views(
+            format=ExportFormat.ndjson,
+            page=None,
+            batch_size=3,
+            repo=SimpleNamespace(page_views=Collection(VIEWS)),
+            **{"since": None, "until": None, "after": None, "after_id": None, **params}
+        )
+        return "".join([chunk async for chunk in response.body_iterator])
+
+    return [json.loads(line)["id"] for line in asyncio.run(collect()).splitlines()]
+
+def test_resume_keeps_the_since_until_window():
+    since, until = START + timedelta(hours=2), START + timedelta(hours=6)
+    window = export(since=since, until=until)
+    assert window == [f"v{n:02d}" for n in range(4, 12)]
+
+    # Resume after the timestamp alone, then after (timestamp, id)
+    assert export(since=since, until=until, after=START + timedelta(hours=3)) == window[4:]
+    assert export(since=since, until=until, after=START + timedelta(hours=3), after_id="v06") == window[3:]
+
+def test_resume_without_a_window():
+    assert export(after=START + timedelta(hours=8), after_id="v16") == ["v17", "v18", "v19"]
+
+def test_with_resume_only_adds_and_when_keys_collide():
+    after = datetime(2025, 1, 1)
+    assert with_resume({"page": "home"}, "timestamp", None, None) == {"page": "home"}
+    assert with_resume({"page": "home"}, "timestamp", after, None) == {"page": "home", "timestamp": {"$gt": after}}
+    window = {"timestamp": {"$lt": datetime(2025, 2, 1)}}
+    assert with_resume(window, "timestamp", after, None) == {"$and": [window, {"timestamp": {"$gt": after}}]}
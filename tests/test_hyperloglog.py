@@ -0,0 +1,63 @@
+import pytest
+
+from services.hyperloglog import HyperLogLog
+
+def test_estimate_within_error_bound():
+    sketch = HyperLogLog()
+    sketch.update(f"10.0.{i // 256}.{i % 256}" for i in range(50000))
+    # 0.8% standard error at precision 14; allow four of them
+    assert abs(sketch.count() - 50000) / 50000 < 0.035
+
+def test_small_counts_use_linear_counting():
+    sketch = HyperLogLog()
+    sketch.update(f"visitor{i}" for i in range(100))
+    sketch.update(f"visitor{i}" for i in range(100))
+    assert sketch.is_sparse
+    assert abs(sketch.count() - 100) <= 2
+
+def test_sparse_sketch_densifies_with_the_same_count():
+    sparse, dense = HyperLogLog(precision=10), HyperLogLog(precision=10, registers=bytearray(1 << 10))
+    values = [f"v{i}" for i in range(2000)]
+    for count, value in enumerate(values, 1):
+        sparse.add(value)
+        dense.add(value)
+        if count in (5, 8, 9, 500, 2000):
+            assert sparse.count() == dense.count()
+    assert not sparse.is_sparse
+    assert sparse.registers == dense.registers
+
+def test_merge_equals_union():
+    left, right, union = HyperLogLog(), HyperLogLog(), HyperLogLog()
+    left.update(f"a{i}" for i in range(3000))
+    right.update(f"a{i}" for i in range(2000, 6000))
+    union.update(f"a{i}" for i in range(6000))
+    left.merge(right)
+    assert left.count() == union.count()
+
+def test_merge_sparse_into_dense_and_back():
+    small, large = HyperLogLog(), HyperLogLog()
+    small.update(["x", "y", "z"])
+    large.update(f"v{i}" for i in range(5000))
+    expected = HyperLogLog()
+    expected.update(["x", "y", "z", *(f"v{i}" for i in range(5000))])
+
+    merged = HyperLogLog.from_bytes(large.to_bytes())
+    merged.merge(small)
+    assert merged.count() == expected.count()
+
+    small.merge_registers(large.registers)
+    assert small.count() == expected.count()
+
+def test_round_trip_through_bytes():
+    sketch = HyperLogLog()
+    sketch.update(["a", "b", "c"])
+    restored = HyperLogLog.from_bytes(sketch.to_bytes())
+    assert restored.precision == sketch.precision
+    assert restored.count() == sketch.count()
+    assert len(sketch.to_bytes()) < 1024
+
+def test_rejects_mismatched_precision():
+    with pytest.raises(ValueError):
+        HyperLogLog(precision=12).merge(HyperLogLog(precision=14))
+    with pytest.raises(ValueError):
+        HyperLogLog(precision=3)
@@ -0,0 +1,121 @@
+import asyncio
+from types import SimpleNamespace
+
+from pymongo.errors import BulkWriteError
+
+from database import db
+from services.page_view_buffer import PageViewBuffer
+
+class PageViews:
+    """``page_views`` stand-in whose inserts fail while ``failure`` is set"""
+
+    def __init__(self):
+        self.documents = []
+        self.failure = None
+
+    async def insert_many(self, documents, ordered=True):
+        if self.failure is not None:
+            raise self.failure
+        self.documents.extend(documents)
+        return SimpleNamespace(inserted_ids=[document["n"] for document in documents])
+
+def run(monkeypatch, scenario, **options):
+    page_views = PageViews()
+    monkeypatch.setattr(db, "repository", SimpleNamespace(page_views=page_views), raising=False)
+    buffer = PageViewBuffer(flush_interval=3600, **options)
+    notified = []
+
+    async def listener(batch):
+        notified.append([document["n"] for document in batch])
+
+    async def main():
+        buffer.add_flush_listener(listener)
+        await buffer.start()
+        try:
+            await scenario(buffer, page_views)
+        finally:
+            page_views.failure = None
+            await buffer.stop()
+
+    asyncio.run(main())
+    return buffer, page_views, notified
+
+def test_failed_batch_is_requeued_in_order(monkeypatch):
+    async def scenario(buffer, page_views):
+        for n in range(5):
+            buffer.add({"n": n})
+        page_views.failure = ConnectionError("primary stepped down")
+        await buffer.flush()
+        assert buffer.pending == 5
+        buffer.add({"n": 5})
+        page_views.failure = None
+        await buffer.flush()
+
+    buffer, page_views, notified = run(monkeypatch, scenario, batch_size=10)
+    assert [document["n"] for document in page_views.documents] == [0, 1, 2, 3, 4, 5]
+    assert notified == [[0, 1, 2, 3, 4, 5]]
+    assert buffer.stats["flushed"] == 6
+    assert buffer.stats["failed"] == 0
+
+def test_only_unwritten_batches_are_requeued(monkeypatch):
+    async def scenario(buffer, page_views):
+        for n in range(6):
+            buffer.add({"n": n})
+        insert_many = page_views.insert_many
+        calls = []
+
+        async def fail_second_batch(documents, ordered=True):
+            calls.append(documents)
+            if len(calls) == 2:
+                raise ConnectionError("lost connection")
+            return await insert_many(documents, ordered)
+
+        page_views.insert_many = fail_second_batch
+        await buffer.flush()
+        assert buffer.pending == 3
+        await buffer.flush()
+
+    buffer, page_views, notified = run(monkeypatch, scenario, batch_size=3)
+    assert [document["n"] for document in page_views.documents] == [0, 1, 2, 3, 4, 5]
+    assert notified == [[0, 1, 2], [3, 4, 5]]
+
+def test_requeue_respects_capacity(monkeypatch):
+    async def scenario(buffer, page_views):
+        for n in range(4):
+            buffer.add({"n": n})
+        page_views.failure = ConnectionError("down")
+        await buffer.flush()
+        # Requeued views count against capacity, so new ones are dropped once it is full
+        for n in range(4, 7):
+            buffer.add({"n": n})
+        assert buffer.pending == 5
+        assert buffer.stats["dropped"] == 2
+
+    buffer, page_views, _ = run(monkeypatch, scenario, batch_size=10, max_pending=5)
+    assert [document["n"] for document in page_views.documents] == [0, 1, 2, 3, 4]
+
+def test_rejected_documents_are_counted_not_retried(monkeypatch):
+    async def scenario(buffer, page_views):
+        for n in range(3):
+            buffer.add({"n": n})
+        page_views.failure = BulkWriteError({"writeErrors": [{"index": 1}]})
+        await buffer.flush()
+        assert buffer.pending == 0
+
+    buffer, _, notified = run(monkeypatch, scenario, batch_size=10)
+    assert notified == [[0, 2]]
+    assert buffer.stats["failed"] == 1
+    assert buffer.stats["flushed"] == 2
+
+def test_stop_does_not_requeue(monkeypatch):
+    async def scenario(buffer, page_views):
+        buffer.add({"n": 0})
+        page_views.failure = ConnectionError("down")
+        buffer._closing = True
+        await buffer.flush(requeue=False)
+        assert buffer.pending == 0
+        assert buffer.add({"n": 1}) is False
+
+    buffer, page_views, _ = run(monkeypatch, scenario)
+    assert page_views.documents == []
+    assert buffer.stats["failed"] == 1
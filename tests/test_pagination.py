@@ -0,0 +1,28 @@
+from datetime import datetime
+
+import pytest
+
+from services.pagination import decode_cursor, encode_cursor, keyset_filter
+
+def test_cursor_round_trip():
+    moment = datetime(2025, 3, 10, 18, 15, 42, 123000)
+    token = encode_cursor(moment, "a1b2-c3")
+    assert "=" not in token
+    assert decode_cursor(token) == (moment, "a1b2-c3")
+
+def test_cursor_is_url_safe():
+    token = encode_cursor(datetime(2025, 1, 1), "id/with+chars?")
+    assert all(char.isalnum() or char in "-_" for char in token)
+    assert decode_cursor(token)[1] == "id/with+chars?"
+
+@pytest.mark.parametrize("token", ["", "not-a-cursor", "e30", encode_cursor(datetime(2025, 1, 1), "x")[:-3]])
+def test_malformed_cursors_raise_value_error(token):
+    with pytest.raises(ValueError):
+        decode_cursor(token)
+
+def test_keyset_filter_continues_after_the_last_item():
+    moment = datetime(2025, 1, 1)
+    assert keyset_filter("timestamp", moment, "m5") == {"$or": [
+        {"timestamp": {"$lt": moment}},
+        {"timestamp": moment, "id": {"$lt": "m5"}}
+    ]}
@@ -0,0 +1,142 @@
+import asyncio
+
+from services.response_cache import ResponseCache
+
+class Source:
+    """Counts computations; each one waits until ``release`` is set"""
+
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def compute(self):
+        self.calls += 1
+        await self.release.wait()
+        return {"value": self.calls}
+
+def test_concurrent_misses_share_one_computation():
+    async def scenario():
+        cache, source = ResponseCache(), Source()
+        waiters = [asyncio.create_task(cache.get_or_compute("key", 60, (), source.compute)) for _ in range(10)]
+        await asyncio.sleep(0)
+        source.release.set()
+        results = await asyncio.gather(*waiters)
+        return cache, source, results
+
+    cache, source, results = asyncio.run(scenario())
+    assert source.calls == 1
+    assert results == [{"value": 1}] * 10
+    assert cache.stats["misses"] == 1
+    assert cache.stats["coalesced"] == 9
+
+def test_failure_reaches_every_waiter_and_is_not_cached():
+    async def scenario():
+        cache = ResponseCache()
+        release = asyncio.Event()
+
+        async def failing():
+            await release.wait()
+            raise RuntimeError("database down")
+
+        waiters = [asyncio.create_task(cache.get_or_compute("key", 60, (), failing)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+
+        async def working():
+            return "ok"
+        return results, await cache.get_or_compute("key", 60, (), working)
+
+    results, retried = asyncio.run(scenario())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert retried == "ok"
+
+def test_hits_until_invalidated():
+    async def scenario():
+        cache, source = ResponseCache(), Source()
+        source.release.set()
+        first = await cache.get_or_compute("stats", 60, ("contact",), source.compute)
+        second = await cache.get_or_compute("stats", 60, ("contact",), source.compute)
+        cache.invalidate("newsletter")
+        third = await cache.get_or_compute("stats", 60, ("contact",), source.compute)
+        cache.invalidate("contact")
+        fourth = await cache.get_or_compute("stats", 60, ("contact",), source.compute)
+        return cache, [first, second, third, fourth]
+
+    cache, values = asyncio.run(scenario())
+    assert [value["value"] for value in values] == [1, 1, 1, 2]
+    assert cache.stats["invalidations"] == 1
+
+def test_invalidation_during_computation_skips_storing_the_stale_result():
+    async def scenario():
+        cache, source = ResponseCache(), Source()
+        pending = asyncio.create_task(cache.get_or_compute("stats", 60, ("contact",), source.compute))
+        await asyncio.sleep(0)
+        # A write lands while the read is in flight
+        cache.invalidate("contact")
+        source.release.set()
+        stale = await pending
+        fresh = await cache.get_or_compute("stats", 60, ("contact",), source.compute)
+        return stale, fresh
+
+    stale, fresh = asyncio.run(scenario())
+    assert stale == {"value": 1}
+    assert fresh == {"value": 2}
+
+def test_expired_entries_are_recomputed():
+    async def scenario():
+        cache, source = ResponseCache(), Source()
+        source.release.set()
+        await cache.get_or_compute("key", 0, (), source.compute)
+        return await cache.get_or_compute("key", 0, (), source.compute)
+
+    assert asyncio.run(scenario()) == {"value": 2}
+
+def test_least_recently_used_entries_are_evicted():
+    async def scenario():
+        cache = ResponseCache(max_entries=2)
+
+        async def value():
+            return "v"
+        for key in ("a", "b", "a", "c"):
+            await cache.get_or_compute(key, 60, (), value)
+        return cache
+
+    cache = asyncio.run(scenario())
+    assert list(cache._entries) == ["a", "c"]
+    assert cache.stats["evictions"] == 1
+
+def test_cancelled_leader_does_not_cancel_waiters():
+    async def scenario():
+        cache, source = ResponseCache(), Source()
+        leader = asyncio.create_task(cache.get_or_compute("summary", 60, (), source.compute))
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(cache.get_or_compute("summary", 60, (), source.compute))
+        await asyncio.sleep(0)
+        # The client that started the computation disconnects
+        leader.cancel()
+        await asyncio.sleep(0)
+        source.release.set()
+        result = await follower
+        cached = await cache.get_or_compute("summary", 60, (), source.compute)
+        return leader, source, result, cached
+
+    leader, source, result, cached = asyncio.run(scenario())
+    assert leader.cancelled()
+    assert result == {"value": 1}
+    assert cached == {"value": 1}
+    assert source.calls == 1
+
+def test_cancelled_only_caller_still_fills_the_cache():
+    async def scenario():
+        cache, source = ResponseCache(), Source()
+        leader = asyncio.create_task(cache.get_or_compute("summary", 60, (), source.compute))
+        await asyncio.sleep(0)
+        leader.cancel()
+        source.release.set()
+        await asyncio.sleep(0.01)
+        return source, await cache.get_or_compute("summary", 60, (), source.compute)
+
+    source, cached = asyncio.run(scenario())
+    assert cached == {"value": 1}
+    assert source.calls == 1
@@ -0,0 +1,78 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from services.rollups import window_filter
+from services.time_buckets import DAY, HOUR
+
+def matches(query: dict, document: dict) -> bool:
+    """Evaluate the subset of query syntax window_filter produces"""
+    if "$or" in query:
+        return any(matches(clause, document) for clause in query["$or"])
+    for field, condition in query.items():
+        value = document[field]
+        if not isinstance(condition, dict):
+            if value != condition:
+                return False
+            continue
+        for operator, bound in condition.items():
+            if operator == "$gte" and not value >= bound:
+                return False
+            if operator == "$lt" and not value < bound:
+                return False
+            if operator == "$lte" and not value <= bound:
+                return False
+    return True
+
+def covered_hours(start, end, first: datetime, last: datetime):
+    """Hours in ``[first, last]`` counted by the filter, once per matching rollup"""
+    buckets = []
+    hour = first
+    while hour <= last:
+        buckets.append({"granularity": HOUR, "bucket": hour})
+        if hour.hour == 0:
+            buckets.append({"granularity": DAY, "bucket": hour})
+        hour += timedelta(hours=1)
+
+    query = window_filter(start, end)
+    hours = []
+    for bucket in filter(lambda document: matches(query, document), buckets):
+        if bucket["granularity"] == DAY:
+            hours.extend(bucket["bucket"] + timedelta(hours=offset) for offset in range(24))
+        else:
+            hours.append(bucket["bucket"])
+    return sorted(hours)
+
+def hours_between(start: datetime, end: datetime):
+    hour = start.replace(minute=0, second=0, microsecond=0)
+    hours = []
+    while hour <= end:
+        hours.append(hour)
+        hour += timedelta(hours=1)
+    return hours
+
+@pytest.mark.parametrize("start, end", [
+    (datetime(2025, 3, 10, 5, 30), datetime(2025, 3, 10, 18, 15)),
+    (datetime(2025, 3, 10, 0, 0), datetime(2025, 3, 10, 23, 59)),
+    (datetime(2025, 3, 10, 22, 10), datetime(2025, 3, 11, 1, 5)),
+    (datetime(2025, 3, 1, 13, 0), datetime(2025, 3, 9, 7, 45)),
+    (datetime(2025, 3, 1, 0, 0), datetime(2025, 3, 31, 23, 0)),
+    (datetime(2025, 3, 10, 7, 0), datetime(2025, 3, 10, 7, 0))
+])
+def test_window_covers_each_hour_once(start, end):
+    first, last = datetime(2025, 2, 25), datetime(2025, 4, 5)
+    assert covered_hours(start, end, first, last) == hours_between(start, end)
+
+def test_window_reads_whole_days_from_daily_rollups():
+    query = window_filter(datetime(2025, 3, 1, 13, 0), datetime(2025, 3, 9, 7, 45))
+    day_clauses = [clause for clause in query["$or"] if clause["granularity"] == DAY]
+    assert day_clauses == [{"granularity": DAY, "bucket": {"$gte": datetime(2025, 3, 2), "$lt": datetime(2025, 3, 9)}}]
+
+def test_window_inside_one_day_uses_hourly_rollups_only():
+    query = window_filter(datetime(2025, 3, 10, 5, 30), datetime(2025, 3, 10, 18, 15))
+    assert query == {"granularity": HOUR, "bucket": {"$gte": datetime(2025, 3, 10, 5), "$lte": datetime(2025, 3, 10, 18)}}
+
+def test_open_window_starts_at_the_beginning():
+    end = datetime(2025, 3, 10, 18, 15)
+    first = datetime(2025, 1, 1)
+    assert covered_hours(None, end, first, datetime(2025, 3, 12)) == hours_between(first, end)
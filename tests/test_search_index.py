@@ -0,0 +1,51 @@
+from services.search_index import BlogSearchIndex, tokenize
+
+POSTS = [
+    {"id": "1", "title": "Threat hunting with Sigma rules", "excerpt": "Detection engineering basics", "tags": ["Threat Hunting", "SIEM"]},
+    {"id": "2", "title": "AI in the SOC", "excerpt": "Where machine learning helps threat hunting", "tags": ["AI"]},
+    {"id": "3", "title": "MITRE ATT&CK mapping", "excerpt": "Mapping detections to techniques", "tags": ["Frameworks"]}
+]
+
+def build() -> BlogSearchIndex:
+    index = BlogSearchIndex()
+    for post in POSTS:
+        index.add(post)
+    return index
+
+def test_tokenize_lowercases_and_splits_punctuation():
+    assert tokenize("ATT&CK, Sigma-rules!") == ["att", "ck", "sigma", "rules"]
+
+def test_title_matches_rank_above_excerpt_matches():
+    ids, total = build().search("threat hunting")
+    assert ids == ["1", "2"]
+    assert total == 2
+
+def test_every_token_must_match_as_a_prefix():
+    index = build()
+    assert index.search("hunt sig") == (["1"], 1)
+    assert index.search("hunting mitre") == ([], 0)
+    ids, total = index.search("det")
+    assert sorted(ids) == ["1", "3"]
+    assert total == 2
+
+def test_limit_keeps_total_match_count():
+    ids, total = build().search("threat", limit=1)
+    assert ids == ["1"]
+    assert total == 2
+
+def test_replace_and_remove_posts():
+    index = build()
+    index.add({"id": "1", "title": "Incident response", "excerpt": "", "tags": []})
+    assert index.search("sigma") == ([], 0)
+    assert index.search("incident") == (["1"], 1)
+
+    index.remove("1")
+    index.remove("missing")
+    assert len(index) == 2
+    assert index.post_ids() == {"2", "3"}
+    assert index.search("incident") == ([], 0)
+    assert index.search("threat") == (["2"], 1)
+
+def test_empty_queries_match_nothing():
+    assert build().search("") == ([], 0)
+    assert BlogSearchIndex().search("threat") == ([], 0)
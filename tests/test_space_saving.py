@@ -0,0 +1,40 @@
+import random
+from collections import Counter
+
+from services.space_saving import SpaceSaving
+
+def test_counts_are_exact_below_capacity():
+    summary = SpaceSaving(capacity=8)
+    items = ["a"] * 5 + ["b"] * 3 + ["c"]
+    summary.update(items)
+    assert summary.top(3) == [("a", 5, 0), ("b", 3, 0), ("c", 1, 0)]
+
+def test_frequent_items_are_kept_with_bounded_error():
+    rng = random.Random(3)
+    capacity = 20
+    stream = [f"page{min(int(rng.paretovariate(1.2)), 500)}" for _ in range(20000)]
+    exact = Counter(stream)
+    summary = SpaceSaving(capacity=capacity)
+    summary.update(stream)
+
+    assert len(summary.counts) == capacity
+    for item, count, error in summary.top(capacity):
+        assert count - error <= exact[item] <= count
+    # Every item above N / capacity must hold a counter
+    for item, count in exact.items():
+        if count > len(stream) / capacity:
+            assert item in summary.counts
+
+def test_merge_adds_counters_and_keeps_capacity():
+    left, right = SpaceSaving(capacity=3), SpaceSaving(capacity=3)
+    left.update(["a", "a", "b", "c"])
+    right.update(["a", "d", "d", "d", "e"])
+    left.merge(right.top(3))
+    assert len(left.counts) == 3
+    assert left.top(2) == [("a", 3, 0), ("d", 3, 0)]
+    assert set(left.errors) == set(left.counts)
+
+def test_replacement_inherits_the_minimum_as_error():
+    summary = SpaceSaving(capacity=2)
+    summary.update(["a", "a", "b", "c"])
+    assert summary.top(2) == [("a", 2, 0), ("c", 2, 1)]